@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+批量导出PDF - 为全班每个学生生成各自的单词表
+
+每份单词表（标题 + 单词列表）在进程池中并行生成，各个进程第一次生成时各自注册字体；
+结果可以是每份一个文件，也可以按顺序合并成一个PDF（需要 PyMuPDF 或 pypdf）。
+
+用法:
+    python batch_export.py 张三.txt 李四.txt ...                  # 每个文件一份单词表，文件名为标题
+    python batch_export.py lists/*.txt --merge 全班.pdf
+    python batch_export.py lists/*.txt --layout quiz --workers 4
+
+单词文件每行一个单词（或一行多个，用空格、逗号分隔），单词库中有的单词带上音标和含义。
+批量导出用于打印给别人，不更新单词库中的打印次数。
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_layouts import DEFAULT_LAYOUT, LAYOUTS
+
+# PDF合并库导入状态
+PYMUPDF_AVAILABLE = False
+PYPDF_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    pass
+
+try:
+    import pypdf
+    PYPDF_AVAILABLE = True
+except ImportError:
+    pass
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+
+# 一份单词表的生成结果
+DeckResult = namedtuple("DeckResult", ["index", "title", "success", "message", "path"])
+
+
+def _init_worker():
+    """进程池中每个进程启动时注册字体（子进程不共享父进程注册的字体）"""
+    from pdf_generator import pdf_generator
+    pdf_generator.ensure_font()
+
+
+def _render_deck(index: int, title: str, words: List[Dict], output_path: str, layout: str) -> DeckResult:
+    """在子进程中生成一份单词表"""
+    from pdf_generator import pdf_generator
+    
+    success, msg = pdf_generator.generate_vocabulary_pdf(words, output_path, title=title, layout=layout)
+    return DeckResult(index, title, success, msg, output_path if success else None)
+
+
+def safe_filename(title: str) -> str:
+    """把标题转换成可以作为文件名的字符串"""
+    name = re.sub(r'[\\/:*?"<>|\s]+', "_", title).strip("._")
+    return name or "deck"
+
+
+def unique_filenames(titles: Sequence[str]) -> List[str]:
+    """
+    为每个标题生成不重复的文件名（不含扩展名）
+    
+    Windows 和 macOS 的文件名不区分大小写，Alice 和 alice 是同一个文件，所以按 casefold 比较。
+    """
+    names = []
+    used = set()
+    for i, title in enumerate(titles):
+        name = safe_filename(title)
+        candidate = name
+        n = i + 1
+        while candidate.casefold() in used:
+            candidate = f"{name}_{n}"
+            n += 1
+        used.add(candidate.casefold())
+        names.append(candidate)
+    return names
+
+
+def merge_pdfs(paths: Sequence[str], output_path: str) -> Tuple[bool, str]:
+    """
+    按顺序把多个PDF合并成一个
+    
+    返回:
+        tuple: (成功标志, 消息)
+    """
+    try:
+        if PYMUPDF_AVAILABLE:
+            merged = fitz.open()
+            for path in paths:
+                with fitz.open(path) as doc:
+                    merged.insert_pdf(doc)
+            merged.save(output_path, garbage=3, deflate=True)
+            merged.close()
+        elif PYPDF_AVAILABLE:
+            writer = pypdf.PdfWriter()
+            for path in paths:
+                writer.append(path)
+            with open(output_path, "wb") as f:
+                writer.write(f)
+        else:
+            return False, "合并PDF需要安装 PyMuPDF 或 pypdf: pip install pymupdf"
+    except Exception as e:
+        return False, f"PDF合并失败: {e}"
+    return True, f"PDF已保存: {output_path}"
+
+
+def export_decks(decks: Sequence[Tuple[str, List[Dict]]], output_dir: str = OUTPUT_DIR,
+                 layout: str = DEFAULT_LAYOUT, merge_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, on_progress: Optional[Callable] = None,
+                 should_cancel: Optional[Callable] = None) -> Tuple[bool, str, List[DeckResult]]:
+    """
+    批量生成单词表PDF
+    
+    参数:
+        decks: [(标题, 单词列表)]，单词的格式与 db.get_all_words() 相同
+        output_dir: 输出目录，每份单词表保存为 <标题>.pdf（合并时不保存单独的文件）
+        layout: 版式名称，见 pdf_layouts.LAYOUT_OPTIONS
+        merge_path: 合并后的文件路径，为 None 时每份单独保存
+        max_workers: 进程数，默认为CPU核数（不超过单词表份数）
+        on_progress: 进度回调 on_progress(已完成份数, 总份数)
+        should_cancel: 返回 True 时不再开始新的单词表（已经开始的会生成完）
+    
+    返回:
+        tuple: (是否全部成功, 消息, 各份单词表的结果（按 decks 的顺序）)
+    """
+    if not decks:
+        return False, "没有单词表", []
+    if layout not in LAYOUTS:
+        return False, f"未知的版式: {layout}", []
+    if merge_path and not (PYMUPDF_AVAILABLE or PYPDF_AVAILABLE):
+        return False, "合并PDF需要安装 PyMuPDF 或 pypdf: pip install pymupdf", []
+    
+    # 合并时单独的文件先写到临时目录
+    work_dir = tempfile.mkdtemp(prefix="vocab_batch_") if merge_path else output_dir
+    os.makedirs(work_dir, exist_ok=True)
+    
+    paths = [os.path.join(work_dir, name + ".pdf") for name in unique_filenames([title for title, _ in decks])]
+    
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(decks)))
+    results: List[Optional[DeckResult]] = [None] * len(decks)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(_render_deck, i, title, list(words), paths[i], layout): i
+                for i, (title, words) in enumerate(decks)
+            }
+            done = 0
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = DeckResult(i, decks[i][0], False, f"PDF生成失败: {e}", None)
+                done += 1
+                if on_progress:
+                    on_progress(done, len(decks))
+                if should_cancel and should_cancel():
+                    for f in futures:
+                        f.cancel()
+                    break
+        
+        # 被取消的单词表
+        for i, r in enumerate(results):
+            if r is None:
+                results[i] = DeckResult(i, decks[i][0], False, "已取消", None)
+        
+        failed = [r for r in results if not r.success]
+        if merge_path:
+            if failed:
+                return False, f"{len(failed)} 份单词表生成失败，未合并: {failed[0].message}", results
+            success, msg = merge_pdfs([r.path for r in results], merge_path)
+            if not success:
+                return False, msg, results
+        else:
+            msg = f"已生成 {len(results) - len(failed)} 份单词表: {output_dir}"
+            if failed:
+                return False, msg + f"，{len(failed)} 份失败: {failed[0].message}", results
+    finally:
+        if merge_path:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    return True, msg, results
+
+
+def load_deck_file(path: str) -> Tuple[str, List[Dict]]:
+    """
+    读取单词文件，单词库中有的单词带上音标和含义
+    
+    返回:
+        tuple: (标题（文件名）, 单词列表)
+    """
+    from database import db
+    
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    words = []
+    seen = set()
+    for word in re.split(r"[\s,，;；]+", text):
+        word = word.strip().lower()
+        if not word or word in seen:
+            continue
+        seen.add(word)
+        words.append(db.get_word_by_text(word) or {"id": None, "word": word})
+    return os.path.splitext(os.path.basename(path))[0], words
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量生成单词表PDF（每个单词文件一份）")
+    parser.add_argument("files", nargs="+", help="单词文件，每行一个单词")
+    parser.add_argument("--layout", choices=list(LAYOUTS), default=DEFAULT_LAYOUT, help="版式")
+    parser.add_argument("--merge", metavar="PDF", help="合并成一个PDF文件")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="输出目录（不合并时），默认为 output/")
+    parser.add_argument("--workers", type=int, help="进程数，默认为CPU核数")
+    args = parser.parse_args()
+    
+    decks = []
+    for path in args.files:
+        try:
+            decks.append(load_deck_file(path))
+        except OSError as e:
+            print(f"读取失败: {path} ({e})")
+            sys.exit(1)
+    
+    start = time.perf_counter()
+    success, msg, results = export_decks(
+        decks, output_dir=args.output, layout=args.layout, merge_path=args.merge, max_workers=args.workers,
+        on_progress=lambda done, total: print(f"\r已完成 {done}/{total}", end="", flush=True),
+    )
+    print()
+    for r in results:
+        if not r.success:
+            print(f"失败: {r.title} ({r.message})")
+    print(f"{msg}，用时 {time.perf_counter() - start:.1f} 秒")
+    if not success:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
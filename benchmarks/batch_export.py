@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+批量导出基准测试 - 进程数与吞吐量
+
+用法:
+    python benchmarks/batch_export.py                        # 32 份单词表，每份 300 个单词
+    python benchmarks/batch_export.py --decks 64 --words 500
+    python benchmarks/batch_export.py --workers 1 2 4 8
+
+依次用不同的进程数生成同样的单词表，并与在当前进程中逐份调用 generate_vocabulary_pdf 比较。
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from harness import print_table
+from pdf_layout_speed import make_words
+
+from batch_export import export_decks
+from pdf_generator import pdf_generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导出基准测试")
+    parser.add_argument("--decks", type=int, default=32)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--layout", default="table")
+    parser.add_argument("--workers", type=int, nargs="+")
+    args = parser.parse_args()
+    
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, cpus} if cpus > 1 else {1})
+    decks = [(f"学生{i + 1}", make_words(args.words, seed=i)) for i in range(args.decks)]
+    out_dir = tempfile.mkdtemp()
+    rows = []
+    try:
+        pdf_generator.ensure_font()
+        start = time.perf_counter()
+        for i, (title, words) in enumerate(decks):
+            pdf_generator.generate_vocabulary_pdf(words, os.path.join(out_dir, f"{i}.pdf"),
+                                                  title=title, layout=args.layout)
+        serial = time.perf_counter() - start
+        rows.append(["当前进程逐份生成", "-", serial, args.decks / serial, 1.0])
+        
+        for workers in worker_counts:
+            start = time.perf_counter()
+            success, msg, _ = export_decks(decks, output_dir=out_dir, layout=args.layout, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            if not success:
+                print(msg)
+            rows.append([f"进程池", workers, elapsed, args.decks / elapsed, serial / elapsed])
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    
+    print(f"CPU核数: {cpus}，{args.decks} 份单词表，每份 {args.words} 个单词，版式: {args.layout}")
+    print()
+    print_table(["方式", "进程数", "耗时s", "份/秒", "加速"], rows)
+
+
+if __name__ == "__main__":
+    main()
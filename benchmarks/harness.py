@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试公共工具 - 计时、内存统计和结果输出
+
+各基准测试脚本放在 benchmarks/ 目录下，直接运行:
+    python benchmarks/<脚本名>.py
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import statistics
+import subprocess
+from typing import Callable, Dict, List
+
+# 项目根目录，脚本中导入项目模块前加入 sys.path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# 仓库自带的示例图片
+SAMPLE_IMAGES = [
+    os.path.join(ROOT_DIR, "4_01.jpg"),
+    os.path.join(ROOT_DIR, "test1.jpg"),
+]
+
+
+def timeit(func: Callable, repeat: int = 5, warmup: int = 1) -> Dict:
+    """
+    多次运行函数并统计耗时
+    
+    参数:
+        func: 无参数的函数
+        repeat: 计时次数
+        warmup: 预热次数（不计时）
+    
+    返回:
+        Dict: {"min_ms", "median_ms", "mean_ms", "result"}，result 为最后一次的返回值
+    """
+    result = None
+    for _ in range(warmup):
+        result = func()
+    
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    
+    return {
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+        "mean_ms": statistics.mean(times),
+        "result": result,
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法），values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def current_rss_mb() -> float:
+    """当前进程的常驻内存（MB），无法获取时返回 0"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    """进程启动以来的峰值常驻内存（MB），无法获取时返回 0"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except (ImportError, AttributeError):
+        return 0.0
+
+
+def run_isolated(script: str, args: List[str], timeout: int = 3600) -> Dict:
+    """
+    在独立子进程中运行基准测试脚本，避免多个测试项之间的内存和缓存互相影响
+    
+    子进程需要以 --json 参数运行，并在标准输出的最后一行打印一个JSON对象。
+    
+    返回:
+        Dict: 子进程输出的JSON对象；失败时为 {"error": 错误信息}
+    """
+    proc = subprocess.run(
+        [sys.executable, script, *args, "--json"],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=ROOT_DIR,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["子进程无输出"])[-1]}
+    try:
+        return json.loads(lines[-1])
+    except ValueError:
+        return {"error": lines[-1]}
+
+
+def print_table(headers: List[str], rows: List[List]):
+    """以对齐的文本表格打印结果"""
+    cells = [[str(h) for h in headers]] + [
+        [f"{v:.1f}" if isinstance(v, float) else str(v) for v in row] for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+并发会话压力测试 - 网页模式能同时支持多少个学生
+
+用法:
+    python benchmarks/loadtest.py                            # 10、20、40 个会话，每个会话 3 轮
+    python benchmarks/loadtest.py --sessions 50 100 --rounds 5
+    python benchmarks/loadtest.py --workers 4                # 与 main.py --web --workers 4 相同的多进程方式
+    python benchmarks/loadtest.py --sessions 40 --max-p95 2000   # 超出时返回非零退出码（用于CI）
+
+每个模拟会话按学生的使用顺序反复执行:
+    采集（选出文章中的生词并分类）→ 提交（纠错、查词典、入库）→ 搜索（补全和按页搜索）
+    → 管理（读取第一页）→ 背诵 → 连连看 → 导出PDF
+各动作调用的模块和页面事件处理函数相同，阻塞操作同样通过 utils.executors 的共享线程池执行，
+同一个进程中的全部会话共用一个事件循环（与网页模式相同）；不经过 Flet 的 websocket，也不包括OCR识别。
+"事件循环延迟"是一个每50毫秒醒来一次的任务实际晚醒的时间，反映界面事件要排队多久。
+
+测试使用临时的数据库（WAL 模式，预先放入常用词）、输出目录和本机的模拟词典服务（有道接口格式，
+默认每次查询延迟80毫秒），不访问网络，也不修改项目中的 vocabulary.db。PDF缓存默认关闭（--pdf-cache 打开）。
+
+每个会话数分别在新的工作进程中运行，报告各动作的 p50/p95/p99 延迟和工作进程的内存。
+最后按 --target-p95 给出容量: 所有动作的 p95 都不超过目标的最大会话数。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from typing import Dict, List
+
+from harness import ROOT_DIR, current_rss_mb, peak_rss_mb, percentile, print_table
+
+ACTIONS = ["采集", "提交", "搜索", "管理", "背诵", "连连看", "导出PDF"]
+LOOP_LAG = "事件循环延迟"
+
+# 预先放入数据库的常用词数量（词频排名 SEED_START 之后的单词）
+SEED_WORDS = 1500
+SEED_START = 1500
+
+# 每次提交的单词数、背诵数量、连连看配对数、导出的单词数
+SUBMIT_WORDS = 8
+REVIEW_WORDS = 10
+GAME_PAIRS = 6
+EXPORT_WORDS = 60
+
+# 事件循环延迟的采样间隔（秒）
+LAG_INTERVAL = 0.05
+
+
+# ---------- 模拟词典服务 ----------
+
+class _DictionaryHandler(BaseHTTPRequestHandler):
+    """有道 suggest 接口格式的模拟服务，Free Dictionary 接口返回404"""
+    
+    latency = 0.08
+    requests = 0
+    _lock = threading.Lock()
+    
+    def do_GET(self):
+        with self._lock:
+            type(self).requests += 1
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        word = parse_qs(url.query).get("q", [""])[0]
+        if not url.path.endswith("/suggest") or not word:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({"data": {"entries": [{"explain": f"{word} n. 模拟释义（{word}）"}]}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_dictionary_server(latency_ms: float) -> ThreadingHTTPServer:
+    """在后台线程中启动模拟词典服务"""
+    _DictionaryHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DictionaryHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------- 测试数据 ----------
+
+def seed_database(path: str):
+    """创建测试数据库: WAL 模式，放入常用词"""
+    from database import VocabularyDB
+    from utils.word_filter import load_frequency_list
+    
+    words = load_frequency_list()[SEED_START:SEED_START + SEED_WORDS]
+    rng = random.Random(1)
+    db = VocabularyDB(db_path=path)
+    db.enable_wal()
+    db.conn.executemany(
+        "INSERT OR IGNORE INTO words (word, meaning, phonetic, part_of_speech, selection_count) VALUES (?, ?, ?, ?, ?)",
+        [(w, f"n. {w} 的释义", f"/{w}/", "n.", rng.randint(1, 5)) for w in words],
+    )
+    db.conn.commit()
+    db.close()
+
+
+def make_article(rng: random.Random, vocabulary: List[str], n_words: int = 300) -> str:
+    """按近似齐普夫分布抽词，并混入少量词表外的单词（每个会话的生词不同）"""
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    picked = rng.choices(vocabulary, weights=weights, k=n_words)
+    for i in range(0, n_words, 25):
+        picked[i] = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(6, 11)))
+    return " ".join(picked)
+
+
+# ---------- 工作进程: 模拟会话 ----------
+
+class Session:
+    """一个模拟的学生会话"""
+    
+    def __init__(self, index: int, rounds: int, think_ms: float, vocabulary: List[str],
+                 results: Dict[str, List[float]], errors: Dict[str, int], exporter):
+        self.rng = random.Random(index)
+        self.rounds = rounds
+        self.think = think_ms / 1000
+        self.vocabulary = vocabulary
+        self.results = results
+        self.errors = errors
+        self.exporter = exporter
+        self.collected: List[str] = []
+    
+    async def timed(self, action: str, coro):
+        start = time.perf_counter()
+        try:
+            await coro
+            self.results[action].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self.errors[action] = self.errors.get(action, 0) + 1
+            if self.errors[action] == 1:
+                print(f"{action} 出错: {e}", file=sys.stderr)
+        await asyncio.sleep(self.rng.uniform(0, self.think))
+    
+    async def run(self):
+        for _ in range(self.rounds):
+            await self.timed("采集", self.collect())
+            await self.timed("提交", self.submit())
+            await self.timed("搜索", self.search())
+            await self.timed("管理", self.manage())
+            await self.timed("背诵", self.review())
+            await self.timed("连连看", self.game())
+            await self.timed("导出PDF", self.export())
+    
+    async def collect(self):
+        """InputPage: 自动选出生词，把文章中的单词按生词/已收集/常见词分类"""
+        from utils.freq_rank import suggest_unknown_words
+        from utils.tokenizer import unique_words
+        from utils.word_filter import known_words
+        
+        text = make_article(self.rng, self.vocabulary)
+        self.collected = suggest_unknown_words(text, "中级")[:SUBMIT_WORDS]
+        known_words.classify(unique_words(text))
+    
+    async def submit(self):
+        """InputPage.on_submit: 逐个查词典并入库（文章中选出的单词不检查识别错误）"""
+        from database import db
+        from utils.executors import run_io
+        from utils.word_filter import known_words
+        from utils.dictionary import dictionary_api
+        
+        def submit_words(words):
+            for word in words:
+                if known_words.is_collected(word):
+                    db.add_word(word)
+                    continue
+                result = dictionary_api.lookup_word(word) or {}
+                db.add_word(word, meaning=result.get('meaning', ''), phonetic=result.get('phonetic', ''),
+                            part_of_speech=result.get('part_of_speech', ''))
+        
+        await run_io(db.sync_external_changes)
+        await run_io(submit_words, self.collected)
+    
+    async def search(self):
+        """ManagePage: 搜索框补全和按页搜索"""
+        from database import db
+        from utils.executors import run_io
+        from utils.prefix_index import word_completer
+        
+        word = self.rng.choice(self.vocabulary[:3000])
+        prefix = word[:3]
+        word_completer.complete(prefix)
+        await run_io(db.get_words_page, "alphabetical", None, 50, prefix)
+    
+    async def manage(self):
+        """ManagePage: 打开管理页，读取第一页和单词总数"""
+        from database import db
+        from utils.executors import run_io
+        
+        sort_by = self.rng.choice(["alphabetical", "selection_desc", "print_asc"])
+        await run_io(db.get_words_page, sort_by, None, 50)
+        await run_io(db.count_words)
+    
+    async def review(self):
+        """ReviewPage: 随机取单词背诵，完成后记录背诵次数"""
+        from database import db
+        from utils.executors import run_io
+        
+        words = await run_io(db.get_words_for_review, "random", REVIEW_WORDS)
+        await run_io(db.increment_recitation_count, [w['id'] for w in words])
+    
+    async def game(self):
+        """GamePage: 随机取有含义的单词配对，完成后记录背诵次数"""
+        from database import db
+        from utils.executors import run_io
+        
+        words = [w for w in await run_io(db.get_all_words, "random") if w.get('meaning')]
+        pairs = self.rng.sample(words, min(GAME_PAIRS, len(words)))
+        await run_io(db.increment_recitation_count, [w['id'] for w in pairs])
+    
+    async def export(self):
+        """ManagePage: 导出PDF（export_jobs 线程池），等待生成完成"""
+        from database import db
+        from export_jobs import DONE
+        from utils.executors import run_io
+        
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        
+        def on_finish(job):
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(job))
+        
+        words = await run_io(db.get_words_for_review, "random", EXPORT_WORDS)
+        self.exporter.submit(words, on_finish=on_finish)
+        job = await done
+        if job.status != DONE:
+            raise RuntimeError(job.message)
+
+
+async def _measure_loop_lag(samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, (time.perf_counter() - start - LAG_INTERVAL) * 1000))
+
+
+def run_worker(sessions: int, first_index: int, rounds: int, think_ms: float, output_dir: str) -> Dict:
+    """在当前进程中运行一组会话（工作进程）"""
+    from export_jobs import ExportJobManager
+    from pdf_generator import pdf_generator
+    from utils.word_filter import load_frequency_list, known_words
+    from utils.prefix_index import word_completer
+    
+    vocabulary = load_frequency_list()
+    # 预热: 加载索引和字体，不计入延迟（网页模式下由第一个用户承担）
+    known_words.classify(["the"])
+    word_completer.complete("th")
+    pdf_generator.ensure_font()
+    
+    results = {action: [] for action in ACTIONS + [LOOP_LAG]}
+    errors: Dict[str, int] = {}
+    exporter = ExportJobManager(output_dir=output_dir)
+    
+    async def main():
+        stop = asyncio.Event()
+        lag = asyncio.ensure_future(_measure_loop_lag(results[LOOP_LAG], stop))
+        await asyncio.gather(*(
+            Session(first_index + i, rounds, think_ms, vocabulary, results, errors, exporter).run()
+            for i in range(sessions)
+        ))
+        stop.set()
+        await lag
+    
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    exporter.shutdown(cancel=False)
+    
+    return {
+        "latencies": results,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "rss_mb": current_rss_mb(),
+        "peak_rss_mb": max(peak_rss_mb(), current_rss_mb()),
+    }
+
+
+# ---------- 主进程 ----------
+
+def run_level(sessions: int, workers: int, args, env: Dict[str, str], output_dir: str) -> Dict:
+    """用 workers 个工作进程同时运行 sessions 个会话，合并结果"""
+    procs = []
+    first = 0
+    for w in range(workers):
+        count = sessions // workers + (1 if w < sessions % workers else 0)
+        if not count:
+            continue
+        procs.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--sessions", str(count), "--first-index", str(first), "--rounds", str(args.rounds),
+             "--think-ms", str(args.think_ms), "--output-dir", output_dir, "--json"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=ROOT_DIR, env=env,
+        ))
+        first += count
+    
+    merged = {"latencies": {action: [] for action in ACTIONS + [LOOP_LAG]}, "errors": {},
+              "elapsed_s": 0.0, "rss_mb": 0.0, "peak_rss_mb": 0.0, "failed": []}
+    for proc in procs:
+        stdout, stderr = proc.communicate()
+        lines = stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            merged["failed"].append((stderr.strip().splitlines() or ["工作进程无输出"])[-1])
+            continue
+        result = json.loads(lines[-1])
+        for action, values in result["latencies"].items():
+            merged["latencies"][action].extend(values)
+        for action, count in result["errors"].items():
+            merged["errors"][action] = merged["errors"].get(action, 0) + count
+        merged["elapsed_s"] = max(merged["elapsed_s"], result["elapsed_s"])
+        merged["rss_mb"] += result["rss_mb"]
+        merged["peak_rss_mb"] += result["peak_rss_mb"]
+    return merged
+
+
+def report_level(sessions: int, workers: int, result: Dict) -> Dict:
+    """打印一个会话数的结果，返回汇总"""
+    latencies = result["latencies"]
+    total_actions = sum(len(latencies[action]) for action in ACTIONS)
+    elapsed = result["elapsed_s"] or 1.0
+    print(f"会话数 {sessions}（{workers} 个工作进程），用时 {elapsed:.1f}s，"
+          f"完成 {total_actions} 个动作（{total_actions / elapsed:.1f} 个/秒）")
+    for message in result["failed"]:
+        print(f"  工作进程失败: {message}")
+    
+    rows = []
+    for action in ACTIONS + [LOOP_LAG]:
+        values = latencies[action]
+        rows.append([action, len(values), percentile(values, 50), percentile(values, 95),
+                     percentile(values, 99), max(values) if values else 0.0, result["errors"].get(action, 0)])
+    print_table(["动作", "次数", "p50 ms", "p95 ms", "p99 ms", "最大 ms", "出错"], rows)
+    print(f"工作进程内存: 结束时 {result['rss_mb']:.1f}MB，峰值 {result['peak_rss_mb']:.1f}MB"
+          f"（每个会话约 {result['peak_rss_mb'] / max(1, sessions):.1f}MB）")
+    print()
+    
+    worst = max(ACTIONS, key=lambda action: percentile(latencies[action], 95))
+    return {
+        "sessions": sessions,
+        "throughput": total_actions / elapsed,
+        "worst_action": worst,
+        "worst_p95": percentile(latencies[worst], 95),
+        "lag_p95": percentile(latencies[LOOP_LAG], 95),
+        "peak_rss_mb": result["peak_rss_mb"],
+        "errors": sum(result["errors"].values()) + len(result["failed"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发会话压力测试")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 20, 40], help="同时在线的会话数，可以给多个")
+    parser.add_argument("--rounds", type=int, default=3, help="每个会话重复的轮数")
+    parser.add_argument("--workers", type=int, default=1, help="工作进程数（与 --web --workers 相同）")
+    parser.add_argument("--think-ms", type=float, default=200, help="动作之间的最长随机停顿（毫秒）")
+    parser.add_argument("--dict-latency-ms", type=float, default=80, help="模拟词典服务每次查询的延迟（毫秒）")
+    parser.add_argument("--pdf-cache", action="store_true", help="使用PDF缓存")
+    parser.add_argument("--target-p95", type=float, default=1000, help="计算容量时每个动作 p95 的上限（毫秒）")
+    parser.add_argument("--max-p95", type=float, help="任一动作的 p95 超过此值（毫秒）或有动作出错时返回非零退出码")
+    # 工作进程参数
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--first-index", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--output-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        result = run_worker(args.sessions[0], args.first_index, args.rounds, args.think_ms, args.output_dir)
+        print(json.dumps(result))
+        return
+    
+    tmp_dir = tempfile.mkdtemp(prefix="vocab-loadtest-")
+    server = start_dictionary_server(args.dict_latency_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        db_path = os.path.join(tmp_dir, "vocabulary.db")
+        seed_database(db_path)
+        env = os.environ.copy()
+        env.update({
+            "VOCAB_DB_PATH": db_path,
+            "VOCAB_YOUDAO_URL": f"{base_url}/suggest",
+            "VOCAB_FREE_DICTIONARY_URL": f"{base_url}/entries",
+        })
+        if not args.pdf_cache:
+            env["VOCAB_PDF_CACHE_MB"] = "0"
+        
+        print(f"CPU核数: {os.cpu_count()}，每个会话 {args.rounds} 轮，动作间停顿 0~{args.think_ms:.0f}ms，"
+              f"词典延迟 {args.dict_latency_ms:.0f}ms，PDF缓存: {'开' if args.pdf_cache else '关'}")
+        print()
+        
+        summary = []
+        for sessions in args.sessions:
+            output_dir = os.path.join(tmp_dir, f"output_{sessions}")
+            result = run_level(sessions, args.workers, args, env, output_dir)
+            summary.append(report_level(sessions, args.workers, result))
+            shutil.rmtree(output_dir, ignore_errors=True)
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    rows = []
+    capacity = 0
+    for item in summary:
+        ok = item["worst_p95"] <= args.target_p95 and not item["errors"]
+        if ok:
+            capacity = max(capacity, item["sessions"])
+        rows.append([item["sessions"], item["throughput"], f"{item['worst_action']} {item['worst_p95']:.0f}",
+                     item["lag_p95"], item["peak_rss_mb"], "达标" if ok else "超出"])
+    print(f"汇总（目标: 每个动作 p95 ≤ {args.target_p95:.0f}ms），模拟词典共收到 {_DictionaryHandler.requests} 次查询")
+    print()
+    print_table(["会话数", "动作/秒", "最慢动作 p95 ms", "循环延迟 p95 ms", "峰值内存MB", "结果"], rows)
+    print()
+    print(f"容量: {capacity} 个会话" if capacity else "容量: 测试的会话数都没有达标")
+    
+    if args.max_p95 is not None:
+        failed = [item for item in summary if item["worst_p95"] > args.max_p95 or item["errors"]]
+        if failed:
+            for item in failed:
+                print(f"不通过: {item['sessions']} 个会话时 {item['worst_action']} p95 "
+                      f"{item['worst_p95']:.0f}ms（上限 {args.max_p95:.0f}ms），出错 {item['errors']} 次")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+OCR后端基准测试 - 比较各后端在示例图片上的延迟、内存和识别一致性
+
+用法:
+    python benchmarks/ocr_backends.py                      # 测试全部后端
+    python benchmarks/ocr_backends.py --backend onnx       # 只测试一个后端
+    python benchmarks/ocr_backends.py --repeat 5
+
+每个后端在独立子进程中运行。没有人工标注的标准答案，
+识别准确度以 float32 的 EasyOCR（easyocr-fp32）的结果为参照，
+统计单词的召回率和精确率。
+"""
+
+import os
+import json
+import time
+import argparse
+
+from harness import SAMPLE_IMAGES, timeit, current_rss_mb, peak_rss_mb, run_isolated, print_table
+
+from ocr_handler import OCRHandler, OCR_BACKENDS
+from utils.tokenizer import unique_words
+
+REFERENCE_BACKEND = "easyocr-fp32"
+
+
+def words_of(text: str) -> set:
+    return set(unique_words(text))
+
+
+def run_backend(name: str, repeat: int) -> dict:
+    """在当前进程中测试一个后端"""
+    rss_before = current_rss_mb()
+    handler = OCRHandler(backend=name)
+    
+    start = time.perf_counter()
+    available, error = handler.is_available()
+    load_ms = (time.perf_counter() - start) * 1000
+    if not available:
+        return {"backend": name, "error": error}
+    if handler.backend.name != name:
+        return {"backend": name, "error": f"加载失败，已退回 {handler.backend.name}"}
+    
+    images = {}
+    for path in SAMPLE_IMAGES:
+        stats = timeit(lambda: handler.recognize_image(path), repeat=repeat)
+        success, text = stats["result"]
+        images[os.path.basename(path)] = {
+            "median_ms": stats["median_ms"],
+            "words": sorted(words_of(text)) if success else [],
+        }
+    
+    return {
+        "backend": name,
+        "load_ms": load_ms,
+        "rss_mb": current_rss_mb() - rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "images": images,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR后端基准测试")
+    parser.add_argument("--backend", help="只测试指定后端: " + ", ".join(OCR_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="以JSON输出（供子进程调用）")
+    args = parser.parse_args()
+    
+    if args.backend:
+        result = run_backend(args.backend, args.repeat)
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    
+    results = {}
+    for name in OCR_BACKENDS:
+        print(f"正在测试 {name} ...", flush=True)
+        results[name] = run_isolated(__file__, ["--backend", name, "--repeat", str(args.repeat)])
+    
+    reference = results.get(REFERENCE_BACKEND, {}).get("images", {})
+    headers = ["后端", "图片", "加载ms", "识别ms", "内存MB", "峰值MB", "召回%", "精确%"]
+    rows = []
+    for name, result in results.items():
+        if "error" in result:
+            rows.append([name, "-", "-", "-", "-", "-", "-", result["error"]])
+            continue
+        for image, stats in result["images"].items():
+            found = set(stats["words"])
+            expected = set(reference.get(image, {}).get("words", []))
+            recall = 100.0 * len(found & expected) / len(expected) if expected else 0.0
+            precision = 100.0 * len(found & expected) / len(found) if found else 0.0
+            rows.append([
+                name, image, result["load_ms"], stats["median_ms"],
+                result["rss_mb"], result["peak_rss_mb"], recall, precision,
+            ])
+    
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
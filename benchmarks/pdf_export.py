@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+PDF导出基准测试 - 比较原来的 platypus 表格导出与流式绘制的耗时和内存
+
+用法:
+    python benchmarks/pdf_export.py                          # 1千、1万、10万个单词
+    python benchmarks/pdf_export.py --sizes 1000 10000
+    python benchmarks/pdf_export.py --legacy-max 10000       # 原来的实现只测到1万个单词（默认）
+
+每一项在独立子进程中运行，内存为子进程的峰值常驻内存。测试数据写入临时数据库，
+流式绘制分别测试"传入单词列表"和"直接传入数据库游标"两种用法。
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from harness import peak_rss_mb, current_rss_mb, run_isolated, print_table
+
+MODES = ["legacy", "stream_list", "stream_cursor"]
+
+
+def make_db(path: str, size: int):
+    """生成测试数据库"""
+    from database import VocabularyDB
+    
+    rng = random.Random(size)
+    db = VocabularyDB(db_path=path)
+    rows = []
+    for i in range(size):
+        word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 12))) + str(i)
+        rows.append((word, "n. 测试释义，" * rng.randint(1, 6), f"/{word[:4]}/", "n."))
+    db.conn.executemany(
+        "INSERT INTO words (word, meaning, phonetic, part_of_speech) VALUES (?, ?, ?, ?)", rows
+    )
+    db.conn.commit()
+    return db
+
+
+def legacy_generate(words, output_path, font_name, title="陌生单词表"):
+    """原来的 generate_vocabulary_pdf（platypus 表格，先生成全部表格数据）"""
+    from datetime import datetime
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    
+    doc = SimpleDocTemplate(output_path, pagesize=A4, rightMargin=20*mm, leftMargin=20*mm,
+                            topMargin=20*mm, bottomMargin=20*mm)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, alignment=TA_CENTER,
+                                 spaceAfter=20, fontName=font_name)
+    normal_style = ParagraphStyle('Normal', parent=styles['Normal'], fontSize=10, fontName=font_name, leading=14)
+    story = [Paragraph(title, title_style)]
+    date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
+    story.append(Paragraph(f"生成时间: {date_str}  共 {len(words)} 个单词", normal_style))
+    story.append(Spacer(1, 10*mm))
+    
+    table_data = [['序号', '单词', '音标', '词性', '含义']]
+    for idx, w in enumerate(words, 1):
+        meaning = w.get('meaning') or ''
+        if len(meaning) > 35:
+            meaning = meaning[:32] + "..."
+        table_data.append([str(idx), w.get('word', ''), w.get('phonetic') or '',
+                           w.get('part_of_speech') or '', meaning])
+    
+    col_widths = [15*mm, 35*mm, 30*mm, 15*mm, 85*mm]
+    table = Table(table_data, colWidths=col_widths)
+    style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
+    ])
+    table.setStyle(style)
+    per_page = 30
+    if len(words) > per_page:
+        for i in range(0, len(table_data), per_page):
+            if i > 0:
+                story.append(PageBreak())
+            page_data = table_data[i:i+per_page]
+            if i > 0:
+                page_data = [['序号', '单词', '音标', '词性', '含义']] + page_data[1:]
+            pt = Table(page_data, colWidths=col_widths)
+            # 原来的代码为 pt.setStyle(table.getStyle())，reportlab 中没有 getStyle()，超过30个单词时导出失败
+            pt.setStyle(style)
+            story.append(pt)
+    else:
+        story.append(table)
+    doc.build(story)
+
+
+def run_mode(mode: str, size: int) -> dict:
+    """在当前进程中测试一项"""
+    from pdf_generator import pdf_generator
+    
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "bench.db")
+    output_path = os.path.join(tmp_dir, "out.pdf")
+    try:
+        db = make_db(db_path, size)
+        pdf_generator.ensure_font()
+        rss_before = current_rss_mb()
+        
+        start = time.perf_counter()
+        if mode == "legacy":
+            legacy_generate(db.get_all_words(), output_path, pdf_generator.font_name)
+        elif mode == "stream_list":
+            success, msg = pdf_generator.generate_vocabulary_pdf(db.get_all_words(), output_path)
+            if not success:
+                return {"error": msg}
+        else:
+            success, msg = pdf_generator.generate_vocabulary_pdf(
+                db.iter_words(), output_path, total=db.count_words()
+            )
+            if not success:
+                return {"error": msg}
+        elapsed = time.perf_counter() - start
+        
+        result = {
+            "seconds": elapsed,
+            "peak_rss_mb": peak_rss_mb(),
+            "extra_rss_mb": peak_rss_mb() - rss_before,
+            "file_mb": os.path.getsize(output_path) / 1024 / 1024,
+        }
+        db.close()
+        return result
+    finally:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF导出基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=10000, help="原来的实现最多测试的单词数")
+    parser.add_argument("--mode", choices=MODES, help="只测试一项（供子进程调用）")
+    parser.add_argument("--size", type=int, help="单词数（供子进程调用）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出（供子进程调用）")
+    args = parser.parse_args()
+    
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.size)))
+        return
+    
+    script = os.path.abspath(__file__)
+    rows = []
+    for size in args.sizes:
+        for mode in MODES:
+            if mode == "legacy" and size > args.legacy_max:
+                continue
+            print(f"正在测试 {mode} {size} ...", flush=True)
+            r = run_isolated(script, ["--mode", mode, "--size", str(size)])
+            if "error" in r:
+                rows.append([mode, size, r["error"], "", "", ""])
+            else:
+                rows.append([mode, size, r["seconds"], r["peak_rss_mb"], r["extra_rss_mb"], r["file_mb"]])
+    
+    print()
+    print_table(["实现", "单词数", "耗时s", "峰值内存MB", "导出时增加MB", "文件MB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+PDF版式基准测试 - 各版式每页的绘制耗时，与原来的 platypus 表格比较
+
+用法:
+    python benchmarks/pdf_layout_speed.py                         # 默认 3000 个单词
+    python benchmarks/pdf_layout_speed.py --words 10000
+    python benchmarks/pdf_layout_speed.py --font C:/Windows/Fonts/simhei.ttf
+
+默认使用 pdf_generator 注册的字体（没有中文字体时为 Helvetica），
+--font 可指定一个 TrueType 字体，测试实际导出时的 TTF 子集化路径。
+"""
+
+import os
+import re
+import random
+import argparse
+import tempfile
+
+from harness import timeit, print_table
+from pdf_export import legacy_generate
+
+from pdf_generator import pdf_generator
+from pdf_layouts import LAYOUT_OPTIONS
+
+
+def make_words(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    words = []
+    for i in range(n):
+        word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 12)))
+        words.append({
+            "id": i + 1,
+            "word": word,
+            "phonetic": f"/{word[:5]}/",
+            "part_of_speech": "n.",
+            "meaning": "测试释义，a test meaning; " * rng.randint(1, 4),
+            "example_sentence": f"This is an example sentence with {word}." if i % 2 else "",
+        })
+    return words
+
+
+def count_pages(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(re.findall(rb"/Type\s*/Page\b", f.read()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF版式基准测试")
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--font", help="TrueType 字体文件")
+    args = parser.parse_args()
+    
+    pdf_generator.ensure_font()
+    if args.font:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        pdfmetrics.registerFont(TTFont("BenchFont", args.font))
+        pdf_generator.font_name = "BenchFont"
+    font = pdf_generator.font_name
+    
+    words = make_words(args.words)
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    rows = []
+    try:
+        cases = [("platypus 表格（原来的实现）", lambda: legacy_generate(words, path, font))]
+        for name, label in LAYOUT_OPTIONS:
+            cases.append((f"{label}（{name}）",
+                          lambda name=name: pdf_generator.generate_vocabulary_pdf(words, path, layout=name)))
+        
+        baseline = None
+        for label, func in cases:
+            stats = timeit(func, repeat=args.repeat)
+            pages = count_pages(path)
+            per_page = stats["median_ms"] / pages
+            if baseline is None:
+                baseline = per_page
+            rows.append([label, pages, stats["median_ms"], per_page, baseline / per_page,
+                         stats["median_ms"] * 1000 / args.words])
+    finally:
+        os.remove(path)
+    
+    print(f"单词: {args.words} 个，字体: {font}")
+    print()
+    print_table(["版式", "页数", "总耗时ms", "每页ms", "每页加速", "每千词ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+拼写纠正基准测试 - 模拟OCR错误，统计纠正的耗时和准确率
+
+用法:
+    python benchmarks/spell.py
+    python benchmarks/spell.py --samples 5000
+
+从常用词表中抽取单词，随机替换、删除、插入或交换一个字母模拟OCR错误，
+统计每个单词的检查耗时，以及纠正正确、纠正错误、未纠正（保持原样）、被丢弃的比例。
+"""
+
+import time
+import random
+import argparse
+
+from harness import percentile, print_table
+
+from utils.word_filter import load_frequency_list
+from utils.spell import spell_index, CORRECTED, GARBAGE, OK
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """随机制造一个字母的错误"""
+    i = rng.randrange(len(word))
+    op = rng.choice(("replace", "delete", "insert", "swap"))
+    if op == "replace":
+        return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+    if op == "delete":
+        return word[:i] + word[i + 1:]
+    if op == "insert":
+        return word[:i] + rng.choice(LETTERS) + word[i:]
+    if i == len(word) - 1:
+        i -= 1
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="拼写纠正基准测试")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    words = [w for w in load_frequency_list() if len(w) >= 5 and w.isalpha()]
+    
+    start = time.perf_counter()
+    spell_index.is_known("the")
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    counts = {"correct": 0, "wrong": 0, "kept": 0, "known": 0, "dropped": 0}
+    known_times = []
+    typo_times = []
+    for _ in range(args.samples):
+        word = rng.choice(words)
+        
+        start = time.perf_counter()
+        spell_index.check(word)
+        known_times.append((time.perf_counter() - start) * 1e6)
+        
+        typo = misspell(word, rng)
+        start = time.perf_counter()
+        status, fixed = spell_index.check(typo)
+        typo_times.append((time.perf_counter() - start) * 1e6)
+        
+        if status == CORRECTED:
+            counts["correct" if fixed == word else "wrong"] += 1
+        elif status == GARBAGE:
+            counts["dropped"] += 1
+        elif status == OK:
+            # 错词恰好是另一个真实单词（如 form -> from），无法判断
+            counts["known"] += 1
+        else:
+            counts["kept"] += 1
+    
+    print(f"索引创建: {build_ms:.0f} ms，样本: {args.samples} 个")
+    print()
+    print_table(["单词类型", "p50 us", "p95 us", "p99 us"], [
+        ["正确单词", percentile(known_times, 50), percentile(known_times, 95), percentile(known_times, 99)],
+        ["错一个字母", percentile(typo_times, 50), percentile(typo_times, 95), percentile(typo_times, 99)],
+    ])
+    print()
+    print_table(["结果", "数量", "比例%"], [
+        [name, count, count * 100 / args.samples] for name, count in counts.items()
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准测试 - 导入耗时、首屏耗时和启动时加载的重量级模块
+
+用法:
+    python benchmarks/startup.py                    # 测量并与预算比较
+    python benchmarks/startup.py --check            # 超出预算时返回非零退出码（用于CI）
+    python benchmarks/startup.py --update-budget    # 用本次测量结果更新预算
+
+每项在新的子进程中测量:
+    - 导入耗时: python -X importtime -c "import <模块>"，取模块的累计导入时间
+    - 首屏耗时: 从子进程启动到导入 main、创建首页界面（App.build_home，包括打开数据库和统计查询）
+    - 重量级模块: 导入后 sys.modules 中不应出现 reportlab、EasyOCR/torch、PyMuPDF 等，
+      它们应在第一次导出、识别、读取文档时才加载
+
+预算保存在 benchmarks/startup_budget.json 中，耗时超过预算或启动时加载了重量级模块都算不通过。
+main 需要安装 flet，未安装时跳过 main 和首屏的测量。
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+from harness import ROOT_DIR, print_table
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# 测量导入耗时的模块: main 是完整的启动路径，其余是启动时导入的公共模块
+MODULES = ["main", "database", "export_jobs", "pdf_generator", "ocr_handler", "utils"]
+
+# 启动时不应加载的模块
+HEAVY_MODULES = ["reportlab", "easyocr", "torch", "numpy", "PIL", "fitz", "pymupdf", "pypdf",
+                 "onnxruntime", "utils.dictionary"]
+
+# 更新预算时在测量值上留的余量（倍数 + 毫秒），导入耗时受磁盘缓存和机器负载影响较大
+BUDGET_HEADROOM = 1.5
+BUDGET_SLACK_MS = 20
+
+_FIRST_FRAME_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+app = main.App()
+app.build_home()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed}))
+"""
+
+_LOADED_SCRIPT = """
+import json, sys
+import {module}
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=ROOT_DIR, timeout=300)
+
+
+def _error(proc: subprocess.CompletedProcess) -> str:
+    return (proc.stderr.strip().splitlines() or ["子进程无输出"])[-1]
+
+
+def import_time_ms(module: str) -> Dict:
+    """
+    用 -X importtime 测量模块的累计导入时间
+    
+    返回:
+        Dict: {"ms", "top": [(模块, 自身耗时ms)]}，失败时为 {"error"}
+    """
+    proc = _run(["-X", "importtime", "-c", f"import {module}"])
+    if proc.returncode != 0:
+        return {"error": _error(proc)}
+    total = None
+    own = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # 表头
+        name = parts[2].strip()
+        own.append((name, self_us / 1000))
+        if name == module:
+            total = cumulative_us / 1000
+    own.sort(key=lambda item: -item[1])
+    return {"ms": total or 0.0, "top": own[:5]}
+
+
+def heavy_modules_loaded(module: str) -> Optional[List[str]]:
+    """导入模块后已加载的重量级模块，失败时返回 None"""
+    proc = _run(["-c", _LOADED_SCRIPT.format(module=module, heavy=HEAVY_MODULES)])
+    if proc.returncode != 0:
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def first_frame_ms() -> Dict:
+    """
+    首屏耗时
+    
+    返回:
+        Dict: {"process_ms": 从启动子进程开始, "ms": 从导入 main 开始}，失败时为 {"error"}
+    """
+    start = time.perf_counter()
+    proc = _run(["-c", _FIRST_FRAME_SCRIPT])
+    process_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        return {"error": _error(proc)}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    return result
+
+
+def load_budget() -> Dict:
+    try:
+        with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"import_ms": {}, "first_frame_ms": None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量次数（取中位数）")
+    parser.add_argument("--check", action="store_true", help="超出预算时返回非零退出码")
+    parser.add_argument("--update-budget", action="store_true", help="用本次测量结果更新预算")
+    args = parser.parse_args()
+    
+    budget = load_budget()
+    failures = []
+    rows = []
+    measured = {}
+    
+    for module in MODULES:
+        results = [import_time_ms(module) for _ in range(args.repeat)]
+        errors = [r["error"] for r in results if "error" in r]
+        if errors:
+            rows.append([module, "-", "-", "-", f"跳过: {errors[0]}"])
+            continue
+        ms = statistics.median(r["ms"] for r in results)
+        measured[module] = ms
+        limit = budget.get("import_ms", {}).get(module)
+        heavy = heavy_modules_loaded(module) or []
+        status = "通过"
+        if limit is not None and ms > limit:
+            status = "超出预算"
+            failures.append(f"导入 {module} 用时 {ms:.1f}ms，预算 {limit}ms")
+        if heavy:
+            status = "加载了重量级模块"
+            failures.append(f"导入 {module} 时加载了: {', '.join(heavy)}")
+        slowest = ", ".join(f"{name} {t:.1f}" for name, t in results[-1]["top"][:3])
+        rows.append([module, ms, limit if limit is not None else "-", slowest, status])
+    
+    print(f"导入耗时（ms，{args.repeat} 次的中位数）")
+    print()
+    print_table(["模块", "耗时", "预算", "自身耗时最多的模块", "结果"], rows)
+    print()
+    
+    frames = [first_frame_ms() for _ in range(args.repeat)]
+    errors = [f["error"] for f in frames if "error" in f]
+    frame_ms = None
+    if errors:
+        print(f"首屏耗时: 跳过（{errors[0]}）")
+    else:
+        frame_ms = statistics.median(f["ms"] for f in frames)
+        process_ms = statistics.median(f["process_ms"] for f in frames)
+        limit = budget.get("first_frame_ms")
+        print(f"首屏耗时: {frame_ms:.1f}ms（含解释器启动 {process_ms:.1f}ms），预算 {limit if limit else '-'}ms")
+        if limit and frame_ms > limit:
+            failures.append(f"首屏用时 {frame_ms:.1f}ms，预算 {limit}ms")
+    
+    if args.update_budget:
+        import_budget = budget.setdefault("import_ms", {})
+        for module, ms in measured.items():
+            import_budget[module] = math.ceil(ms * BUDGET_HEADROOM + BUDGET_SLACK_MS)
+        if frame_ms is not None:
+            budget["first_frame_ms"] = math.ceil(frame_ms * BUDGET_HEADROOM + BUDGET_SLACK_MS)
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n已更新预算: {BUDGET_PATH}")
+        return
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"不通过: {failure}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+分词基准测试 - 比较流式分词与原来基于 re.findall 的单词提取
+
+用法:
+    python benchmarks/tokenizer.py             # 默认 1MB 文章
+    python benchmarks/tokenizer.py --size 10   # 10MB
+
+原来的三个提取函数（OCRHandler.extract_english_words、extract_all_words、
+InputPage.extract_words）已改为调用 utils.tokenizer，这里保留它们原来的实现作为对照。
+"""
+
+import os
+import re
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from harness import timeit, print_table
+
+from utils.dictionary import LocalDictionary
+from utils.tokenizer import STOPWORDS, WordStats, unique_words
+
+
+# ---------- 原来的实现 ----------
+
+def legacy_extract_english_words(text):
+    words = re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text)
+    return sorted(set(word.lower() for word in words if len(word) > 1))
+
+
+def legacy_extract_words(text):
+    words = re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text)
+    seen = set()
+    result = []
+    for w in words:
+        w = w.lower()
+        if w not in seen and len(w) > 1:
+            seen.add(w)
+            result.append(w)
+    return result
+
+
+def legacy_extract_all_words(text):
+    words_info = []
+    for word in re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text):
+        if len(word) > 1:
+            words_info.append({"text": word, "type": "english", "lower": word.lower()})
+    for word in re.findall(r"[\u4e00-\u9fff]+", text):
+        words_info.append({"text": word, "type": "chinese", "lower": word})
+    seen = set()
+    unique = []
+    for w in words_info:
+        if w["lower"] not in seen:
+            seen.add(w["lower"])
+            unique.append(w)
+    return unique
+
+
+# ---------- 测试数据 ----------
+
+def make_article(size_mb: float, seed: int = 42) -> str:
+    """生成指定大小的英文文章（常用词为主，夹杂少量生僻词和标点）"""
+    rng = random.Random(seed)
+    common = list(LocalDictionary.COMMON_WORDS) + sorted(STOPWORDS)
+    rare = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+            for _ in range(20000)]
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    length = 0
+    while length < target:
+        sentence = [rng.choice(rare) if rng.random() < 0.05 else rng.choice(common)
+                    for _ in range(rng.randint(8, 20))]
+        sentence[0] = sentence[0].capitalize()
+        line = " ".join(sentence) + rng.choice([". ", ", ", "; ", ".\n"])
+        parts.append(line)
+        length += len(line)
+    return "".join(parts)
+
+
+def measure(func, repeat: int):
+    """返回 (耗时统计, 峰值额外内存MB)"""
+    stats = timeit(func, repeat=repeat, warmup=0)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分词基准测试")
+    parser.add_argument("--size", type=float, default=1.0, help="文章大小（MB），默认1")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    text = make_article(args.size)
+    
+    # 流式读取文件的场景
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    
+    def stream_file():
+        stats = WordStats(stopwords=STOPWORDS)
+        with open(path, "r", encoding="utf-8") as f:
+            stats.update(iter(lambda: f.read(64 * 1024), ""))
+        return stats
+    
+    cases = [
+        ("legacy extract_english_words", lambda: legacy_extract_english_words(text)),
+        ("legacy InputPage.extract_words", lambda: legacy_extract_words(text)),
+        ("legacy extract_all_words", lambda: legacy_extract_all_words(text)),
+        ("unique_words(text)", lambda: unique_words(text)),
+        ("WordStats(text)", lambda: WordStats().update(text)),
+        ("WordStats(file stream, stopwords)", stream_file),
+    ]
+    
+    print(f"文章大小: {len(text) / 1024 / 1024:.1f} MB")
+    rows = []
+    try:
+        for name, func in cases:
+            stats, peak_mb = measure(func, args.repeat)
+            rows.append([name, stats["median_ms"], peak_mb])
+    finally:
+        os.remove(path)
+    
+    print()
+    print_table(["实现", "耗时ms", "额外内存峰值MB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+生词推荐基准测试 - 按词频从文章中选出生词的耗时
+
+用法:
+    python benchmarks/word_suggest.py                # 默认 5000 词的文章
+    python benchmarks/word_suggest.py --words 50000
+
+同时比较排名索引的打开方式: 从词表重新编译、mmap 打开已编译的文件、
+以及直接把词表读成字典（不使用索引文件）。
+"""
+
+import os
+import random
+import argparse
+import tempfile
+
+from harness import timeit, print_table
+
+from utils.word_filter import load_frequency_list
+from utils.freq_rank import LEVELS, RankIndex, build_rank_index, rank_index, suggest_unknown_words
+
+
+def make_article(words: list, n_words: int, seed: int = 42) -> str:
+    """按近似齐普夫分布从词表中抽词，并混入少量词表外的单词"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    rare = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(6, 12)))
+            for _ in range(300)]
+    picked = rng.choices(words, weights=weights, k=n_words)
+    for i in range(0, n_words, 40):
+        picked[i] = rng.choice(rare)
+    return " ".join(picked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生词推荐基准测试")
+    parser.add_argument("--words", type=int, default=5000, help="文章单词数，默认5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    words = load_frequency_list()
+    text = make_article(words, args.words)
+    
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    try:
+        build_rank_index(words, path)
+        
+        def open_mmap():
+            index = RankIndex(path=path)
+            len(index)
+            index.close()
+        
+        def load_dict():
+            return {w: i + 1 for i, w in enumerate(load_frequency_list())}
+        
+        rows = [
+            ["编译索引文件", timeit(lambda: build_rank_index(load_frequency_list(), path),
+                              repeat=args.repeat)["median_ms"]],
+            ["mmap 打开索引", timeit(open_mmap, repeat=args.repeat)["median_ms"]],
+            ["读取词表到字典", timeit(load_dict, repeat=args.repeat)["median_ms"]],
+        ]
+    finally:
+        os.remove(path)
+    
+    len(rank_index)
+    for name, threshold in LEVELS:
+        stats = timeit(lambda: suggest_unknown_words(text, name), repeat=args.repeat)
+        rows.append([f"推荐生词（{name}，前{threshold}词）", stats["median_ms"], len(stats["result"])])
+    
+    print(f"词表: {len(words)} 词，文章: {args.words} 词")
+    print()
+    print_table(["操作", "耗时ms", "生词数"], [row + [""] * (3 - len(row)) for row in rows])
+
+
+if __name__ == "__main__":
+    main()
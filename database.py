@@ -6,31 +6,92 @@
 
 import sqlite3
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 
-# 数据库文件路径，存放在项目目录下
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vocabulary.db")
+from utils.lazy import LazyObject
+
+# 数据库文件路径，默认存放在项目目录下，可通过环境变量 VOCAB_DB_PATH 指定其他文件
+DB_PATH_ENV = "VOCAB_DB_PATH"
+DB_PATH = os.environ.get(DB_PATH_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), "vocabulary.db")
+
+# 数据库被其他连接（多进程网页模式中的其他工作进程）锁住时最多等待的时间（秒）
+BUSY_TIMEOUT = 10
+
+# 排序方式对应的 ORDER BY 子句
+ORDER_CLAUSES = {
+    "alphabetical": "ORDER BY word ASC",
+    "selection_desc": "ORDER BY selection_count DESC, word ASC",
+    "print_asc": "ORDER BY print_count ASC, word ASC",
+}
 
 
 class VocabularyDB:
     """单词数据库管理类"""
     
-    def __init__(self):
-        """初始化数据库连接，如果表不存在则创建"""
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化数据库连接，如果表不存在则创建
+        
+        参数:
+            db_path: 数据库文件路径，默认为 DB_PATH（项目目录下的 vocabulary.db）
+        """
+        self.db_path = db_path or DB_PATH
         self.conn = None
-        self.cursor = None
+        self._local = threading.local()  # 每个线程自己的游标
+        # 写事务锁：事务属于连接而不是游标，一个线程的 commit/rollback 会提交或撤销其他线程写了一半的数据，
+        # 所以同一时间只能有一个线程在写
+        self._write_lock = threading.RLock()
+        # 数据变化计数（每次写入加1），用于判断缓存的数据是否需要刷新
+        self.change_count = 0
+        self._listeners = []
+        self._data_version = None  # 最近一次看到的 PRAGMA data_version，用于发现其他进程的修改
         self._connect()
         self._create_tables()
     
     def _connect(self):
         """连接到SQLite数据库"""
-        self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        self.conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
         # 启用外键约束
         self.conn.execute("PRAGMA foreign_keys = ON")
         # 设置返回字典格式的结果
         self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+        self._local = threading.local()
+        self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """
+        当前线程的游标
+        
+        界面和后台线程池会同时调用数据库，共用一个游标时一个线程的查询结果会被另一个线程的查询覆盖，
+        所以每个线程使用自己的游标（连接仍然共用，sqlite3 会串行执行各个语句）。
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+        return cursor
+    
+    def enable_wal(self) -> bool:
+        """
+        切换到 WAL 日志模式（保存在数据库文件中，之后的连接都使用 WAL）
+        
+        WAL 模式下读取不会被写入阻塞，多个进程可以同时读取，写入依次进行。
+        数据库文件在网络共享目录中时不能使用 WAL。
+        
+        返回:
+            bool: 是否成功
+        """
+        try:
+            mode = self.conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            # WAL 模式下每次提交不需要立即同步到磁盘，断电时最多丢失最近的提交，不会损坏数据库
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            return str(mode).lower() == "wal"
+        except sqlite3.Error as e:
+            print(f"切换WAL模式失败: {e}")
+            return False
     
     def _create_tables(self):
         """创建数据库表结构"""
@@ -47,23 +108,91 @@ class VocabularyDB:
                 print_count INTEGER DEFAULT 0,
                 recitation_count INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 0
             )
         ''')
+        # 旧数据库没有 version 列（单词内容每修改一次加1，PDF缓存用它判断内容是否变化）
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_info(words)").fetchall()}
+        if "version" not in columns:
+            try:
+                self.cursor.execute("ALTER TABLE words ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                # 其他进程已经添加
+                pass
         
         # 创建索引以加快查询速度
         self.cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_word ON words(word)
         ''')
+        # 排序字段加上 word 的联合索引，按页读取时直接从上一页最后一个单词的位置开始，不需要排序
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_selection_count ON words(selection_count DESC)
+            CREATE INDEX IF NOT EXISTS idx_selection_word ON words(selection_count DESC, word ASC)
         ''')
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_print_count ON words(print_count ASC)
+            CREATE INDEX IF NOT EXISTS idx_print_word ON words(print_count ASC, word ASC)
         ''')
+        # 被联合索引代替的旧索引
+        self.cursor.execute("DROP INDEX IF EXISTS idx_selection_count")
+        self.cursor.execute("DROP INDEX IF EXISTS idx_print_count")
         
         self.conn.commit()
     
+    def add_listener(self, callback: Callable):
+        """
+        注册数据变化的监听函数
+        
+        参数:
+            callback: 回调函数 callback(事件, 单词列表)，事件为
+                - "add": 新增单词
+                - "delete": 删除单词
+                - "update": 已有单词的信息或次数发生变化
+                - "reload": 其他进程修改了数据库（单词列表为空），需要重新读取，见 sync_external_changes
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable):
+        """取消注册监听函数"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify(self, event: str, words: List[str]):
+        """通知监听函数（在提交事务之后调用）"""
+        self.change_count += 1
+        if not words:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(event, words)
+            except Exception as e:
+                print(f"数据变化通知失败: {e}")
+    
+    def sync_external_changes(self) -> bool:
+        """
+        检查其他进程（多进程网页模式中的其他工作进程）是否修改了数据库
+        
+        本进程中的修改会直接通知监听函数；其他进程的修改只能通过 PRAGMA data_version 发现，
+        有修改时增加 change_count 并发送 "reload" 事件。单进程运行时总是返回 False。
+        
+        返回:
+            bool: 是否有其他进程的修改
+        """
+        try:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return False
+        if version == self._data_version:
+            return False
+        self._data_version = version
+        self.change_count += 1
+        for callback in list(self._listeners):
+            try:
+                callback("reload", [])
+            except Exception as e:
+                print(f"数据变化通知失败: {e}")
+        return True
+    
     def add_word(self, word: str, meaning: str = "", phonetic: str = "",
                  part_of_speech: str = "", example_sentence: str = "") -> bool:
         """
@@ -83,66 +212,73 @@ class VocabularyDB:
         if not word:
             return False
         
-        try:
-            # 检查单词是否已存在
-            self.cursor.execute("SELECT id FROM words WHERE word = ?", (word,))
-            existing = self.cursor.fetchone()
-            
-            if existing:
-                # 单词已存在，增加选择次数
-                self.cursor.execute(
-                    "UPDATE words SET selection_count = selection_count + 1, updated_at = ? WHERE word = ?",
-                    (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), word)
-                )
-            else:
-                # 插入新单词
-                self.cursor.execute('''
-                    INSERT INTO words (word, meaning, phonetic, part_of_speech, example_sentence)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (word, meaning, phonetic, part_of_speech, example_sentence))
-            
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"数据库错误: {e}")
-            return False
+        with self._write_lock:
+            try:
+                is_new = self._upsert_word(word, meaning, phonetic, part_of_speech, example_sentence)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"数据库错误: {e}")
+                return False
+        self._notify("add" if is_new else "update", [word])
+        return True
     
-    def batch_add_words(self, words: List[str]) -> Tuple[int, int]:
+    def batch_add_words(self, words: List[str], raise_errors: bool = False) -> Tuple[int, int]:
         """
         批量添加单词
         
         参数:
             words: 单词列表
+            raise_errors: 写入失败时回滚后抛出 sqlite3.Error（调用方需要知道是否写入成功时使用）
         
         返回:
-            Tuple[int, int]: (新增数量, 更新数量)
+            Tuple[int, int]: (新增数量, 更新数量)，失败时为 (0, 0)
         """
-        new_count = 0
-        update_count = 0
-        
-        for word in words:
-            word = word.strip().lower()
-            if not word:
-                continue
-            
-            self.cursor.execute("SELECT id FROM words WHERE word = ?", (word,))
-            existing = self.cursor.fetchone()
-            
-            if existing:
-                self.cursor.execute(
-                    "UPDATE words SET selection_count = selection_count + 1 WHERE word = ?",
-                    (word,)
-                )
-                update_count += 1
-            else:
-                self.cursor.execute(
-                    "INSERT INTO words (word) VALUES (?)",
-                    (word,)
-                )
-                new_count += 1
+        new_words = []
+        updated_words = []
         
-        self.conn.commit()
-        return new_count, update_count
+        with self._write_lock:
+            try:
+                for word in words:
+                    word = word.strip().lower()
+                    if not word:
+                        continue
+                    if self._upsert_word(word):
+                        new_words.append(word)
+                    else:
+                        updated_words.append(word)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                if raise_errors:
+                    raise
+                print(f"数据库错误: {e}")
+                return 0, 0
+        
+        self._notify("add", new_words)
+        self._notify("update", updated_words)
+        return len(new_words), len(updated_words)
+    
+    def _upsert_word(self, word: str, meaning: str = "", phonetic: str = "",
+                     part_of_speech: str = "", example_sentence: str = "") -> bool:
+        """
+        插入新单词，已存在时增加选择次数（持有 _write_lock、在提交事务之前调用）
+        
+        先查询再插入时，多进程网页模式中另一个工作进程可能在两步之间插入同一个单词，
+        插入会因为 UNIQUE 约束失败，所以用一条 INSERT ... ON CONFLICT 语句完成。
+        
+        返回:
+            bool: 是否为新单词
+        """
+        self.cursor.execute('''
+            INSERT INTO words (word, meaning, phonetic, part_of_speech, example_sentence)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(word) DO UPDATE SET selection_count = selection_count + 1, updated_at = ?
+        ''', (word, meaning, phonetic, part_of_speech, example_sentence,
+              datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        # 新单词的选择次数为默认值1，已有单词增加后至少为2（写事务中其他连接不能修改）
+        self.cursor.execute("SELECT selection_count FROM words WHERE word = ?", (word,))
+        return self.cursor.fetchone()[0] == 1
     
     def get_all_words(self, sort_by: str = "alphabetical") -> List[Dict]:
         """
@@ -157,17 +293,115 @@ class VocabularyDB:
         返回:
             List[Dict]: 单词列表
         """
-        order_clause = {
-            "alphabetical": "ORDER BY word ASC",
-            "selection_desc": "ORDER BY selection_count DESC, word ASC",
-            "print_asc": "ORDER BY print_count ASC, word ASC"
-        }.get(sort_by, "ORDER BY word ASC")
+        order_clause = ORDER_CLAUSES.get(sort_by, ORDER_CLAUSES["alphabetical"])
         
         self.cursor.execute(f"SELECT * FROM words {order_clause}")
         rows = self.cursor.fetchall()
         
         return [dict(row) for row in rows]
     
+    def iter_words(self, sort_by: str = "alphabetical", batch_size: int = 500) -> Iterator[Dict]:
+        """
+        逐批读取所有单词（生成器），内存中同时只有一批数据
+        
+        用于导出等需要遍历全部单词的场景，排序方式与 get_all_words 相同。
+        使用独立的游标，遍历期间可以正常调用其他方法。
+        
+        参数:
+            sort_by: 排序方式
+            batch_size: 每次从数据库读取的行数
+        """
+        order_clause = ORDER_CLAUSES.get(sort_by, ORDER_CLAUSES["alphabetical"])
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM words {order_clause}")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+    
+    def get_words_page(self, sort_by: str = "alphabetical", after: Optional[Dict] = None,
+                       limit: int = 50, keyword: str = "") -> List[Dict]:
+        """
+        按页读取单词（keyset 分页）
+        
+        下一页从上一页最后一个单词的排序字段之后开始读取，使用联合索引直接定位，
+        不管翻到第几页耗时都一样，翻页期间增删单词也不会重复或遗漏。
+        
+        参数:
+            sort_by: 排序方式，与 get_all_words 相同；有搜索关键词时按字典序
+            after: 上一页的最后一个单词，None 表示第一页
+            limit: 每页单词数
+            keyword: 搜索关键词（匹配单词或含义），为空时读取全部单词
+        
+        返回:
+            List[Dict]: 单词列表，少于 limit 个表示已经是最后一页
+        """
+        if keyword or sort_by not in ORDER_CLAUSES:
+            sort_by = "alphabetical"
+        
+        conditions = []
+        params: list = []
+        if keyword:
+            conditions.append("(word LIKE ? OR meaning LIKE ?)")
+            params += [f"%{keyword}%", f"%{keyword}%"]
+        if after is not None:
+            if sort_by == "alphabetical":
+                conditions.append("word > ?")
+                params.append(after['word'])
+            else:
+                column = "selection_count" if sort_by == "selection_desc" else "print_count"
+                op = "<" if sort_by == "selection_desc" else ">"
+                # 第一个条件可以用索引定位，第二个条件排除同一计数中已经读过的单词
+                conditions.append(f"{column} {op}= ? AND ({column} {op} ? OR word > ?)")
+                params += [after[column], after[column], after['word']]
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        self.cursor.execute(f"SELECT * FROM words {where} {ORDER_CLAUSES[sort_by]} LIMIT ?", params + [limit])
+        return [dict(row) for row in self.cursor.fetchall()]
+    
+    def iter_word_versions(self, sort_by: str = "alphabetical", batch_size: int = 5000) -> Iterator[Tuple[int, int]]:
+        """
+        逐批读取所有单词的 (ID, 版本号)，顺序与 iter_words 相同
+        
+        只读取两列，用于在导出前计算PDF缓存的键。
+        """
+        order_clause = ORDER_CLAUSES.get(sort_by, ORDER_CLAUSES["alphabetical"])
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT id, version FROM words {order_clause}")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0], row[1]
+        finally:
+            cursor.close()
+    
+    def count_words(self) -> int:
+        """单词总数"""
+        self.cursor.execute("SELECT COUNT(*) FROM words")
+        return self.cursor.fetchone()[0]
+    
+    def get_all_word_texts(self) -> List[str]:
+        """获取所有单词的文本（不读取其他字段）"""
+        self.cursor.execute("SELECT word FROM words")
+        return [row[0] for row in self.cursor.fetchall()]
+    
+    def get_word_ids(self, keyword: str = "") -> List[int]:
+        """获取所有单词的ID（有关键词时只返回搜索结果的ID）"""
+        if keyword:
+            self.cursor.execute("SELECT id FROM words WHERE word LIKE ? OR meaning LIKE ?",
+                                (f"%{keyword}%", f"%{keyword}%"))
+        else:
+            self.cursor.execute("SELECT id FROM words")
+        return [row[0] for row in self.cursor.fetchall()]
+    
     def get_word_by_id(self, word_id: int) -> Optional[Dict]:
         """根据ID获取单个单词"""
         self.cursor.execute("SELECT * FROM words WHERE id = ?", (word_id,))
@@ -205,56 +439,86 @@ class VocabularyDB:
         
         updates.append("updated_at = ?")
         values.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        # updated_at 只精确到秒，同一秒内的两次修改要靠 version 区分
+        updates.append("version = version + 1")
         values.append(word_id)
         
-        try:
-            self.cursor.execute(
-                f"UPDATE words SET {', '.join(updates)} WHERE id = ?",
-                values
-            )
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"更新错误: {e}")
-            return False
+        with self._write_lock:
+            try:
+                self.cursor.execute("SELECT word FROM words WHERE id = ?", (word_id,))
+                row = self.cursor.fetchone()
+                old_word = row[0] if row else None
+                
+                self.cursor.execute(
+                    f"UPDATE words SET {', '.join(updates)} WHERE id = ?",
+                    values
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"更新错误: {e}")
+                return False
+        
+        new_word = kwargs.get('word')
+        if old_word and new_word and new_word != old_word:
+            # 修改了单词本身，相当于删除旧单词、新增新单词
+            self._notify("delete", [old_word])
+            self._notify("add", [new_word])
+        elif old_word:
+            self._notify("update", [old_word])
+        return True
     
     def delete_word(self, word_id: int) -> bool:
         """删除单词"""
-        try:
-            self.cursor.execute("DELETE FROM words WHERE id = ?", (word_id,))
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"删除错误: {e}")
-            return False
+        with self._write_lock:
+            try:
+                self.cursor.execute("SELECT word FROM words WHERE id = ?", (word_id,))
+                row = self.cursor.fetchone()
+                self.cursor.execute("DELETE FROM words WHERE id = ?", (word_id,))
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"删除错误: {e}")
+                return False
+        if row:
+            self._notify("delete", [row[0]])
+        return True
     
     def increment_print_count(self, word_ids: List[int]) -> bool:
         """增加打印次数"""
-        try:
-            for word_id in word_ids:
-                self.cursor.execute(
-                    "UPDATE words SET print_count = print_count + 1 WHERE id = ?",
-                    (word_id,)
-                )
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"更新打印次数错误: {e}")
-            return False
+        with self._write_lock:
+            try:
+                for word_id in word_ids:
+                    self.cursor.execute(
+                        "UPDATE words SET print_count = print_count + 1 WHERE id = ?",
+                        (word_id,)
+                    )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"更新打印次数错误: {e}")
+                return False
+        # 只更新计数，不通知具体单词
+        self.change_count += 1
+        return True
     
     def increment_recitation_count(self, word_ids: List[int]) -> bool:
         """增加背诵次数"""
-        try:
-            for word_id in word_ids:
-                self.cursor.execute(
-                    "UPDATE words SET recitation_count = recitation_count + 1 WHERE id = ?",
-                    (word_id,)
-                )
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"更新背诵次数错误: {e}")
-            return False
+        with self._write_lock:
+            try:
+                for word_id in word_ids:
+                    self.cursor.execute(
+                        "UPDATE words SET recitation_count = recitation_count + 1 WHERE id = ?",
+                        (word_id,)
+                    )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"更新背诵次数错误: {e}")
+                return False
+        # 只更新计数，不通知具体单词
+        self.change_count += 1
+        return True
     
     def get_words_for_review(self, mode: str = "high_frequency", limit: int = 20) -> List[Dict]:
         """
@@ -319,5 +583,5 @@ class VocabularyDB:
             self.conn.close()
 
 
-# 创建全局数据库实例
-db = VocabularyDB()
+# 创建全局数据库实例（第一次使用时才打开数据库）
+db = LazyObject(VocabularyDB)
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+文档读取模块 - 直接提取 PDF、EPUB、TXT 中已有的文字
+
+电子版文档自带文字层，直接读取比截图后OCR快几个数量级。
+文档逐页（EPUB逐章、TXT逐段）读取和处理，内存占用与文档大小无关；
+PDF中没有文字层的页面（扫描页）才渲染成图片交给OCR识别。
+
+PDF 优先使用 PyMuPDF（可以渲染扫描页进行OCR），未安装时使用 pypdf（只能提取文字）。
+"""
+
+import os
+import codecs
+import string
+import zipfile
+import posixpath
+from html.parser import HTMLParser
+from typing import Callable, Iterator, Optional
+from xml.etree import ElementTree
+
+# 支持的文档格式
+DOCUMENT_EXTENSIONS = (".pdf", ".epub", ".txt")
+
+# PDF库导入状态
+PYMUPDF_AVAILABLE = False
+PYPDF_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    pass
+
+try:
+    import pypdf
+    PYPDF_AVAILABLE = True
+except ImportError:
+    pass
+
+# 扫描页渲染成图片时的分辨率
+OCR_RENDER_DPI = 200
+
+# TXT 每次读取的字符数
+TEXT_CHUNK_SIZE = 64 * 1024
+
+# TXT 块末尾留到下一块的最多字符数；超过时强行断开（只有极长的连续字母才会出现，不是正常单词）
+MAX_TEXT_CARRY = 64 * 1024
+
+# 英文单词中的字符，在其他字符处断开不会切断单词
+_WORD_CHARS = frozenset(string.ascii_letters + "-'")
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """提取HTML中的正文文字（跳过 script/style）"""
+    
+    SKIP_TAGS = {"script", "style", "head"}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth > 0:
+            self._skip_depth -= 1
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+    
+    def text(self) -> str:
+        return " ".join(self.parts)
+
+
+class DocumentReader:
+    """文档读取器"""
+    
+    def is_available(self, path: str) -> tuple:
+        """
+        检查是否能读取该格式的文档
+        
+        返回:
+            tuple: (是否可用, 错误信息)
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in DOCUMENT_EXTENSIONS:
+            return False, f"不支持的文档格式: {ext}"
+        if ext == ".pdf" and not (PYMUPDF_AVAILABLE or PYPDF_AVAILABLE):
+            return False, "读取PDF需要安装 PyMuPDF，请运行: pip install pymupdf"
+        return True, ""
+    
+    def iter_pages(self, path: str, ocr_fallback: bool = True) -> Iterator[tuple]:
+        """
+        逐页读取文档文字（生成器）
+        
+        参数:
+            path: 文档路径
+            ocr_fallback: PDF页面没有文字层时是否渲染成图片进行OCR
+        
+        产出:
+            tuple: (页码, 总页数, 文字, 是否经过OCR)，页码从1开始；
+                   无法预知总页数时（TXT）总页数为 None
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".pdf":
+            if PYMUPDF_AVAILABLE:
+                yield from self._iter_pdf_pymupdf(path, ocr_fallback)
+            else:
+                yield from self._iter_pdf_pypdf(path)
+        elif ext == ".epub":
+            yield from self._iter_epub(path)
+        elif ext == ".txt":
+            yield from self._iter_txt(path)
+        else:
+            raise ValueError(f"不支持的文档格式: {ext}")
+    
+    def _iter_pdf_pymupdf(self, path: str, ocr_fallback: bool) -> Iterator[tuple]:
+        with fitz.open(path) as doc:
+            total = doc.page_count
+            for index in range(total):
+                page = doc.load_page(index)
+                text = page.get_text("text")
+                used_ocr = False
+                
+                if not text.strip() and ocr_fallback:
+                    # 扫描页: 渲染成PNG后在内存中交给OCR
+                    from ocr_handler import ocr_handler
+                    png = page.get_pixmap(dpi=OCR_RENDER_DPI).tobytes("png")
+                    success, result = ocr_handler.recognize(png)
+                    if success:
+                        text = result
+                        used_ocr = True
+                
+                yield index + 1, total, text, used_ocr
+    
+    def _iter_pdf_pypdf(self, path: str) -> Iterator[tuple]:
+        reader = pypdf.PdfReader(path)
+        total = len(reader.pages)
+        for index in range(total):
+            # pypdf 不能渲染页面，没有文字层的页面只能跳过
+            text = reader.pages[index].extract_text() or ""
+            yield index + 1, total, text, False
+    
+    def _iter_epub(self, path: str) -> Iterator[tuple]:
+        with zipfile.ZipFile(path) as zf:
+            chapters = self._epub_spine(zf)
+            total = len(chapters)
+            for index, name in enumerate(chapters):
+                parser = _HTMLTextExtractor()
+                # 增量解码，避免多字节字符被分块截断
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+                with zf.open(name) as f:
+                    while True:
+                        chunk = f.read(TEXT_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        parser.feed(decoder.decode(chunk))
+                parser.feed(decoder.decode(b"", final=True))
+                parser.close()
+                yield index + 1, total, parser.text(), False
+    
+    def _epub_spine(self, zf: zipfile.ZipFile) -> list:
+        """按阅读顺序返回EPUB中各章节的文件名"""
+        ns = {
+            "c": "urn:oasis:names:tc:opendocument:xmlns:container",
+            "opf": "http://www.idpf.org/2007/opf",
+        }
+        try:
+            container = ElementTree.fromstring(zf.read("META-INF/container.xml"))
+            opf_path = container.find(".//c:rootfile", ns).get("full-path")
+            opf = ElementTree.fromstring(zf.read(opf_path))
+            base = posixpath.dirname(opf_path)
+            
+            manifest = {
+                item.get("id"): posixpath.normpath(posixpath.join(base, item.get("href")))
+                for item in opf.findall(".//opf:manifest/opf:item", ns)
+            }
+            chapters = [
+                manifest[ref.get("idref")]
+                for ref in opf.findall(".//opf:spine/opf:itemref", ns)
+                if ref.get("idref") in manifest
+            ]
+            if chapters:
+                return chapters
+        except (KeyError, AttributeError, ElementTree.ParseError):
+            pass
+        
+        # 目录信息损坏时按文件名顺序读取所有网页文件
+        return sorted(n for n in zf.namelist() if n.lower().endswith((".xhtml", ".html", ".htm")))
+    
+    def _iter_txt(self, path: str) -> Iterator[tuple]:
+        encoding = self._detect_encoding(path)
+        index = 0
+        carry = ""
+        with open(path, "r", encoding=encoding, errors="ignore") as f:
+            while True:
+                chunk = f.read(TEXT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = carry + chunk
+                # 在最后一个不属于英文单词的字符处断开，避免把单词切成两半；
+                # 没有空格的中文、压缩过的文本同样可以断开，留到下一块的文字不会越积越多
+                cut = len(text)
+                while cut > 0 and text[cut - 1] in _WORD_CHARS:
+                    cut -= 1
+                if cut <= 0:
+                    if len(text) < MAX_TEXT_CARRY:
+                        carry = text
+                        continue
+                    cut = len(text)
+                carry = text[cut:]
+                index += 1
+                yield index, None, text[:cut], False
+        if carry.strip():
+            index += 1
+            yield index, None, carry, False
+    
+    def _detect_encoding(self, path: str) -> str:
+        """简单判断TXT编码: UTF-8（含BOM）或 GBK"""
+        with open(path, "rb") as f:
+            head = f.read(TEXT_CHUNK_SIZE)
+        if head.startswith(b"\xef\xbb\xbf"):
+            return "utf-8-sig"
+        try:
+            head.decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError as e:
+            # 读取的片段末尾可能截断了多字节字符
+            if e.start >= len(head) - 3:
+                return "utf-8"
+            return "gbk"
+    
+    def extract_words(self, path: str, on_page: Optional[Callable] = None,
+                      ocr_fallback: bool = True,
+                      should_cancel: Optional[Callable[[], bool]] = None) -> tuple:
+        """
+        提取文档中的英文单词，每读完一页就通过回调推送新出现的单词
+        
+        单词提取规则与 OCRHandler.extract_english_words 相同，在整个文档范围内去重。
+        
+        参数:
+            path: 文档路径
+            on_page: 回调函数 on_page(页码, 总页数, 本页新单词列表)，总页数可能为 None
+            ocr_fallback: PDF页面没有文字层时是否使用OCR
+            should_cancel: 返回 True 时在读完当前页后停止
+        
+        返回:
+            tuple: (成功标志, 结果摘要或错误信息)
+        """
+        available, error = self.is_available(path)
+        if not available:
+            return False, error
+        
+        if not os.path.exists(path):
+            return False, f"文档不存在: {path}"
+        
+        from ocr_handler import ocr_handler
+        
+        seen = set()
+        pages = 0
+        ocr_pages = 0
+        empty_pages = 0
+        
+        try:
+            for page_no, total, text, used_ocr in self.iter_pages(path, ocr_fallback):
+                if should_cancel and should_cancel():
+                    return False, "已取消"
+                pages += 1
+                if used_ocr:
+                    ocr_pages += 1
+                elif not text.strip():
+                    empty_pages += 1
+                
+                new_words = ocr_handler.extract_new_words(text, seen)
+                if on_page:
+                    on_page(page_no, total, new_words)
+        except Exception as e:
+            error_msg = f"文档读取失败: {e}"
+            print(error_msg)
+            return False, error_msg
+        
+        summary = f"共 {pages} 页，{len(seen)} 个单词"
+        if ocr_pages:
+            summary += f"，其中 {ocr_pages} 页使用OCR识别"
+        if empty_pages:
+            summary += f"，{empty_pages} 页没有文字"
+        return True, summary
+
+
+# 创建全局文档读取实例
+document_reader = DocumentReader()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+PDF导出任务 - 在后台线程中生成PDF
+
+点击导出后立即返回，PDF在线程池中生成，界面通过回调显示进度，可以随时取消:
+    - 每个任务写入自己的文件（文件名含时间和任务编号），多个用户同时导出不会互相覆盖
+    - 同时运行的任务数有上限，超出的任务排队等待
+    - 只有生成成功后才更新导出单词的打印次数
+    - 同样的单词再次导出时直接使用缓存的PDF（见 pdf_cache.py）
+"""
+
+import os
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from database import db
+from pdf_cache import pdf_cache, word_version
+from pdf_layouts import DEFAULT_LAYOUT
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+
+# 同时运行的导出任务数（PDF生成主要占用CPU，多了只会让每个任务都变慢）
+MAX_CONCURRENT_EXPORTS = 2
+
+# 内存中保留的任务记录数
+MAX_JOB_RECORDS = 100
+
+# 任务状态
+PENDING = "pending"      # 排队中
+RUNNING = "running"      # 生成中
+DONE = "done"            # 已完成
+FAILED = "failed"        # 失败
+CANCELLED = "cancelled"  # 已取消
+
+
+class ExportJob:
+    """一个导出任务"""
+    
+    def __init__(self, title: str, layout: str, total: Optional[int]):
+        self.id = uuid.uuid4().hex[:12]
+        self.title = title
+        self.layout = layout
+        self.total = total
+        self.output_path = ""
+        self.status = PENDING
+        self.done = 0            # 已绘制的单词数
+        self.message = ""
+        self.cached = False      # 是否直接使用了缓存的PDF
+        self.word_ids: List[int] = []
+        self._cancel = threading.Event()
+    
+    def cancel(self):
+        """请求取消（正在生成的任务在绘制完当前页后停止）"""
+        self._cancel.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+class ExportJobManager:
+    """导出任务管理"""
+    
+    def __init__(self, output_dir: str = OUTPUT_DIR, max_workers: int = MAX_CONCURRENT_EXPORTS):
+        self.output_dir = output_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-export")
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _output_path(self, layout: str, job_id: str) -> str:
+        """生成不会重复的输出文件路径"""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.output_dir, f"vocabulary_{layout}_{stamp}_{job_id}.pdf")
+    
+    def submit(self, words: Iterable[Dict], total: Optional[int] = None, title: str = "陌生单词表",
+               layout: str = DEFAULT_LAYOUT, on_progress: Optional[Callable] = None,
+               on_finish: Optional[Callable] = None,
+               versions: Optional[Iterable[Tuple]] = None) -> ExportJob:
+        """
+        提交导出任务
+        
+        参数:
+            words: 单词列表或迭代器（如 db.iter_words()），在后台线程中读取
+            total: 单词数量，words 为迭代器时需要提供
+            title: PDF标题
+            layout: 版式名称，见 pdf_layouts.LAYOUT_OPTIONS
+            on_progress: 进度回调 on_progress(job)，在后台线程中调用，每生成一页调用一次
+            on_finish: 结束回调 on_finish(job)，在后台线程中调用，job.status 为 DONE / FAILED / CANCELLED
+            versions: 与 words 顺序相同的单词版本 (ID, 版本号)，如 db.iter_word_versions()，用于查找缓存；
+                      words 为列表时可省略，为迭代器且没有提供时不使用缓存
+        
+        返回:
+            ExportJob: 任务对象
+        """
+        if total is None and hasattr(words, "__len__"):
+            total = len(words)
+        job = ExportJob(title, layout, total)
+        job.output_path = self._output_path(layout, job.id)
+        
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOB_RECORDS:
+                # 丢弃最早的已结束任务记录
+                oldest = next((jid for jid, j in self._jobs.items() if j.finished), None)
+                if oldest is None:
+                    break
+                del self._jobs[oldest]
+        
+        self._executor.submit(self._run, job, words, versions, on_progress, on_finish)
+        return job
+    
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: str) -> bool:
+        """取消任务，任务不存在或已结束时返回 False"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+    
+    def jobs(self) -> List[ExportJob]:
+        """全部任务记录（从早到晚）"""
+        with self._lock:
+            return list(self._jobs.values())
+    
+    def _run(self, job: ExportJob, words: Iterable[Dict], versions: Optional[Iterable[Tuple]],
+             on_progress: Optional[Callable], on_finish: Optional[Callable]):
+        from pdf_generator import pdf_generator
+        from pdf_fonts import font_registry
+        
+        if job.cancelled:
+            job.status = CANCELLED
+            job.message = "已取消"
+            self._finish(job, on_finish)
+            return
+        
+        job.status = RUNNING
+        
+        def track(items):
+            # 边生成边记录导出的单词ID，用于更新打印次数
+            for w in items:
+                job.word_ids.append(w['id'])
+                yield w
+        
+        def progress(done, total):
+            job.done = done
+            if on_progress:
+                on_progress(job)
+        
+        key = None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            
+            if versions is None and hasattr(words, "__len__"):
+                versions = [word_version(w) for w in words]
+            if versions is not None and pdf_cache.enabled:
+                font = f"{pdf_generator.ensure_font()}:{font_registry.font_path}"
+                ids = []
+                
+                def collect(items):
+                    # 计算键的同时记下单词ID，命中缓存时用于更新打印次数
+                    for v in items:
+                        if isinstance(v[0], int):
+                            ids.append(v[0])
+                        yield v
+                
+                key = pdf_cache.make_key(collect(versions), job.title, job.layout, font)
+                job.cached = pdf_cache.get(key, job.output_path)
+                if job.cached:
+                    job.word_ids = ids
+            
+            if job.cached:
+                progress(job.total or len(job.word_ids), job.total)
+                success, msg = True, f"PDF已保存: {job.output_path}"
+            else:
+                success, msg = pdf_generator.generate_vocabulary_pdf(
+                    track(words), job.output_path, title=job.title, total=job.total,
+                    on_progress=progress, should_cancel=lambda: job.cancelled, layout=job.layout,
+                )
+        except Exception as e:
+            success, msg = False, f"PDF生成失败: {e}"
+        
+        if success:
+            if key is not None and not job.cached:
+                pdf_cache.put(key, job.output_path)
+            # 只更新这次导出的单词的打印次数
+            db.increment_print_count(job.word_ids)
+            job.status = DONE
+        else:
+            job.status = CANCELLED if job.cancelled else FAILED
+            self._remove_output(job.output_path)
+        job.message = msg
+        self._finish(job, on_finish)
+    
+    def _finish(self, job: ExportJob, on_finish: Optional[Callable]):
+        if on_finish:
+            try:
+                on_finish(job)
+            except Exception as e:
+                print(f"导出结束回调出错: {e}")
+    
+    def _remove_output(self, path: str):
+        """删除失败或取消的任务留下的不完整文件"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"删除不完整的PDF失败: {e}")
+    
+    def shutdown(self, cancel: bool = True):
+        """停止线程池（cancel 为 True 时先取消全部未结束的任务）"""
+        if cancel:
+            for job in self.jobs():
+                job.cancel()
+        self._executor.shutdown(wait=True)
+
+
+# 创建全局导出任务管理实例
+export_jobs = ExportJobManager()
@@ -6,16 +6,14 @@
 import os
 import sys
 import socket
+import importlib
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import flet as ft
 
 from database import db
-from pages.input import InputPage
-from pages.manage import ManagePage
-from pages.review import ReviewPage
-from pages.game import GamePage
+from utils.ui_scheduler import get_scheduler
 
 
 def get_local_ip():
@@ -29,16 +27,26 @@ def get_local_ip():
         return "127.0.0.1"
 
 
+# 导航页面名称 -> (模块, 页面类)，第一次打开页面时才导入
+PAGE_CLASSES = {
+    "input": ("pages.input", "InputPage"),
+    "manage": ("pages.manage", "ManagePage"),
+    "review": ("pages.review", "ReviewPage"),
+    "game": ("pages.game", "GamePage"),
+}
+
+
 class App:
     def __init__(self):
         self.page = None
-        self.input_page = None
-        self.manage_page = None
-        self.review_page = None
-        self.game_page = None
+        self.pages = {}  # 页面名称 -> 页面对象
+        self.views = {}  # 页面名称 -> 已创建的界面，切换回来时直接显示，保留输入和滚动等状态
+        self.stat_values = {}  # 首页统计数字的文本控件
+        self._home_version = None  # 首页统计数字对应的 db.change_count
     
     def main(self, page: ft.Page):
         self.page = page
+        self.ui = get_scheduler(page)
         
         page.title = "陌生单词收集与背诵"
         page.window.width = 900
@@ -79,39 +87,41 @@ class App:
         self.show_page("home")
     
     def show_page(self, name):
-        if name == "home":
-            self.content.content = self.build_home()
-        elif name == "input":
-            if not self.input_page:
-                self.input_page = InputPage(self.page)
-            self.content.content = self.input_page.build()
-        elif name == "manage":
-            if not self.manage_page:
-                self.manage_page = ManagePage(self.page)
-            self.content.content = self.manage_page.build()
-        elif name == "review":
-            if not self.review_page:
-                self.review_page = ReviewPage(self.page)
-            self.content.content = self.review_page.build()
-        elif name == "game":
-            if not self.game_page:
-                self.game_page = GamePage(self.page)
-            self.content.content = self.game_page.build()
+        # 多进程网页模式下其他工作进程可能修改了单词库，切换页面时检查一次
+        db.sync_external_changes()
+        view = self.views.get(name)
+        if view is None:
+            # 第一次显示时创建界面
+            if name == "home":
+                view = self.build_home()
+            else:
+                if name not in self.pages:
+                    module, cls = PAGE_CLASSES[name]
+                    self.pages[name] = getattr(importlib.import_module(module), cls)(self.page)
+                view = self.pages[name].build()
+            self.views[name] = view
+        elif name == "home":
+            self.refresh_home()
+        elif hasattr(self.pages[name], "on_show"):
+            # 页面只重新读取上次显示之后有变化的数据
+            self.pages[name].on_show()
         
-        self.page.update()
+        self.content.content = view
+        self.ui.update()
     
     def build_home(self):
         stats = db.get_statistics()
+        self._home_version = db.change_count
         
         return ft.Column([
             ft.Container(height=30),
             ft.Text("陌生单词收集与背诵", size=28, weight=ft.FontWeight.BOLD, color="blue"),
             ft.Container(height=20),
             ft.Row([
-                self.stat_card("单词总数", stats['total_words'], "blue"),
-                self.stat_card("选择次数", stats['total_selections'], "green"),
-                self.stat_card("打印次数", stats['total_prints'], "orange"),
-                self.stat_card("背诵次数", stats['total_recitations'], "purple"),
+                self.stat_card("单词总数", stats, 'total_words', "blue"),
+                self.stat_card("选择次数", stats, 'total_selections', "green"),
+                self.stat_card("打印次数", stats, 'total_prints', "orange"),
+                self.stat_card("背诵次数", stats, 'total_recitations', "purple"),
             ], alignment=ft.MainAxisAlignment.CENTER),
             ft.Container(height=30),
             ft.Divider(),
@@ -123,11 +133,22 @@ class App:
             ft.Text("提示: 点击左侧导航切换功能", color="grey"),
         ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, scroll=ft.ScrollMode.AUTO, expand=True)
     
-    def stat_card(self, label, value, color):
+    def refresh_home(self):
+        """单词库有变化时更新首页的统计数字"""
+        if self._home_version == db.change_count:
+            return
+        self._home_version = db.change_count
+        stats = db.get_statistics()
+        for key, text in self.stat_values.items():
+            text.value = str(stats[key])
+    
+    def stat_card(self, label, stats, key, color):
+        value_text = ft.Text(str(stats[key]), size=24, weight=ft.FontWeight.BOLD, color=color)
+        self.stat_values[key] = value_text
         return ft.Container(
             content=ft.Column([
                 ft.Text(label, size=12, color="grey"),
-                ft.Text(str(value), size=24, weight=ft.FontWeight.BOLD, color=color),
+                value_text,
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
             padding=15,
             border=ft.border.all(1, "grey"),
@@ -140,18 +161,51 @@ class App:
         self.show_page(name)
 
 
+def parse_web_args(args):
+    """
+    解析网页模式的参数: --web [端口 | --port 端口] [--workers N]
+    
+    返回:
+        tuple: (端口, 工作进程数)，未指定 --workers 时工作进程数为 0（单进程）
+    """
+    port = 8555
+    workers = 0
+    rest = list(args)
+    if "--port" in rest:
+        i = rest.index("--port")
+        rest = rest[:i] + rest[i + 1:]
+    if "--workers" in rest:
+        i = rest.index("--workers")
+        try:
+            workers = int(rest[i + 1])
+        except (IndexError, ValueError):
+            from web_cluster import default_workers
+            workers = default_workers()
+        del rest[i:i + 2]
+    if rest:
+        try:
+            port = int(rest[0])
+        except ValueError:
+            pass
+    return port, workers
+
+
 if __name__ == "__main__":
+    # 浏览器上传的图片先保存到 uploads 目录，读入内存后立即删除
+    upload_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
+    
+    if len(sys.argv) > 2 and sys.argv[1] == "--web-worker":
+        # 多进程网页模式的工作进程（由 web_cluster 启动），只在本机的内部端口上提供服务
+        ft.app(target=lambda page: App().main(page), view=None, host="127.0.0.1",
+               port=int(sys.argv[2]), upload_dir=upload_dir)
+        sys.exit(0)
+    
     print("=" * 50)
     print("  陌生单词收集与背诵软件")
     print("=" * 50)
     
-    port = 8555
     if len(sys.argv) > 1 and sys.argv[1] == "--web":
-        if len(sys.argv) > 2:
-            try:
-                port = int(sys.argv[2])
-            except:
-                pass
+        port, workers = parse_web_args(sys.argv[2:])
         
         ip = get_local_ip()
         print(f"  电脑访问: http://localhost:{port}")
@@ -171,7 +225,17 @@ if __name__ == "__main__":
         print("  请稍候，浏览器会自动打开")
         print("=" * 50)
         
-        ft.app(target=App().main, view=ft.AppView.WEB_BROWSER, port=port)
+        os.makedirs(upload_dir, exist_ok=True)
+        # 生成上传地址需要签名密钥（多进程模式下所有工作进程使用同一个密钥）
+        os.environ.setdefault("FLET_SECRET_KEY", os.urandom(16).hex())
+        
+        if workers > 1:
+            # 多个工作进程共用一个端口，见 web_cluster.py
+            from web_cluster import run_cluster
+            run_cluster(port, workers)
+        else:
+            # 每个浏览器会话使用自己的 App，缓存的界面不会在会话之间共用
+            ft.app(target=lambda page: App().main(page), view=ft.AppView.WEB_BROWSER, port=port, upload_dir=upload_dir)
     else:
         print("  启动桌面模式...")
         print("=" * 50)
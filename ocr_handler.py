@@ -2,61 +2,271 @@
 """
 OCR处理模块 - 从图片中识别文字
 使用 EasyOCR 库，支持中英文识别，纯Python实现，无需额外安装软件
+推理后端可替换，CPU上可选用 ONNX Runtime 加速，见 OCR_BACKENDS
 """
 
 import os
-import re
-from typing import List, Optional
-import base64
+import threading
+import importlib.util
+from typing import Callable, List, Optional
 from io import BytesIO
 
-# OCR库导入状态
-OCR_AVAILABLE = False
-OCR_ERROR_MSG = ""
+from utils.tokenizer import iter_tokens, unique_words
 
-try:
-    import easyocr
-    OCR_AVAILABLE = True
-except ImportError as e:
-    OCR_ERROR_MSG = f"EasyOCR未安装，请运行: pip install easyocr。错误: {e}"
-except Exception as e:
-    OCR_ERROR_MSG = f"EasyOCR加载失败: {e}"
+# OCR库安装状态: 这里只检查是否安装，导入 EasyOCR（连带 torch，要几秒）推迟到第一次识别时
+OCR_AVAILABLE = importlib.util.find_spec("easyocr") is not None
+OCR_ERROR_MSG = "" if OCR_AVAILABLE else "EasyOCR未安装，请运行: pip install easyocr"
 
+# 分块识别参数（像素）
+# 超过 TILE_MIN_HEIGHT 的长图会被切成高度为 TILE_BAND_HEIGHT 的横向条带，
+# 相邻条带重叠 TILE_OVERLAP 像素，重叠高度需大于一行文字的高度
+TILE_MIN_HEIGHT = 1600
+TILE_BAND_HEIGHT = 800
+TILE_OVERLAP = 160
 
-class OCRHandler:
-    """OCR文字识别处理器"""
+# 支持识别的图片格式
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+# OCR后端选择，可通过环境变量 VOCAB_OCR_BACKEND 配置，取值见 OCR_BACKENDS
+DEFAULT_OCR_BACKEND = "easyocr"
+
+
+class OCRBackend:
+    """
+    OCR推理后端基类
+    
+    子类实现 load() 加载模型，readtext() 的参数和返回值与 easyocr.Reader.readtext 相同。
+    """
+    
+    name = ""
+    
+    def load(self):
+        """加载模型，失败时抛出异常"""
+        raise NotImplementedError
+    
+    def readtext(self, img_array, detail: int = 0) -> list:
+        raise NotImplementedError
+
+
+class EasyOCRBackend(OCRBackend):
+    """
+    EasyOCR 默认后端
+    
+    CPU模式下 EasyOCR 会对识别网络的 LSTM/Linear 层做 int8 动态量化，
+    检测网络（CRAFT，全卷积）仍以 float32 运行。
+    """
+    
+    name = "easyocr"
+    quantize = True
     
     def __init__(self):
-        """初始化OCR阅读器"""
         self.reader = None
+    
+    def load(self):
+        if not OCR_AVAILABLE:
+            raise RuntimeError(OCR_ERROR_MSG)
+        import easyocr
+        
+        # 创建EasyOCR阅读器，只识别英文（更稳定）
+        # gpu=False 使用CPU模式，避免GPU相关问题
+        self.reader = easyocr.Reader(
+            ['en'],
+            gpu=False,
+            download_enabled=True,
+            verbose=False,
+            quantize=self.quantize,
+        )
+    
+    def readtext(self, img_array, detail: int = 0) -> list:
+        return self.reader.readtext(img_array, detail=detail)
+
+
+class EasyOCRFloatBackend(EasyOCRBackend):
+    """不做量化的 EasyOCR（全部 float32），用作基准测试的精度参照"""
+    
+    name = "easyocr-fp32"
+    quantize = False
+
+
+class OnnxEasyOCRBackend(EasyOCRBackend):
+    """
+    检测网络使用 ONNX Runtime 推理的 EasyOCR
+    
+    首次加载时把 CRAFT 检测网络导出为 ONNX 文件（保存在 EasyOCR 模型目录中），
+    之后直接加载该文件。ONNX Runtime 对卷积网络做了图优化和多线程调度，
+    在CPU上明显快于 torch 的 float32 推理；识别网络仍使用 EasyOCR 的 int8 量化模型，
+    识别流程（文本框合并、解码）完全不变，结果与默认后端一致。
+    
+    需要额外安装: pip install onnx onnxruntime
+    """
+    
+    name = "onnx"
+    onnx_filename = "craft_mlt_25k.onnx"
+    
+    def load(self):
+        import onnxruntime as ort
+        
+        super().load()
+        
+        onnx_path = os.path.join(self.reader.model_storage_directory, self.onnx_filename)
+        if not os.path.exists(onnx_path):
+            self._export_detector(onnx_path)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.reader.detector = _OnnxDetector(session)
+    
+    def _export_detector(self, onnx_path: str):
+        """将 CRAFT 检测网络导出为 ONNX（高宽为动态尺寸）"""
+        import torch
+        
+        net = self.reader.detector
+        net.eval()
+        dummy = torch.randn(1, 3, 640, 640)
+        tmp_path = onnx_path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                net, dummy, tmp_path,
+                input_names=["input"],
+                output_names=["y", "feature"],
+                dynamic_axes={
+                    "input": {0: "batch", 2: "height", 3: "width"},
+                    "y": {0: "batch", 1: "out_height", 2: "out_width"},
+                    "feature": {0: "batch", 2: "out_height", 3: "out_width"},
+                },
+                opset_version=13,
+            )
+        os.replace(tmp_path, onnx_path)
+        print(f"已导出ONNX检测模型: {onnx_path}")
+
+
+class _OnnxDetector:
+    """包装 ONNX Runtime 会话，调用方式与 EasyOCR 中的 torch 检测网络相同"""
+    
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+    
+    def __call__(self, x):
+        import torch
+        
+        y, feature = self.session.run(None, {self.input_name: x.detach().cpu().numpy()})
+        return torch.from_numpy(y), torch.from_numpy(feature)
+    
+    def eval(self):
+        return self
+
+
+OCR_BACKENDS = {
+    backend.name: backend
+    for backend in (EasyOCRBackend, EasyOCRFloatBackend, OnnxEasyOCRBackend)
+}
+
+
+def get_backend_name() -> str:
+    """读取配置的OCR后端名称"""
+    return os.environ.get("VOCAB_OCR_BACKEND", DEFAULT_OCR_BACKEND).strip().lower()
+
+
+def decode_image(source):
+    """
+    将图片来源直接解码为RGB格式的numpy数组（全程在内存中完成，不写临时文件）
+    
+    参数:
+        source: 图片来源，支持以下类型:
+            - bytes / bytearray / memoryview: 图片文件的原始字节
+            - 文件对象（有 read 方法），如 BytesIO
+            - PIL.Image.Image 对象（如剪贴板截图）
+            - 文件路径
+    
+    返回:
+        numpy.ndarray: 形状为 (高, 宽, 3) 的RGB数组
+    """
+    from PIL import Image, ImageOps
+    import numpy as np
+    
+    if isinstance(source, Image.Image):
+        img = source
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        img = Image.open(BytesIO(source))
+    else:
+        # 文件路径或文件对象
+        img = Image.open(source)
+    
+    # 按EXIF信息旋转（手机拍照的图片）
+    img = ImageOps.exif_transpose(img)
+    
+    # 处理透明通道：RGBA/LA/带透明色的P模式合成到白色背景上，
+    # 直接 convert('RGB') 会让透明区域变成黑色，影响识别
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    return np.array(img)
+
+
+class OCRHandler:
+    """OCR文字识别处理器"""
+    
+    def __init__(self, backend: Optional[str] = None):
+        """
+        初始化OCR阅读器
+        
+        参数:
+            backend: OCR后端名称，见 OCR_BACKENDS；默认读取环境变量 VOCAB_OCR_BACKEND
+        """
+        self.backend_name = backend or get_backend_name()
+        self.backend = None
         self._initialized = False
         self._init_error = None
+        # 多个会话可能同时触发识别：初始化和模型推理都需要串行
+        self._init_lock = threading.Lock()
+        self._read_lock = threading.Lock()
     
     def _lazy_init(self):
         """延迟初始化OCR阅读器（首次使用时才加载）"""
         if self._initialized:
-            return self.reader is not None
-        
-        self._initialized = True
-        
-        if not OCR_AVAILABLE:
-            self._init_error = OCR_ERROR_MSG
-            return False
+            return self.backend is not None
         
-        try:
-            # 创建EasyOCR阅读器，只识别英文（更稳定）
-            # gpu=False 使用CPU模式，避免GPU相关问题
-            self.reader = easyocr.Reader(
-                ['en'],
-                gpu=False,
-                download_enabled=True,
-                verbose=False
-            )
-            return True
-        except Exception as e:
-            self._init_error = f"OCR初始化失败: {e}"
-            print(self._init_error)
-            return False
+        with self._init_lock:
+            if self._initialized:
+                return self.backend is not None
+            
+            if not OCR_AVAILABLE:
+                self._init_error = OCR_ERROR_MSG
+                self._initialized = True
+                return False
+            
+            backend_cls = OCR_BACKENDS.get(self.backend_name)
+            if backend_cls is None:
+                print(f"未知的OCR后端: {self.backend_name}，使用默认后端 {DEFAULT_OCR_BACKEND}")
+                backend_cls = OCR_BACKENDS[DEFAULT_OCR_BACKEND]
+            
+            try:
+                backend = backend_cls()
+                try:
+                    backend.load()
+                except Exception as e:
+                    if backend_cls.name == DEFAULT_OCR_BACKEND:
+                        raise
+                    # 可选后端加载失败（如未安装onnxruntime）时退回默认后端
+                    print(f"OCR后端 {backend_cls.name} 加载失败: {e}，使用默认后端 {DEFAULT_OCR_BACKEND}")
+                    backend = OCR_BACKENDS[DEFAULT_OCR_BACKEND]()
+                    backend.load()
+                self.backend = backend
+                return True
+            except Exception as e:
+                self._init_error = f"OCR初始化失败: {e}"
+                print(self._init_error)
+                return False
+            finally:
+                self._initialized = True
     
     def is_available(self) -> tuple:
         """
@@ -68,17 +278,22 @@ class OCRHandler:
         if not self._initialized:
             self._lazy_init()
         
-        if self.reader is not None:
+        if self.backend is not None:
             return True, ""
         else:
             return False, self._init_error or "OCR未初始化"
     
-    def recognize_image(self, image_path: str) -> tuple:
+    def _readtext(self, img_array, detail: int = 0):
+        """调用OCR后端识别（加锁，避免多个会话同时使用同一个模型）"""
+        with self._read_lock:
+            return self.backend.readtext(img_array, detail=detail)
+    
+    def recognize(self, source) -> tuple:
         """
         识别图片中的文字
         
         参数:
-            image_path: 图片文件路径
+            source: 图片来源，支持文件路径、字节数据、文件对象或PIL图片，见 decode_image
         
         返回:
             tuple: (成功标志, 识别结果文本或错误信息)
@@ -87,30 +302,18 @@ class OCRHandler:
         if not self._lazy_init():
             return False, self._init_error or "OCR未初始化"
         
-        if not os.path.exists(image_path):
-            return False, f"图片文件不存在: {image_path}"
+        if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+            return False, f"图片文件不存在: {source}"
         
         try:
-            # 使用PIL和numpy读取图片，更可靠
-            from PIL import Image
-            import numpy as np
-            
-            # 打开图片
-            img = Image.open(image_path)
-            
-            # 转换为RGB模式（处理RGBA等格式）
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # 转换为numpy数组
-            img_array = np.array(img)
+            img_array = decode_image(source)
             
             # 检查图片是否有效
             if img_array is None or img_array.size == 0:
                 return False, "图片读取失败，图片可能损坏"
             
             # 识别图片
-            results = self.reader.readtext(img_array, detail=0)
+            results = self._readtext(img_array, detail=0)
             
             if not results:
                 return True, ""  # 图片中没有检测到文字
@@ -124,6 +327,18 @@ class OCRHandler:
             print(error_msg)
             return False, error_msg
     
+    def recognize_image(self, image_path: str) -> tuple:
+        """
+        识别图片文件中的文字
+        
+        参数:
+            image_path: 图片文件路径
+        
+        返回:
+            tuple: (成功标志, 识别结果文本或错误信息)
+        """
+        return self.recognize(image_path)
+    
     def recognize_bytes(self, image_bytes: bytes) -> tuple:
         """
         识别字节数据中的图片文字
@@ -131,102 +346,148 @@ class OCRHandler:
         参数:
             image_bytes: 图片的字节数据
         
+        返回:
+            tuple: (成功标志, 识别结果文本或错误信息)
+        """
+        return self.recognize(image_bytes)
+    
+    def recognize_image_tiled(self, source, on_band: Optional[Callable] = None,
+                              band_height: int = TILE_BAND_HEIGHT,
+                              overlap: int = TILE_OVERLAP,
+                              should_cancel: Optional[Callable[[], bool]] = None) -> tuple:
+        """
+        分块识别长图，每识别完一个条带就通过回调推送新出现的单词
+        
+        长截图或整页扫描件会被切成相互重叠的横向条带逐个识别，
+        界面可以在第一个条带识别完成后就显示可点击的单词。
+        重叠区域中的文字只归属于其中心所在的条带，避免跨边界的行被重复识别；
+        单词在所有条带之间按首次出现的顺序去重。
+        高度不超过 TILE_MIN_HEIGHT 的图片按单个条带处理，结果与 recognize 相同。
+        
+        参数:
+            source: 图片来源，支持文件路径、字节数据、文件对象或PIL图片，见 decode_image
+            on_band: 回调函数 on_band(条带序号, 条带总数, 本条带新单词列表)，条带序号从1开始
+            band_height: 条带高度（像素）
+            overlap: 相邻条带的重叠高度（像素）
+            should_cancel: 返回 True 时在识别完当前条带后停止
+        
         返回:
             tuple: (成功标志, 识别结果文本或错误信息)
         """
         if not self._lazy_init():
             return False, self._init_error or "OCR未初始化"
         
+        if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+            return False, f"图片文件不存在: {source}"
+        
         try:
-            # 将字节转换为numpy数组
-            import numpy as np
-            from PIL import Image
+            img_array = decode_image(source)
+            if img_array is None or img_array.size == 0:
+                return False, "图片读取失败，图片可能损坏"
             
-            # 使用PIL打开图片
-            image = Image.open(BytesIO(image_bytes))
-            # 转换为numpy数组
-            image_array = np.array(image)
+            bands = self._split_bands(img_array.shape[0], band_height, overlap)
+            half = overlap // 2
+            lines = []
+            seen = set()
             
-            # 识别图片
-            results = self.reader.readtext(image_array, detail=0)
+            for index, (top, bottom) in enumerate(bands):
+                if should_cancel and should_cancel():
+                    return False, "已取消"
+                
+                # 本条带负责的纵向范围（重叠区域一分为二）
+                own_top = top + half if index > 0 else top
+                own_bottom = bottom - half if index < len(bands) - 1 else bottom
+                
+                results = self._readtext(img_array[top:bottom], detail=1)
+                band_lines = []
+                for box, text, _conf in results:
+                    center_y = top + sum(point[1] for point in box) / len(box)
+                    if own_top <= center_y < own_bottom:
+                        band_lines.append(text)
+                lines.extend(band_lines)
+                
+                new_words = self.extract_new_words("\n".join(band_lines), seen)
+                
+                if on_band:
+                    on_band(index + 1, len(bands), new_words)
             
-            if not results:
-                return True, ""
-            
-            full_text = "\n".join(results)
-            return True, full_text
+            return True, "\n".join(lines)
             
         except Exception as e:
             error_msg = f"图片识别失败: {e}"
             print(error_msg)
             return False, error_msg
     
+    @staticmethod
+    def _split_bands(height: int, band_height: int, overlap: int) -> List[tuple]:
+        """
+        计算条带的纵向范围
+        
+        返回:
+            List[tuple]: [(上边界, 下边界), ...]
+        """
+        if height <= max(TILE_MIN_HEIGHT, band_height) or overlap >= band_height:
+            return [(0, height)]
+        
+        step = band_height - overlap
+        bands = []
+        top = 0
+        while True:
+            bottom = min(top + band_height, height)
+            bands.append((top, bottom))
+            if bottom >= height:
+                break
+            top += step
+        return bands
+    
     def extract_english_words(self, text: str) -> List[str]:
         """
         从文本中提取英文单词
         
         参数:
-            text: 输入文本
+            text: 输入文本（或文本块迭代器）
         
         返回:
             List[str]: 英文单词列表（去重、排序）
         """
-        # 使用正则表达式匹配英文单词
-        # 匹配由字母、连字符、撇号组成的单词
-        pattern = r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*"
-        words = re.findall(pattern, text)
+        return sorted(unique_words(text))
+    
+    def extract_new_words(self, text: str, seen: set) -> List[str]:
+        """
+        按出现顺序提取 seen 中还没有的英文单词，并加入 seen
+        
+        用于分段处理（图片条带、文档分页）时跨段去重，规则与 extract_english_words 相同。
         
-        # 转小写，去重，排序
-        unique_words = sorted(set(word.lower() for word in words if len(word) > 1))
+        参数:
+            text: 输入文本
+            seen: 已出现的单词集合（会被修改）
         
-        return unique_words
+        返回:
+            List[str]: 新单词列表（小写，按首次出现的顺序）
+        """
+        return unique_words(text, seen=seen)
     
     def extract_all_words(self, text: str) -> List[dict]:
         """
         从文本中提取所有单词（包括中英文混合）
         
         参数:
-            text: 输入文本
+            text: 输入文本（或文本块迭代器）
         
         返回:
-            List[dict]: 单词信息列表
+            List[dict]: 单词信息列表，按原文顺序去重
         """
+        seen = set()
         words_info = []
-        
-        # 提取英文单词
-        english_pattern = r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*"
-        english_words = re.findall(english_pattern, text)
-        
-        for word in english_words:
-            if len(word) > 1:  # 过滤单字母
-                words_info.append({
-                    "text": word,
-                    "type": "english",
-                    "lower": word.lower()
-                })
-        
-        # 提取中文词汇（简单的单字和双字词）
-        chinese_pattern = r"[\u4e00-\u9fff]+"
-        chinese_words = re.findall(chinese_pattern, text)
-        
-        for word in chinese_words:
-            if len(word) >= 1:
+        for token in iter_tokens(text, include_chinese=True):
+            if token.word not in seen:
+                seen.add(token.word)
                 words_info.append({
-                    "text": word,
-                    "type": "chinese",
-                    "lower": word
+                    "text": token.text,
+                    "type": token.kind,
+                    "lower": token.word
                 })
-        
-        # 按原文顺序去重
-        seen = set()
-        unique_words = []
-        for w in words_info:
-            key = w["lower"]
-            if key not in seen:
-                seen.add(key)
-                unique_words.append(w)
-        
-        return unique_words
+        return words_info
 
 
 def extract_words_from_text(text: str) -> List[str]:
@@ -239,8 +500,7 @@ def extract_words_from_text(text: str) -> List[str]:
     返回:
         List[str]: 英文单词列表
     """
-    handler = OCRHandler()
-    return handler.extract_english_words(text)
+    return sorted(unique_words(text))
 
 
 def extract_words_smart(text: str) -> List[dict]:
@@ -253,8 +513,7 @@ def extract_words_smart(text: str) -> List[dict]:
     返回:
         List[dict]: 单词信息列表
     """
-    handler = OCRHandler()
-    return handler.extract_all_words(text)
+    return ocr_handler.extract_all_words(text)
 
 
 # 创建全局OCR实例
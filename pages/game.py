@@ -11,6 +11,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import db
+from utils.ui_scheduler import get_scheduler
 
 
 class GamePage:
@@ -18,6 +19,7 @@ class GamePage:
     
     def __init__(self, page: ft.Page, on_navigate=None):
         self.page = page
+        self.ui = get_scheduler(page)  # 合并刷新请求
         self.words = []
         self.blocks = []  # 保存打乱后的方块
         self.selected_idx = None
@@ -63,7 +65,7 @@ class GamePage:
         if len(words_with_meaning) < count:
             self.status_text.value = f"需要至少{count}个有含义的单词"
             self.status_text.color = "red"
-            self.page.update()
+            self.ui.update()
             return
         
         self.words = random.sample(words_with_meaning, count)
@@ -137,7 +139,7 @@ class GamePage:
         for r in rows:
             self.game_area.controls.append(r)
         
-        self.page.update()
+        self.ui.update()
     
     def on_block_click(self, idx):
         if self.blocks[idx]['matched']:
@@ -5,13 +5,29 @@
 
 import os
 import re
-import tempfile
+import uuid
+import asyncio
 import flet as ft
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import db
+from utils.tokenizer import unique_words
+from utils.word_filter import known_words, NEW, COLLECTED, COMMON
+from utils.freq_rank import LEVELS, DEFAULT_LEVEL, suggest_unknown_words
+from utils.prefix_index import word_completer
+from utils.ui_scheduler import get_scheduler
+from utils.executors import CancelToken, run_cpu, run_io
+
+# 支持的图片格式
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# 支持的文档格式（与 document_reader.DOCUMENT_EXTENSIONS 一致）
+DOCUMENT_EXTENSIONS = (".pdf", ".epub", ".txt")
+
+# Web模式下浏览器上传文件的保存目录（与 main.py 中的 upload_dir 一致）
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
 
 
 class InputPage:
@@ -19,10 +35,20 @@ class InputPage:
     
     def __init__(self, page: ft.Page, on_navigate=None):
         self.page = page
+        self.ui = get_scheduler(page)  # 合并刷新请求
+        # 以下状态和控件只在事件循环中修改；线程池只做识别和查询，结果通过 call_soon_threadsafe 交回
         self.selected_words = []
         self.ocr_text = ""
         self.ocr_words = []
+        self.ocr_kinds = {}  # 单词 -> 分类（生词/已收集/常见词）
         self.ocr_selected = set()
+        self.show_known_words = False
+        self._image_words = set()  # 本次图片识别出的单词
+        self._check_words = set()  # 从图片识别结果中选择的单词，提交时检查是否识别错误
+        self._upload_names = {}  # 浏览器文件名 -> 服务器上的唯一文件名
+        # 正在进行的识别/读取和提交，点击取消按钮时设置
+        self._ocr_token = None
+        self._submit_token = None
     
     def build(self):
         title = ft.Text("单词采集", size=24, weight=ft.FontWeight.BOLD)
@@ -44,7 +70,10 @@ class InputPage:
             label="输入或粘贴要收集的单词",
             hint_text="选中文本中的单词，复制粘贴到这里...",
             width=250,
+            on_change=self.on_word_input_change,
+            on_submit=self.on_add_word,
         )
+        self.word_suggestions = ft.Row([], wrap=True, spacing=0)
         
         add_word_btn = ft.ElevatedButton(
             "添加单词",
@@ -53,6 +82,19 @@ class InputPage:
             color="white",
         )
         
+        # 按词频自动选出文章中的生词
+        self.level_dropdown = ft.Dropdown(
+            label="我的水平",
+            value=DEFAULT_LEVEL,
+            options=[ft.dropdown.Option(name, f"{name}（前{threshold}词）") for name, threshold in LEVELS],
+            width=180,
+        )
+        suggest_btn = ft.ElevatedButton(
+            "自动选出生词",
+            on_click=self.on_suggest_words,
+            tooltip="按词频找出文章中超出所选水平的单词，加入待提交列表",
+        )
+        
         # === 图片模式 ===
         img_title = ft.Text("图片选词 (OCR)", size=16, weight=ft.FontWeight.BOLD, color="orange")
         
@@ -63,6 +105,14 @@ class InputPage:
             color="white",
         )
         
+        doc_btn = ft.ElevatedButton(
+            "上传文档",
+            on_click=self.on_upload_document,
+            bgcolor="brown",
+            color="white",
+            tooltip="PDF / EPUB / TXT，直接读取文字，比截图识别快得多",
+        )
+        
         paste_btn = ft.ElevatedButton(
             "粘贴截图",
             on_click=self.on_paste_clipboard,
@@ -71,6 +121,7 @@ class InputPage:
         )
         
         self.ocr_status = ft.Text("", size=12)
+        self.ocr_cancel_btn = ft.TextButton("取消", on_click=self.on_cancel_ocr, visible=False)
         
         # OCR识别结果
         self.ocr_text_display = ft.Container(
@@ -85,11 +136,17 @@ class InputPage:
         )
         self.ocr_original_text = self.ocr_text_display.content.controls[1]
         
-        # OCR单词选择区
+        # OCR单词选择区（默认只显示生词）
         self.ocr_chips_container = ft.Row([], wrap=True, spacing=5, run_spacing=5)
+        self.ocr_filter_text = ft.Text("", size=11, color="grey")
+        show_known_checkbox = ft.Checkbox(
+            label="显示常见词和已收集的单词",
+            value=self.show_known_words,
+            on_change=self.on_show_known_change,
+        )
         self.ocr_words_area = ft.Container(
             content=ft.Column([
-                ft.Text("点击选择单词:", size=12),
+                ft.Row([ft.Text("点击选择单词:", size=12), show_known_checkbox, self.ocr_filter_text]),
                 self.ocr_chips_container,
             ]),
             padding=10,
@@ -112,11 +169,20 @@ class InputPage:
         
         # 按钮
         clear_btn = ft.OutlinedButton("清空", on_click=self.on_clear)
+        self.autocorrect_checkbox = ft.Checkbox(
+            label="检查识别错误",
+            value=True,
+            tooltip="从图片中选择的单词先离线检查拼写，疑似识别错误的不查词典、不入库，"
+                    "给出纠正建议（如 researeh → research），确认后才替换",
+        )
         submit_btn = ft.ElevatedButton("提交单词（自动查词典）", on_click=self.on_submit, bgcolor="purple", color="white")
         
         # 状态
         self.status_text = ft.Text("", size=14)
+        self.submit_cancel_btn = ft.TextButton("取消提交", on_click=self.on_cancel_submit, visible=False)
         self.count_text = ft.Text("已选: 0 个", color="purple")
+        # 纠正建议（每行一个单词，由用户确认）
+        self.correction_area = ft.Column([], spacing=0)
         
         return ft.Column([
             title,
@@ -127,13 +193,15 @@ class InputPage:
             text_title,
             self.text_input,
             ft.Row([self.word_input, add_word_btn]),
+            self.word_suggestions,
+            ft.Row([self.level_dropdown, suggest_btn]),
             ft.Text("提示: 在上方文本中选中单词 → 复制 → 粘贴到输入框 → 点击添加", size=10, color="grey"),
             
             ft.Divider(),
             
             # 图片模式
-            ft.Row([img_title, upload_btn, paste_btn]),
-            self.ocr_status,
+            ft.Row([img_title, upload_btn, paste_btn, doc_btn]),
+            ft.Row([self.ocr_status, self.ocr_cancel_btn]),
             self.ocr_text_display,
             self.ocr_words_area,
             
@@ -144,135 +212,280 @@ class InputPage:
             self.word_list_display,
             example_label,
             self.example_input,
-            ft.Row([clear_btn, submit_btn]),
-            self.status_text,
+            ft.Row([clear_btn, submit_btn, self.autocorrect_checkbox]),
+            ft.Row([self.status_text, self.submit_cancel_btn]),
+            self.correction_area,
         ], scroll=ft.ScrollMode.AUTO, expand=True)
     
-    def on_add_word(self, e):
+    async def on_add_word(self, e):
         """添加单词到列表"""
         text = self.word_input.value.strip()
         if not text:
             self.status_text.value = "请输入单词"
             self.status_text.color = "red"
-            self.page.update()
+            self.ui.update()
             return
         
-        words = re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text)
+        words = self.extract_words(text)
         if not words:
             self.status_text.value = "未识别到英文单词"
             self.status_text.color = "orange"
-            self.page.update()
+            self.ui.update()
             return
         
         added = 0
         for w in words:
-            w = w.lower()
-            if w not in self.selected_words and len(w) > 1:
+            # 手动输入的单词不检查识别错误
+            self._check_words.discard(w)
+            if w not in self.selected_words:
                 self.selected_words.append(w)
                 added += 1
         
         self.word_input.value = ""
+        self.word_suggestions.controls.clear()
+        
+        with self.ui.batch():
+            if added > 0:
+                self.update_word_list()
+                self.status_text.value = f"已添加 {added} 个单词"
+                self.status_text.color = "green"
+            else:
+                self.status_text.value = "单词已在列表中"
+                self.status_text.color = "orange"
+            
+            self.ui.update()
+    
+    def on_word_input_change(self, e):
+        """输入时补全正在输入的最后一个单词"""
+        text = self.word_input.value or ""
+        prefix = re.split(r"[^A-Za-z'-]", text)[-1]
+        
+        self.word_suggestions.controls.clear()
+        for word in word_completer.complete(prefix):
+            self.word_suggestions.controls.append(
+                ft.TextButton(word, on_click=lambda e, w=word, p=prefix: self.on_word_suggestion_click(w, p))
+            )
+        self.ui.update()
+    
+    def on_word_suggestion_click(self, word, prefix):
+        """用补全结果替换正在输入的单词"""
+        text = self.word_input.value or ""
+        if prefix and text.endswith(prefix):
+            text = text[:-len(prefix)]
+        self.word_input.value = text + word
+        self.word_suggestions.controls.clear()
+        self.word_input.focus()
+        self.ui.update()
+    
+    async def on_suggest_words(self, e):
+        """按词频从文章中选出可能不认识的单词"""
+        text = (self.text_input.value or "").strip()
+        if not text:
+            self.status_text.value = "请先在上方粘贴文章"
+            self.status_text.color = "red"
+            self.ui.update()
+            return
         
-        if added > 0:
+        words = await run_cpu(suggest_unknown_words, text, self.level_dropdown.value or DEFAULT_LEVEL)
+        selected = set(self.selected_words)
+        added = [w for w in words if w not in selected]
+        self.selected_words.extend(added)
+        
+        if added:
             self.update_word_list()
-            self.status_text.value = f"已添加 {added} 个单词"
+            self.status_text.value = f"已选出 {len(added)} 个生词，可在下方列表中移除不需要的"
             self.status_text.color = "green"
+        elif words:
+            self.status_text.value = "生词已全部在列表中"
+            self.status_text.color = "orange"
         else:
-            self.status_text.value = "单词已在列表中"
+            self.status_text.value = "文章中没有超出所选水平的单词"
             self.status_text.color = "orange"
         
-        self.page.update()
+        self.ui.update()
     
     def on_upload_image(self, e):
         """上传图片"""
-        file_picker = ft.FilePicker(on_result=self.on_file_result)
+        file_picker = ft.FilePicker(on_result=self.on_file_result, on_upload=self.on_file_upload)
+        self.page.overlay.append(file_picker)
+        # 文件选择器要先添加到页面上才能打开，立即刷新
+        self.ui.update()
+        self.ui.flush()
+        file_picker.pick_files(
+            allowed_extensions=[ext.lstrip(".") for ext in IMAGE_EXTENSIONS],
+            allow_multiple=False
+        )
+    
+    def on_upload_document(self, e):
+        """上传文档（PDF/EPUB/TXT）"""
+        file_picker = ft.FilePicker(on_result=self.on_file_result, on_upload=self.on_file_upload)
         self.page.overlay.append(file_picker)
-        self.page.update()
+        self.ui.update()
+        self.ui.flush()
         file_picker.pick_files(
-            allowed_extensions=["png", "jpg", "jpeg", "bmp"],
+            allowed_extensions=[ext.lstrip(".") for ext in DOCUMENT_EXTENSIONS],
             allow_multiple=False
         )
     
-    def on_paste_clipboard(self, e):
+    async def on_paste_clipboard(self, e):
         """粘贴剪贴板图片"""
         self.ocr_status.value = "正在读取剪贴板图片..."
         self.ocr_status.color = "blue"
-        self.page.update()
+        self.ui.update()
         
         try:
-            import subprocess
-            
-            # 使用PowerShell获取剪贴板图片（Windows最可靠的方式）
-            temp_path = os.path.join(tempfile.gettempdir(), "vocab_clipboard.png")
-            
-            # 先删除旧文件
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
-            
-            ps_script = '''
-Add-Type -AssemblyName System.Windows.Forms
-Add-Type -AssemblyName System.Drawing
-$img = [Windows.Forms.Clipboard]::GetImage()
-if ($img -ne $null) {
-    $img.Save("''' + temp_path.replace('\\', '/') + '''", [System.Drawing.Imaging.ImageFormat]::Png)
-    Write-Output "success"
-} else {
-    Write-Output "no_image"
-}
-'''
-            result = subprocess.run(
-                ['powershell', '-Command', ps_script],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            # 备用方式要启动PowerShell，最多等待10秒
+            image = await run_io(self.grab_clipboard_image)
             
-            if 'success' in result.stdout and os.path.exists(temp_path):
-                self.process_image_file(temp_path)
+            if image is not None:
+                await self.process_image(image)
                 return
             else:
                 self.ocr_status.value = "剪贴板中没有图片。请先用 Win+Shift+S 截图"
                 self.ocr_status.color = "orange"
-                self.page.update()
+                self.ui.update()
                 return
                 
         except Exception as ex:
             self.ocr_status.value = f"读取剪贴板失败: {ex}"
             self.ocr_status.color = "red"
-            self.page.update()
+            self.ui.update()
+    
+    def grab_clipboard_image(self):
+        """
+        读取剪贴板中的图片，全程在内存中完成，不写临时文件
+        
+        返回:
+            PIL图片、PNG字节数据或图片文件路径；剪贴板中没有图片时返回 None
+        """
+        try:
+            from PIL import Image, ImageGrab
+            
+            data = ImageGrab.grabclipboard()
+            if isinstance(data, Image.Image):
+                return data
+            if isinstance(data, list):
+                # 复制的是图片文件
+                for path in data:
+                    if path.lower().endswith(IMAGE_EXTENSIONS):
+                        return path
+                return None
+        except Exception:
+            pass
+        
+        if sys.platform != "win32":
+            return None
+        
+        import base64
+        import subprocess
+        
+        # 备用: 使用PowerShell获取剪贴板图片，通过标准输出传回base64编码的PNG
+        ps_script = '''
+Add-Type -AssemblyName System.Windows.Forms
+Add-Type -AssemblyName System.Drawing
+$img = [Windows.Forms.Clipboard]::GetImage()
+if ($img -ne $null) {
+    $ms = New-Object System.IO.MemoryStream
+    $img.Save($ms, [System.Drawing.Imaging.ImageFormat]::Png)
+    Write-Output ([Convert]::ToBase64String($ms.ToArray()))
+} else {
+    Write-Output "no_image"
+}
+'''
+        result = subprocess.run(
+            ['powershell', '-Command', ps_script],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        
+        output = result.stdout.strip()
+        if not output or output == "no_image":
+            return None
+        return base64.b64decode(output)
     
-    def process_image_file(self, image_path):
-        """处理图片文件进行OCR"""
-        self.ocr_status.value = "正在识别图片..."
+    def _start_ocr(self, message):
+        """
+        开始识别图片或读取文档，取消上一次还没完成的识别
+        
+        返回:
+            CancelToken: 本次识别的取消标志
+        """
+        if self._ocr_token:
+            self._ocr_token.cancel()
+        token = CancelToken()
+        self._ocr_token = token
+        self.ocr_status.value = message
         self.ocr_status.color = "blue"
-        self.page.update()
+        self.ocr_cancel_btn.visible = True
+        self.ui.update()
+        return token
+    
+    def _finish_ocr(self, token):
+        """识别结束（完成、失败或取消）"""
+        if self._ocr_token is token:
+            self._ocr_token = None
+            self.ocr_cancel_btn.visible = False
+    
+    async def on_cancel_ocr(self, e):
+        """取消识别，已显示的单词仍可选择（正在识别的条带或页面完成后后台才停止）"""
+        if self._ocr_token:
+            self._ocr_token.cancel()
+            self._finish_ocr(self._ocr_token)
+            self.ocr_status.value = f"已取消，已识别 {len(self.ocr_words)} 个单词"
+            self.ocr_status.color = "orange"
+        self.ui.update()
+    
+    async def process_image(self, source):
+        """
+        对图片进行OCR（在线程池中识别，期间界面可以继续操作）
+        
+        参数:
+            source: 图片来源（文件路径、字节数据、文件对象或PIL图片）
+        """
+        token = self._start_ocr("正在识别图片...")
+        loop = asyncio.get_running_loop()
+        
+        def on_band(index, total, words):
+            if token.cancelled:
+                return
+            # 在识别线程中分类，显示交给事件循环
+            kinds = self._classify_words(words)
+            loop.call_soon_threadsafe(self.on_ocr_band, token, index, total, words, kinds)
         
         try:
             from ocr_handler import ocr_handler
-            available, error = ocr_handler.is_available()
+            # 第一次识别时要加载模型（几秒），也在线程池中进行
+            available, error = await run_cpu(ocr_handler.is_available)
+            if token.cancelled:
+                return
             
             if not available:
                 self.ocr_status.value = f"OCR不可用: {error}"
                 self.ocr_status.color = "red"
-                self.page.update()
+                self.ui.update()
                 return
             
-            success, result = ocr_handler.recognize_image(image_path)
+            # 清空上一次的结果，长图按条带逐步显示识别到的单词
+            self.ocr_words = []
+            self.ocr_kinds = {}
+            self._image_words = set()
+            self.ocr_selected.clear()
+            self.display_ocr_words()
+            self.ocr_words_area.visible = True
+            
+            success, result = await run_cpu(
+                ocr_handler.recognize_image_tiled, source, on_band=on_band, should_cancel=token
+            )
+            if token.cancelled:
+                return
             
             if success:
                 self.ocr_text = result
                 self.ocr_original_text.value = result[:500] + ("..." if len(result) > 500 else "")
                 self.ocr_text_display.visible = True
                 
-                self.ocr_words = self.extract_words(result)
-                self.ocr_selected.clear()
-                self.display_ocr_words()
-                
-                self.ocr_words_area.visible = True
-                self.ocr_status.value = f"识别成功，共 {len(self.ocr_words)} 个单词，点击选择"
+                self.ocr_status.value = f"识别成功，共 {len(self.ocr_words)} 个单词（生词 {self.count_new_words()} 个），点击选择"
                 self.ocr_status.color = "green"
             else:
                 self.ocr_status.value = f"识别失败: {result}"
@@ -281,57 +494,234 @@ if ($img -ne $null) {
         except Exception as ex:
             self.ocr_status.value = f"错误: {ex}"
             self.ocr_status.color = "red"
+        finally:
+            self._finish_ocr(token)
         
-        self.page.update()
+        self.ui.update()
+    
+    def on_ocr_band(self, token, index, total, words, kinds):
+        """分块识别时每完成一个条带后在事件循环中调用，追加显示新单词"""
+        if token.cancelled:
+            return
+        self._image_words.update(words)
+        self.append_ocr_words(words, kinds)
+        if index < total:
+            self.ocr_status.value = f"正在识别图片 ({index}/{total})，已识别 {len(self.ocr_words)} 个单词..."
+        self.ui.update()
     
-    def on_file_result(self, e):
-        """处理上传的图片"""
+    async def on_file_result(self, e):
+        """处理上传的图片或文档"""
         if not e.files:
             return
-        self.process_image_file(e.files[0].path)
+        
+        f = e.files[0]
+        if f.path:
+            # 桌面模式: 直接读取本地文件
+            if f.name.lower().endswith(DOCUMENT_EXTENSIONS):
+                await self.process_document(f.path)
+            else:
+                await self.process_image(f.path)
+            return
+        
+        # Web模式: 浏览器中的文件没有本地路径，需要先上传到服务器
+        # 每次上传使用唯一文件名，避免多个会话同时上传时互相覆盖
+        upload_name = f"{uuid.uuid4().hex}{os.path.splitext(f.name)[1].lower()}"
+        self._upload_names[f.name] = upload_name
+        e.control.upload([
+            ft.FilePickerUploadFile(f.name, upload_url=self.page.get_upload_url(upload_name, 600))
+        ])
+    
+    async def on_file_upload(self, e):
+        """Web模式上传完成后处理文件并删除服务器上的副本"""
+        if e.error:
+            self.ocr_status.value = f"上传失败: {e.error}"
+            self.ocr_status.color = "red"
+            self.ui.update()
+            return
+        if e.progress is None or e.progress < 1:
+            return
+        
+        upload_name = self._upload_names.pop(e.file_name, None)
+        if not upload_name:
+            return
+        
+        upload_path = os.path.join(UPLOAD_DIR, upload_name)
+        if upload_name.endswith(DOCUMENT_EXTENSIONS):
+            # 文档逐页读取，不整体读入内存
+            try:
+                await self.process_document(upload_path)
+            finally:
+                self._remove_upload(upload_path)
+            return
+        
+        try:
+            data = await run_io(self._read_upload, upload_path)
+        except OSError as ex:
+            self.ocr_status.value = f"读取上传文件失败: {ex}"
+            self.ocr_status.color = "red"
+            self.ui.update()
+            return
+        
+        await self.process_image(data)
+    
+    def _read_upload(self, path):
+        """读取上传的图片并删除服务器上的副本"""
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            self._remove_upload(path)
+    
+    @staticmethod
+    def _remove_upload(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    async def process_document(self, path):
+        """读取文档中的文字，逐页显示单词（在线程池中读取）"""
+        token = self._start_ocr("正在读取文档...")
+        self.ocr_text_display.visible = False
+        self.ocr_words = []
+        self.ocr_kinds = {}
+        self._image_words = set()
+        self.ocr_selected.clear()
+        with self.ui.batch():
+            self.display_ocr_words()
+            self.ocr_words_area.visible = True
+            self.ui.update()
+        
+        loop = asyncio.get_running_loop()
+        
+        def on_page(page_no, total, words):
+            if token.cancelled:
+                return
+            kinds = self._classify_words(words)
+            loop.call_soon_threadsafe(self.on_document_page, token, page_no, total, words, kinds)
+        
+        try:
+            from document_reader import document_reader
+            
+            success, result = await run_cpu(
+                document_reader.extract_words, path, on_page=on_page, should_cancel=token
+            )
+            if token.cancelled:
+                return
+            
+            if success:
+                self.ocr_status.value = f"读取完成，{result}，点击选择"
+                self.ocr_status.color = "green"
+            else:
+                self.ocr_status.value = f"读取失败: {result}"
+                self.ocr_status.color = "red"
+        except Exception as ex:
+            self.ocr_status.value = f"错误: {ex}"
+            self.ocr_status.color = "red"
+        finally:
+            self._finish_ocr(token)
+        
+        self.ui.update()
+    
+    def on_document_page(self, token, page_no, total, words, kinds):
+        """文档每读完一页后在事件循环中调用，追加显示新单词"""
+        if token.cancelled:
+            return
+        self.append_ocr_words(words, kinds)
+        progress = f"{page_no}/{total}" if total else f"第 {page_no} 段"
+        self.ocr_status.value = f"正在读取文档 ({progress})，已提取 {len(self.ocr_words)} 个单词..."
+        self.ui.update()
     
     def extract_words(self, text):
-        """提取单词"""
-        pattern = r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*"
-        words = re.findall(pattern, text)
-        seen = set()
-        result = []
-        for w in words:
-            w = w.lower()
-            if w not in seen and len(w) > 1:
-                seen.add(w)
-                result.append(w)
-        return result
+        """提取单词（小写、去重，按出现顺序）"""
+        return unique_words(text)
     
     def display_ocr_words(self):
         """显示OCR单词"""
         self.ocr_chips_container.controls.clear()
         
         for word in self.ocr_words:
-            is_selected = word in self.ocr_selected
-            chip = ft.Chip(
-                label=ft.Text(word),
-                bgcolor="purple" if is_selected else "grey",
-                selected=is_selected,
-                on_click=lambda e, w=word: self.on_ocr_word_click(w),
-            )
-            self.ocr_chips_container.controls.append(chip)
+            if self._is_ocr_word_visible(word):
+                self.ocr_chips_container.controls.append(self._make_ocr_chip(word))
         
-        self.page.update()
+        self.update_filter_text()
+        self.ui.update()
+    
+    @staticmethod
+    def _classify_words(words):
+        """一次分类整批单词（在线程池中调用），返回 {单词: 分类}"""
+        return {word: kind for kind, group in known_words.classify(words).items() for word in group}
+    
+    def append_ocr_words(self, words, kinds):
+        """
+        追加OCR单词，只为需要显示的单词创建控件
+        
+        参数:
+            words: 新识别出的单词
+            kinds: 这些单词的分类，见 _classify_words
+        """
+        for word in words:
+            if word in self.ocr_kinds:
+                continue
+            self.ocr_kinds[word] = kinds.get(word, NEW)
+            self.ocr_words.append(word)
+            if self._is_ocr_word_visible(word):
+                self.ocr_chips_container.controls.append(self._make_ocr_chip(word))
+        
+        self.update_filter_text()
+    
+    def _is_ocr_word_visible(self, word):
+        return (self.show_known_words or word in self.ocr_selected
+                or self.ocr_kinds.get(word, NEW) == NEW)
     
-    def on_ocr_word_click(self, word):
+    def count_new_words(self):
+        """OCR结果中的生词数量"""
+        return sum(1 for kind in self.ocr_kinds.values() if kind == NEW)
+    
+    def update_filter_text(self):
+        """显示被隐藏的单词数量"""
+        collected = sum(1 for kind in self.ocr_kinds.values() if kind == COLLECTED)
+        common = sum(1 for kind in self.ocr_kinds.values() if kind == COMMON)
+        if self.show_known_words or not (collected or common):
+            self.ocr_filter_text.value = ""
+        else:
+            self.ocr_filter_text.value = f"已隐藏 {common} 个常见词、{collected} 个已收集的单词"
+    
+    async def on_show_known_change(self, e):
+        """切换是否显示常见词和已收集的单词"""
+        self.show_known_words = bool(e.control.value)
+        self.display_ocr_words()
+    
+    def _make_ocr_chip(self, word):
+        is_selected = word in self.ocr_selected
+        kind = self.ocr_kinds.get(word, NEW)
+        return ft.Chip(
+            label=ft.Text(word),
+            data=word,
+            bgcolor="purple" if is_selected else ("grey" if kind == NEW else "#cfd8dc"),
+            selected=is_selected,
+            tooltip={COLLECTED: "已收集", COMMON: "常见词"}.get(kind),
+            on_click=self.on_ocr_word_click,
+        )
+    
+    async def on_ocr_word_click(self, e):
         """点击OCR单词"""
+        word = e.control.data
         if word in self.ocr_selected:
             self.ocr_selected.remove(word)
+            self._check_words.discard(word)
             if word in self.selected_words:
                 self.selected_words.remove(word)
         else:
             self.ocr_selected.add(word)
+            if word in self._image_words:
+                self._check_words.add(word)
             if word not in self.selected_words:
                 self.selected_words.append(word)
         
-        self.display_ocr_words()
-        self.update_word_list()
+        with self.ui.batch():
+            self.display_ocr_words()
+            self.update_word_list()
     
     def update_word_list(self):
         """更新单词列表"""
@@ -342,89 +732,240 @@ if ($img -ne $null) {
                 ft.Text(word, size=14, expand=True),
                 ft.IconButton(
                     icon=ft.icons.CLOSE,
-                    on_click=lambda e, w=word: self.remove_word(w),
+                    on_click=self.on_remove_word,
+                    data=word,
                     icon_size=16,
                 ),
             ])
             self.word_list_display.controls.append(row)
         
         self.count_text.value = f"已选: {len(self.selected_words)} 个"
-        self.page.update()
+        self.ui.update()
     
-    def remove_word(self, word):
+    async def on_remove_word(self, e):
         """移除单词"""
+        word = e.control.data
         if word in self.selected_words:
             self.selected_words.remove(word)
         if word in self.ocr_selected:
             self.ocr_selected.remove(word)
+        self._check_words.discard(word)
+        self._remove_correction(word)
         
-        self.update_word_list()
-        self.display_ocr_words()
+        with self.ui.batch():
+            self.update_word_list()
+            self.display_ocr_words()
     
-    def on_clear(self, e):
+    async def on_clear(self, e):
         """清空"""
         self.selected_words.clear()
         self.ocr_selected.clear()
+        self._check_words.clear()
+        self.correction_area.controls.clear()
         self.word_input.value = ""
         self.example_input.value = ""
-        self.update_word_list()
-        self.display_ocr_words()
-        self.status_text.value = "已清空"
-        self.status_text.color = "grey"
-        self.page.update()
+        with self.ui.batch():
+            self.update_word_list()
+            self.display_ocr_words()
+            self.status_text.value = "已清空"
+            self.status_text.color = "grey"
+            self.ui.update()
     
-    def on_submit(self, e):
-        """提交单词并自动查词典"""
+    async def on_submit(self, e):
+        """提交单词并自动查词典（在线程池中查询，期间界面可以继续操作）"""
+        if self._submit_token:
+            self.status_text.value = "正在提交，请等待完成或取消"
+            self.status_text.color = "orange"
+            self.ui.update()
+            return
+        
         if not self.selected_words:
             self.status_text.value = "请先添加单词"
             self.status_text.color = "red"
-            self.page.update()
+            self.ui.update()
             return
         
         example = self.example_input.value.strip()
-        total = len(self.selected_words)
+        # 其他工作进程新增的单词也按已收集处理
+        await run_io(db.sync_external_changes)
+        # 提交期间还可以继续添加单词，完成后只移除这次提交的单词
+        original = list(self.selected_words)
+        token = CancelToken()
+        self._submit_token = token
+        self.submit_cancel_btn.visible = True
+        
+        # 只检查从图片中选择的单词，手动输入和文档中的单词不会有识别错误
+        check_words = self._check_words.intersection(original) if self.autocorrect_checkbox.value else set()
+        self.correction_area.controls.clear()
+        
+        loop = asyncio.get_running_loop()
+        
+        def on_progress(index, total, word):
+            loop.call_soon_threadsafe(self._show_submit_progress, token, index, total, word)
+        
+        try:
+            total = len(original)
+            self.status_text.value = f"正在提交并查词典 (0/{total})..."
+            self.status_text.color = "blue"
+            self.ui.update()
+            
+            new_count, update_count, dict_success, done, suggestions = await run_io(
+                self._submit_words, original, example, token, check_words, on_progress
+            )
+        finally:
+            self._submit_token = None
+            self.submit_cancel_btn.visible = False
         
-        self.status_text.value = f"正在提交并查词典 (0/{total})..."
-        self.status_text.color = "blue"
-        self.page.update()
+        if token.cancelled:
+            self.status_text.value = f"已取消，已提交 {len(done)}/{total} 个单词（新增 {new_count} 个，更新 {update_count} 个）"
+            self.status_text.color = "orange"
+            # 只从列表中移除已经提交的单词，其余的可以再次提交
+            done = set(done)
+            submitted = [w for w in original if w in done]
+        else:
+            self.status_text.value = f"完成! 新增 {new_count} 个，更新 {update_count} 个，查词典成功 {dict_success} 个"
+            self.status_text.color = "green"
+            submitted = [w for w in original if w not in suggestions]
+            if suggestions:
+                # 例句留给确认后再次提交的单词
+                self.status_text.value += f"；{len(suggestions)} 个单词可能识别有误，请在下方确认后再提交"
+                self.status_text.color = "orange"
+            else:
+                self.example_input.value = ""
         
+        for word in submitted:
+            if word in self.selected_words:
+                self.selected_words.remove(word)
+            self.ocr_selected.discard(word)
+            self._check_words.discard(word)
+        with self.ui.batch():
+            self.update_word_list()
+            self.display_ocr_words()
+            self.show_corrections(suggestions)
+            self.ui.update()
+    
+    def show_corrections(self, suggestions):
+        """显示纠正建议，每个单词由用户选择替换（或删除）还是保留原词"""
+        self.correction_area.controls.clear()
+        for word, fixed in suggestions.items():
+            if fixed:
+                text = f"{word} → {fixed}？"
+                apply_label = f"改为 {fixed}"
+            else:
+                text = f"{word} 可能不是单词"
+                apply_label = "删除"
+            self.correction_area.controls.append(ft.Row([
+                ft.Text(text, size=13),
+                ft.TextButton(apply_label, on_click=self.on_apply_correction, data=(word, fixed)),
+                ft.TextButton("保留原词", on_click=self.on_keep_word, data=word),
+            ], data=word))
+        self.ui.update()
+    
+    async def on_apply_correction(self, e):
+        """采用纠正建议: 在待提交列表中替换为建议的单词（没有建议时删除）"""
+        word, fixed = e.control.data
+        if word in self.selected_words:
+            index = self.selected_words.index(word)
+            if fixed and fixed not in self.selected_words:
+                self.selected_words[index] = fixed
+            else:
+                del self.selected_words[index]
+        self.ocr_selected.discard(word)
+        self._check_words.discard(word)
+        self._remove_correction(word)
+        with self.ui.batch():
+            self.update_word_list()
+            self.display_ocr_words()
+    
+    async def on_keep_word(self, e):
+        """保留原词，再次提交时不再检查"""
+        word = e.control.data
+        self._check_words.discard(word)
+        self._remove_correction(word)
+        self.ui.update()
+    
+    def _remove_correction(self, word):
+        self.correction_area.controls = [c for c in self.correction_area.controls if c.data != word]
+    
+    def _show_submit_progress(self, token, index, total, word):
+        """在事件循环中显示提交进度（只刷新状态文字，连续的进度合并为每30毫秒一次）"""
+        if token is not self._submit_token or token.cancelled:
+            return
+        self.status_text.value = f"正在处理 ({index}/{total}): {word}"
+        self.ui.update(self.status_text)
+    
+    async def on_cancel_submit(self, e):
+        """取消提交（正在查询的单词完成后停止）"""
+        if self._submit_token:
+            self._submit_token.cancel()
+            self.status_text.value = "正在取消提交..."
+            self.status_text.color = "orange"
+            self.ui.update()
+    
+    def _submit_words(self, words, example, token, check_words=(), on_progress=None):
+        """
+        逐个提交单词，新单词查词典（在线程池中运行，不修改界面）
+        
+        参数:
+            words: 要提交的单词
+            example: 例句
+            token: 取消标志，每个单词处理前检查
+            check_words: 要检查是否识别错误的单词，查词典之前离线检查，有纠正建议的不查词典、暂不入库
+            on_progress: 每个单词处理前调用 on_progress(序号, 总数, 单词)
+        
+        返回:
+            tuple: (新增数, 更新数, 查词典成功数, 已提交的单词列表, 纠正建议 {原词: 建议的单词或None})
+        """
+        total = len(words)
         new_count = 0
         update_count = 0
         dict_success = 0
+        done = []
+        suggestions = {}
         
         try:
             from utils.dictionary import dictionary_api
         except:
             dictionary_api = None
+        if check_words:
+            from utils.spell import spell_index
         
-        for i, word in enumerate(self.selected_words):
-            # 更新进度
-            self.status_text.value = f"正在处理 ({i+1}/{total}): {word}"
-            self.page.update()
+        for i, word in enumerate(words):
+            if token.cancelled:
+                break
             
-            # 检查是否已存在
-            existing = db.get_word_by_text(word)
+            if on_progress:
+                on_progress(i + 1, total, word)
             
-            if existing:
+            # 检查是否已存在（内存中判断，不查询数据库）
+            if known_words.is_collected(word):
                 # 已存在，增加选择次数
-                db.update_word(existing['id'])
+                db.add_word(word)
                 update_count += 1
             else:
+                if word in check_words:
+                    # 疑似识别错误（有纠正建议或不像单词）时交给用户确认，不浪费一次网络查询和数据库写入
+                    suggestion = spell_index.suggest_corrections([word])
+                    if suggestion:
+                        suggestions.update(suggestion)
+                        continue
+                
                 # 新单词，尝试查词典
                 meaning = ""
                 phonetic = ""
                 part_of_speech = ""
                 
+                result = None
                 if dictionary_api:
                     try:
                         result = dictionary_api.lookup_word(word)
-                        if result:
-                            meaning = result.get('meaning', '')
-                            phonetic = result.get('phonetic', '')
-                            part_of_speech = result.get('part_of_speech', '')
-                            dict_success += 1
                     except:
                         pass
+                if result:
+                    meaning = result.get('meaning', '')
+                    phonetic = result.get('phonetic', '')
+                    part_of_speech = result.get('part_of_speech', '')
+                    dict_success += 1
                 
                 # 添加到数据库
                 db.add_word(
@@ -435,22 +976,13 @@ if ($img -ne $null) {
                     example_sentence=example if i == 0 else ""  # 只给第一个单词设置例句
                 )
                 new_count += 1
+            done.append(word)
         
-        # 更新所有单词的例句（如果有）
+        # 更新已提交单词的例句（如果有）
         if example:
-            for word in self.selected_words:
+            for word in done:
                 word_info = db.get_word_by_text(word)
                 if word_info and not word_info.get('example_sentence'):
                     db.update_word(word_info['id'], example_sentence=example)
         
-        self.status_text.value = f"完成! 新增 {new_count} 个，更新 {update_count} 个，查词典成功 {dict_success} 个"
-        self.status_text.color = "green"
-        
-        # 清空
-        self.selected_words.clear()
-        self.ocr_selected.clear()
-        self.example_input.value = ""
-        self.update_word_list()
-        self.display_ocr_words()
-        
-        self.page.update()
+        return new_count, update_count, dict_success, done, suggestions
@@ -4,12 +4,33 @@
 """
 
 import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
 import flet as ft
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import db
+from utils.prefix_index import word_completer
+from utils.ui_scheduler import get_scheduler
+from utils.executors import CancelToken, run_io
+from pdf_layouts import LAYOUTS, LAYOUT_OPTIONS, DEFAULT_LAYOUT
+from export_jobs import export_jobs, DONE, CANCELLED
+
+# 每次从数据库读取的单词数
+PAGE_SIZE = 50
+
+# 滚动到距离列表底部不到这个距离（像素）时读取下一页
+LOAD_MORE_DISTANCE = 800
+
+# 输入停顿多久后开始搜索（秒），连续输入时只搜索最后一次
+SEARCH_DEBOUNCE = 0.25
+
+# 缓存最近多少个关键词的搜索结果（第一页）
+SEARCH_CACHE_SIZE = 32
 
 
 class ManagePage:
@@ -17,9 +38,25 @@ class ManagePage:
     
     def __init__(self, page: ft.Page, on_navigate=None):
         self.page = page
-        self.words = []
+        self.ui = get_scheduler(page)  # 合并刷新请求
+        self.words = []  # 已经读取（显示）的单词
         self.selected_ids = set()  # 选中的单词ID
+        self.cards = {}  # 单词ID -> 卡片，选中、编辑、删除时只更新对应的卡片
         self.sort_by = "alphabetical"
+        self.keyword = ""  # 当前的搜索关键词
+        self.total_words = 0
+        self._has_more = False  # 是否还有没读取的单词
+        self._page_lock = threading.Lock()
+        self._loaded_version = None  # 列表对应的 db.change_count
+        # 边输入边搜索: 每次输入增加代号，过期的搜索结果不再显示
+        self._search_generation = 0
+        self._search_task = None  # 等待输入停顿的搜索（page.run_task 返回的 Future）
+        self._search_cache = OrderedDict()  # (关键词, 排序) -> 第一页单词
+        self._search_cache_version = db.change_count
+        self._search_lock = threading.Lock()
+        self.export_job = None  # 正在进行的导出任务
+        self._lookups = {}  # 单词ID -> 正在进行的查词典的取消标志
+        self._last_progress_update = 0.0
     
     def build(self):
         title = ft.Text("单词管理", size=24, weight=ft.FontWeight.BOLD)
@@ -39,13 +76,20 @@ class ManagePage:
         self.search_input = ft.TextField(
             label="搜索单词",
             on_submit=self.on_search,
+            on_change=self.on_search_input_change,
             width=150,
         )
+        self.search_suggestions = ft.Row([], wrap=True, spacing=0)
         
         refresh_btn = ft.ElevatedButton("刷新", on_click=self.on_refresh)
         select_all_btn = ft.ElevatedButton("全选", on_click=self.on_select_all, bgcolor="blue", color="white")
         
-        # 导出按钮
+        # 导出版式和导出按钮
+        self.layout_dropdown = ft.Dropdown(
+            options=[ft.dropdown.Option(name, label) for name, label in LAYOUT_OPTIONS],
+            value=DEFAULT_LAYOUT,
+            width=140,
+        )
         export_selected_btn = ft.ElevatedButton(
             "导出选中PDF",
             on_click=self.on_export_selected,
@@ -58,9 +102,13 @@ class ManagePage:
             bgcolor="red",
             color="white",
         )
+        self.cancel_export_btn = ft.TextButton("取消导出", on_click=self.on_cancel_export, visible=False)
+        self.cancel_lookup_btn = ft.TextButton("取消查询", on_click=self.on_cancel_lookup, visible=False)
+        self.export_progress = ft.ProgressBar(width=300, visible=False)
         
         self.stats_text = ft.Text("", color="grey", size=12)
-        self.word_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
+        # 只创建已读取的单词的卡片，滚动到底部附近时再读取下一页
+        self.word_list = ft.ListView(expand=True, on_scroll=self.on_list_scroll, on_scroll_interval=100)
         self.status_text = ft.Text("")
         
         self.load_words()
@@ -69,100 +117,266 @@ class ManagePage:
             title,
             ft.Divider(),
             ft.Row([self.sort_dropdown, self.search_input, refresh_btn, select_all_btn]),
-            ft.Row([export_selected_btn, export_all_btn]),
+            self.search_suggestions,
+            ft.Row([self.layout_dropdown, export_selected_btn, export_all_btn, self.cancel_export_btn]),
+            self.export_progress,
             self.stats_text,
             ft.Divider(),
             self.word_list,
-            self.status_text,
-        ], scroll=ft.ScrollMode.AUTO, expand=True)
+            ft.Row([self.status_text, self.cancel_lookup_btn]),
+        ], expand=True)
     
-    def load_words(self, keyword=""):
-        if keyword:
-            self.words = db.search_words(keyword)
-        else:
-            self.words = db.get_all_words(self.sort_by)
+    def load_words(self, keyword="", first_page=None):
+        """
+        从第一页开始重新读取单词
         
-        self.display_words()
+        参数:
+            keyword: 搜索关键词
+            first_page: 已经读取好的第一页单词（来自搜索缓存），None 时从数据库读取
+        """
+        # 与滚动时读取下一页互斥，避免两边同时修改列表
+        with self._page_lock:
+            self.keyword = keyword
+            self.words = []
+            self.cards = {}
+            self.word_list.controls.clear()
+            self._has_more = True
+            self._loaded_version = db.change_count
+            self.total_words = db.count_words()
+            
+            if first_page is None:
+                self._read_next_page()
+            else:
+                self._append_words(first_page)
+            if not self.words:
+                self.word_list.controls.append(ft.Text("暂无单词，请先到「采集」页面添加", color="grey"))
         
-        stats = db.get_statistics()
-        self.stats_text.value = f"共 {stats['total_words']} 个单词 | 已选中 {len(self.selected_ids)} 个"
+        self._update_selection_stats()
+        self.ui.update()
     
-    def display_words(self):
-        self.word_list.controls.clear()
-        
-        if not self.words:
-            self.word_list.controls.append(ft.Text("暂无单词，请先到「采集」页面添加", color="grey"))
-            self.page.update()
-            return
+    def on_show(self):
+        """切换回管理页面时调用，单词库没有变化时保留已读取的列表和滚动位置"""
+        if self._loaded_version != db.change_count:
+            self.load_words(self.keyword)
+    
+    def _load_next_page(self) -> bool:
+        """
+        读取下一页单词并添加卡片
         
-        for w in self.words:
-            word_id = w['id']
-            is_selected = word_id in self.selected_ids
-            
-            card = ft.Container(
-                content=ft.Column([
-                    ft.Row([
-                        ft.Checkbox(
-                            value=is_selected,
-                            on_change=lambda e, wid=word_id: self.on_checkbox_change(e, wid),
-                        ),
-                        ft.Text(w['word'], size=16, weight=ft.FontWeight.BOLD, color="blue"),
-                        ft.Text(w.get('phonetic') or '', color="grey", size=12, italic=True),
-                    ]),
-                    ft.Text(w.get('meaning') or '（待补充含义）', size=12),
-                    ft.Container(
-                        content=ft.Text("例句: " + (w.get('example_sentence') or ''), size=11, italic=True),
-                        visible=bool(w.get('example_sentence')),
-                    ),
-                    ft.Row([
-                        ft.Text(f"选中:{w.get('selection_count', 0)}", size=10, color="blue"),
-                        ft.Text(f"打印:{w.get('print_count', 0)}", size=10, color="green"),
-                        ft.Text(f"背诵:{w.get('recitation_count', 0)}", size=10, color="purple"),
-                    ]),
-                    ft.Row([
-                        ft.TextButton("编辑", on_click=lambda e, word=w: self.edit_word(word)),
-                        ft.TextButton("查词典", on_click=lambda e, word=w: self.lookup_word(word)),
-                        ft.TextButton("删除", on_click=lambda e, wid=word_id: self.delete_word(wid)),
-                    ]),
-                ]),
-                padding=10,
-                border=ft.border.all(2, "purple" if is_selected else "grey"),
-                border_radius=8,
-                margin=ft.margin.only(bottom=5),
-                bgcolor="lavender" if is_selected else None,
-            )
+        返回:
+            bool: 是否添加了卡片
+        """
+        if not self._has_more or not self._page_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._read_next_page()
+        finally:
+            self._page_lock.release()
+    
+    def _read_next_page(self) -> bool:
+        """读取下一页单词并添加卡片（调用前要先获得 _page_lock）"""
+        after = self.words[-1] if self.words else None
+        page_words = db.get_words_page(self.sort_by, after, PAGE_SIZE, self.keyword)
+        self._append_words(page_words)
+        return bool(page_words)
+    
+    def _append_words(self, page_words):
+        """添加一页单词的卡片"""
+        self._has_more = len(page_words) == PAGE_SIZE
+        for w in page_words:
+            card = self._build_card(w)
+            self.cards[w['id']] = card
             self.word_list.controls.append(card)
-        
-        self.page.update()
+        self.words.extend(page_words)
+    
+    def on_list_scroll(self, e):
+        """滚动到列表底部附近时读取下一页"""
+        if e.pixels < e.max_scroll_extent - LOAD_MORE_DISTANCE:
+            return
+        if self._load_next_page():
+            self.ui.update(self.word_list)
+    
+    def _build_card(self, w):
+        """创建单词卡片"""
+        card = ft.Container(
+            padding=10,
+            border_radius=8,
+            margin=ft.margin.only(bottom=5),
+        )
+        self._fill_card(card, w)
+        return card
+    
+    def _fill_card(self, card, w):
+        """设置卡片内容（编辑、查词典后只重新生成这一张卡片的内容）"""
+        word_id = w['id']
+        checkbox = ft.Checkbox(
+            value=word_id in self.selected_ids,
+            on_change=lambda e, wid=word_id: self.on_checkbox_change(e, wid),
+        )
+        card.content = ft.Column([
+            ft.Row([
+                checkbox,
+                ft.Text(w['word'], size=16, weight=ft.FontWeight.BOLD, color="blue"),
+                ft.Text(w.get('phonetic') or '', color="grey", size=12, italic=True),
+            ]),
+            ft.Text(w.get('meaning') or '（待补充含义）', size=12),
+            ft.Container(
+                content=ft.Text("例句: " + (w.get('example_sentence') or ''), size=11, italic=True),
+                visible=bool(w.get('example_sentence')),
+            ),
+            ft.Row([
+                ft.Text(f"选中:{w.get('selection_count', 0)}", size=10, color="blue"),
+                ft.Text(f"打印:{w.get('print_count', 0)}", size=10, color="green"),
+                ft.Text(f"背诵:{w.get('recitation_count', 0)}", size=10, color="purple"),
+            ]),
+            ft.Row([
+                ft.TextButton("编辑", on_click=lambda e, word=w: self.edit_word(word)),
+                ft.TextButton("查词典", data=w, on_click=self.on_lookup_click),
+                ft.TextButton("删除", on_click=lambda e, wid=word_id: self.delete_word(wid)),
+            ]),
+        ])
+        card.data = checkbox
+        self._style_card(card, word_id in self.selected_ids)
+    
+    def _style_card(self, card, selected):
+        """设置卡片的选中状态"""
+        card.border = ft.border.all(2, "purple" if selected else "grey")
+        card.bgcolor = "lavender" if selected else None
+        card.data.value = selected
+    
+    def _refresh_card(self, word_info):
+        """单词修改后重新读取并只更新它的卡片"""
+        updated = db.get_word_by_id(word_info['id'])
+        card = self.cards.get(word_info['id'])
+        if updated is None or card is None:
+            return
+        # word_info 是 self.words 中的字典，原地更新
+        word_info.update(updated)
+        self._loaded_version = db.change_count
+        self._fill_card(card, word_info)
+        self.ui.update(card)
+    
+    def _update_selection_stats(self):
+        self.stats_text.value = f"共 {self.total_words} 个单词 | 已选中 {len(self.selected_ids)} 个"
     
     def on_checkbox_change(self, e, word_id):
         if e.control.value:
             self.selected_ids.add(word_id)
         else:
             self.selected_ids.discard(word_id)
-        self.stats_text.value = f"共 {len(self.words)} 个单词 | 已选中 {len(self.selected_ids)} 个"
-        self.display_words()
+        # 只更新这一张卡片和统计文字，不重新生成列表
+        card = self.cards.get(word_id)
+        if card is not None:
+            self._style_card(card, e.control.value)
+            self.ui.update(card)
+        self._update_selection_stats()
+        self.ui.update(self.stats_text)
     
     def on_select_all(self, e):
-        self.selected_ids = {w['id'] for w in self.words}
-        self.stats_text.value = f"共 {len(self.words)} 个单词 | 已选中 {len(self.selected_ids)} 个"
-        self.display_words()
+        # 选中全部单词（搜索时为全部搜索结果），还没读取的单词读取后显示为选中
+        for w in self.words:
+            if w['id'] not in self.selected_ids:
+                self._style_card(self.cards[w['id']], True)
+        self.selected_ids.update(db.get_word_ids(self.keyword))
+        self._update_selection_stats()
+        self.ui.update()
     
     def on_sort_change(self, e):
         self.sort_by = e.control.value
+        self._cancel_pending_search()
         self.load_words()
     
     def on_search(self, e):
         keyword = self.search_input.value.strip()
+        self._cancel_pending_search()
+        self.search_suggestions.controls.clear()
         self.load_words(keyword if keyword else "")
     
+    def on_search_input_change(self, e):
+        """输入时补全单词库中的单词，停顿后显示搜索结果"""
+        self.search_suggestions.controls.clear()
+        for word in word_completer.complete(self.search_input.value or "", include_dictionary=False):
+            self.search_suggestions.controls.append(
+                ft.TextButton(word, on_click=lambda e, w=word: self.on_search_suggestion_click(w))
+            )
+        
+        keyword = (self.search_input.value or "").strip()
+        generation = self._cancel_pending_search()
+        cached = self._get_cached_search(keyword)
+        if cached is not None:
+            # 搜索过的关键词（如删除最后一个字母）直接显示，不等待
+            self.load_words(keyword, first_page=cached)
+            return
+        
+        # 排序方式在输入时确定，等待期间切换排序后结果不再显示
+        self._search_task = self.page.run_task(self._debounced_search, keyword, self.sort_by, generation)
+        self.ui.update()
+    
+    def _cancel_pending_search(self) -> int:
+        """
+        取消等待中的搜索，正在进行的搜索完成后也不再显示结果
+        
+        返回:
+            int: 新的搜索代号
+        """
+        self._search_generation += 1
+        if self._search_task is not None:
+            self._search_task.cancel()
+            self._search_task = None
+        return self._search_generation
+    
+    async def _debounced_search(self, keyword, sort_by, generation):
+        """输入停顿后搜索（在事件循环中等待，数据库查询在线程池中进行）"""
+        await asyncio.sleep(SEARCH_DEBOUNCE)
+        if generation != self._search_generation:
+            return
+        version = db.change_count
+        page_words = await run_io(db.get_words_page, sort_by, None, PAGE_SIZE, keyword)
+        self._put_cached_search(keyword, sort_by, page_words, version)
+        # 搜索期间又有新的输入或切换了排序方式
+        if generation != self._search_generation or sort_by != self.sort_by:
+            return
+        await run_io(self.load_words, keyword, first_page=page_words)
+    
+    def _get_cached_search(self, keyword):
+        """最近搜索过的关键词的第一页结果，单词库有变化后全部失效"""
+        key = (keyword, self.sort_by)
+        with self._search_lock:
+            self._check_search_cache()
+            page_words = self._search_cache.get(key)
+            if page_words is None:
+                return None
+            self._search_cache.move_to_end(key)
+            return list(page_words)
+    
+    def _put_cached_search(self, keyword, sort_by, page_words, version):
+        with self._search_lock:
+            self._check_search_cache()
+            if version != self._search_cache_version:
+                # 搜索期间单词库有变化，结果可能已经过期
+                return
+            self._search_cache[(keyword, sort_by)] = list(page_words)
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
+    def _check_search_cache(self):
+        db.sync_external_changes()
+        if self._search_cache_version != db.change_count:
+            self._search_cache.clear()
+            self._search_cache_version = db.change_count
+    
+    def on_search_suggestion_click(self, word):
+        self.search_input.value = word
+        self.on_search(None)
+    
     def on_refresh(self, e):
         self.search_input.value = ""
+        self.search_suggestions.controls.clear()
         self.selected_ids.clear()
         self.load_words()
         self.status_text.value = "已刷新"
         self.status_text.color = "green"
-        self.page.update()
+        self.ui.update()
     
     def edit_word(self, word_info):
         word_id = word_info['id']
@@ -183,14 +397,14 @@ class ManagePage:
                 example_sentence=example_input.value,
             )
             self.page.dialog.open = False
-            self.load_words(self.search_input.value.strip())
+            self._refresh_card(word_info)
             self.status_text.value = "已保存"
             self.status_text.color = "green"
-            self.page.update()
+            self.ui.update()
         
         def on_cancel(e):
             self.page.dialog.open = False
-            self.page.update()
+            self.ui.update()
         
         self.page.dialog = ft.AlertDialog(
             title=ft.Text("编辑单词"),
@@ -206,27 +420,44 @@ class ManagePage:
             ],
         )
         self.page.dialog.open = True
-        self.page.update()
+        self.ui.update()
     
-    def lookup_word(self, word_info):
+    async def on_lookup_click(self, e):
+        await self.lookup_word(e.control.data)
+    
+    async def lookup_word(self, word_info):
+        """查词典并更新单词（在线程池中查询，可以同时查询多个单词）"""
+        word_id = word_info['id']
         word = word_info.get('word', '')
+        if word_id in self._lookups:
+            return
+        token = CancelToken()
+        self._lookups[word_id] = token
+        self.cancel_lookup_btn.visible = True
         self.status_text.value = f"正在查询 {word}..."
         self.status_text.color = "blue"
-        self.page.update()
+        self.ui.update()
         
-        try:
+        def fetch():
             from utils.dictionary import dictionary_api
             result = dictionary_api.lookup_word(word)
-            
-            if result and result.get('meaning'):
-                db.update_word(
-                    word_info['id'],
-                    meaning=result.get('meaning', ''),
-                    phonetic=result.get('phonetic', ''),
-                    part_of_speech=result.get('part_of_speech', ''),
-                    example_sentence=result.get('example', ''),
-                )
-                self.load_words(self.search_input.value.strip())
+            if not result or not result.get('meaning') or token.cancelled:
+                return False
+            db.update_word(
+                word_id,
+                meaning=result.get('meaning', ''),
+                phonetic=result.get('phonetic', ''),
+                part_of_speech=result.get('part_of_speech', ''),
+                example_sentence=result.get('example', ''),
+            )
+            return True
+        
+        try:
+            updated = await run_io(fetch)
+            if token.cancelled:
+                return
+            if updated:
+                self._refresh_card(word_info)
                 self.status_text.value = f"已更新 {word}"
                 self.status_text.color = "green"
             else:
@@ -235,22 +466,35 @@ class ManagePage:
         except Exception as ex:
             self.status_text.value = f"查询失败: {ex}"
             self.status_text.color = "red"
-        
-        self.page.update()
+        finally:
+            if self._lookups.get(word_id) is token:
+                del self._lookups[word_id]
+            self.cancel_lookup_btn.visible = bool(self._lookups)
+            self.ui.update()
+    
+    async def on_cancel_lookup(self, e):
+        """取消全部正在进行的查词典（已发出的请求返回后丢弃结果）"""
+        for token in self._lookups.values():
+            token.cancel()
+        self._lookups.clear()
+        self.cancel_lookup_btn.visible = False
+        self.status_text.value = "已取消查询"
+        self.status_text.color = "orange"
+        self.ui.update()
     
     def delete_word(self, word_id):
         def on_confirm(e):
             db.delete_word(word_id)
             self.selected_ids.discard(word_id)
             self.page.dialog.open = False
-            self.load_words(self.search_input.value.strip())
+            self._remove_card(word_id)
             self.status_text.value = "已删除"
             self.status_text.color = "green"
-            self.page.update()
+            self.ui.update()
         
         def on_cancel(e):
             self.page.dialog.open = False
-            self.page.update()
+            self.ui.update()
         
         self.page.dialog = ft.AlertDialog(
             title=ft.Text("确认删除"),
@@ -261,58 +505,126 @@ class ManagePage:
             ],
         )
         self.page.dialog.open = True
-        self.page.update()
+        self.ui.update()
+    
+    def _remove_card(self, word_id):
+        """删除单词后只移除它的卡片"""
+        self.words = [w for w in self.words if w['id'] != word_id]
+        card = self.cards.pop(word_id, None)
+        if card is not None:
+            self.word_list.controls.remove(card)
+        self.total_words -= 1
+        self._loaded_version = db.change_count
+        if not self.words and self._has_more:
+            self._load_next_page()
+        if not self.words:
+            self.word_list.controls.append(ft.Text("暂无单词，请先到「采集」页面添加", color="grey"))
+        self._update_selection_stats()
     
-    def on_export_selected(self, e):
+    async def on_export_selected(self, e):
         """导出选中的单词"""
         if not self.selected_ids:
             self.status_text.value = "请先勾选要导出的单词"
             self.status_text.color = "orange"
-            self.page.update()
+            self.ui.update()
             return
         
-        words_to_export = [w for w in self.words if w['id'] in self.selected_ids]
-        self._do_export(words_to_export, "选中的单词")
+        # 选中的单词不一定都已读取，在线程池中从数据库按当前顺序读取
+        keyword, sort_by, selected = self.keyword, self.sort_by, set(self.selected_ids)
+        
+        def read_selected():
+            words = db.search_words(keyword) if keyword else db.iter_words(sort_by)
+            return [w for w in words if w['id'] in selected]
+        
+        self._do_export(await run_io(read_selected), "选中的单词")
     
-    def on_export_all(self, e):
-        """导出全部单词"""
-        if not self.words:
+    async def on_export_all(self, e):
+        """导出全部单词（搜索时导出搜索结果）"""
+        versions = None
+        if self.keyword:
+            words = await run_io(db.search_words, self.keyword)
+            total = len(words)
+        else:
+            # 直接从数据库逐批读取，不需要把全部单词放在内存中；先只读取ID和版本号查找缓存
+            words = db.iter_words(self.sort_by)
+            versions = db.iter_word_versions(self.sort_by)
+            total = await run_io(db.count_words)
+        
+        if not total:
             self.status_text.value = "没有单词可导出"
             self.status_text.color = "red"
-            self.page.update()
+            self.ui.update()
             return
         
-        self._do_export(self.words, "全部单词")
+        self._do_export(words, "全部单词", total, versions)
     
-    def _do_export(self, words, label):
-        """执行导出"""
-        self.status_text.value = f"正在生成PDF ({len(words)}个单词)..."
-        self.status_text.color = "blue"
-        self.page.update()
+    def _do_export(self, words, label, total=None, versions=None):
+        """
+        提交后台导出任务
         
-        try:
-            from pdf_generator import pdf_generator
-            
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")
-            os.makedirs(output_dir, exist_ok=True)
-            output_path = os.path.join(output_dir, "vocabulary.pdf")
-            
-            success, msg = pdf_generator.generate_vocabulary_pdf(words, output_path)
-            
-            if success:
-                # 只更新这次导出的单词的打印次数
-                word_ids = [w['id'] for w in words]
-                db.increment_print_count(word_ids)
-                self.status_text.value = f"PDF已保存: {output_path}"
-                self.status_text.color = "green"
-                self.load_words(self.search_input.value.strip())
-            else:
-                self.status_text.value = msg
-                self.status_text.color = "red"
-        except Exception as ex:
-            import traceback
-            traceback.print_exc()
-            self.status_text.value = f"导出失败: {ex}"
-            self.status_text.color = "red"
+        参数:
+            words: 单词列表或迭代器
+            label: 导出内容的说明
+            total: 单词数量，words 为迭代器时需要提供
+            versions: 单词版本迭代器（db.iter_word_versions()），words 为迭代器时用于查找缓存
+        """
+        if self.export_job and not self.export_job.finished:
+            self.status_text.value = "已有导出任务在进行中，请等待完成或取消"
+            self.status_text.color = "orange"
+            self.ui.update()
+            return
+        
+        if total is None:
+            total = len(words)
+        layout = self.layout_dropdown.value or DEFAULT_LAYOUT
+        self._last_progress_update = 0.0
+        self.export_job = export_jobs.submit(
+            words, total=total, layout=layout,
+            on_progress=self._on_export_progress, on_finish=self._on_export_finish, versions=versions,
+        )
         
-        self.page.update()
+        self.status_text.value = f"正在生成PDF ({label}，{total}个单词)..."
+        self.status_text.color = "blue"
+        self.export_progress.value = 0
+        self.export_progress.visible = True
+        self.cancel_export_btn.visible = True
+        self.ui.update()
+    
+    def on_cancel_export(self, e):
+        if self.export_job and not self.export_job.finished:
+            self.export_job.cancel()
+            self.status_text.value = "正在取消导出..."
+            self.status_text.color = "orange"
+            self.ui.update()
+    
+    def _on_export_progress(self, job):
+        """导出进度（后台线程中每页回调一次，界面最多每0.5秒刷新一次）"""
+        now = time.monotonic()
+        if now - self._last_progress_update < 0.5 or job.cancelled:
+            return
+        self._last_progress_update = now
+        self.status_text.value = f"正在生成PDF ({job.done}/{job.total})..."
+        if job.total:
+            self.export_progress.value = job.done / job.total
+        self.ui.update()
+    
+    def _on_export_finish(self, job):
+        """导出结束（在后台线程中调用）"""
+        self.export_progress.visible = False
+        self.cancel_export_btn.visible = False
+        if job.status == DONE:
+            self.status_text.value = f"PDF已保存: {job.output_path}"
+            if job.cached:
+                self.status_text.value += "（单词没有变化，使用了上次生成的PDF）"
+            if LAYOUTS[job.layout].hint:
+                self.status_text.value += f"（{LAYOUTS[job.layout].hint}）"
+            self.status_text.color = "green"
+            self.load_words(self.keyword)
+        elif job.status == CANCELLED:
+            self.status_text.value = "导出已取消"
+            self.status_text.color = "orange"
+        else:
+            self.status_text.value = job.message
+            self.status_text.color = "red"
+        self.ui.update()
+
@@ -11,6 +11,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import db
+from utils.ui_scheduler import get_scheduler
 
 
 class ReviewPage:
@@ -18,6 +19,7 @@ class ReviewPage:
     
     def __init__(self, page: ft.Page, on_navigate=None):
         self.page = page
+        self.ui = get_scheduler(page)  # 合并刷新请求
         self.words = []
         self.index = 0
         self.show_meaning = False
@@ -69,15 +71,16 @@ class ReviewPage:
         if not self.words:
             self.status_text.value = "没有单词可背诵，请先添加"
             self.status_text.color = "red"
-            self.page.update()
+            self.ui.update()
             return
         
         self.index = 0
         self.show_meaning = False
-        self.show_current()
-        self.status_text.value = f"开始背诵，共{len(self.words)}个单词"
-        self.status_text.color = "green"
-        self.page.update()
+        with self.ui.batch():
+            self.show_current()
+            self.status_text.value = f"开始背诵，共{len(self.words)}个单词"
+            self.status_text.color = "green"
+            self.ui.update()
     
     def show_current(self):
         if self.index >= len(self.words):
@@ -92,12 +95,12 @@ class ReviewPage:
         self.meaning_text.visible = False
         self.show_meaning = False
         self.progress_text.value = f"{self.index + 1} / {len(self.words)}"
-        self.page.update()
+        self.ui.update()
     
     def show_answer(self, e):
         self.meaning_text.visible = True
         self.show_meaning = True
-        self.page.update()
+        self.ui.update()
     
     def next_word(self, e):
         self.index += 1
@@ -110,7 +113,6 @@ class ReviewPage:
             self.progress_text.value = ""
             self.status_text.value = "背诵完成!"
             self.status_text.color = "green"
+            self.ui.update()
         else:
             self.show_current()
-        
-        self.page.update()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+PDF缓存 - 导出过的单词表不再重新生成
+
+缓存按内容寻址: 文件名是 (单词ID及其版本号、标题、版式、字体、日期) 的 sha256，
+同样的单词、同样的顺序再次导出时直接复制缓存的文件，几毫秒就能完成；
+单词每修改一次版本号（words.version）加1，包含它的导出内容的键随之改变，其他缓存不受影响。
+PDF首页印有生成日期，日期也计入键，缓存的文件不会印着以前的日期。
+
+缓存保存在缓存目录（见 utils.cache_dir）的 pdf 子目录中，总大小超过上限时删除最久没有使用的文件，
+上限可通过环境变量 VOCAB_PDF_CACHE_MB 配置（单位MB，0 表示不使用缓存）。
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.cache_dir import CACHE_DIR
+
+PDF_CACHE_DIR = os.path.join(CACHE_DIR, "pdf")
+
+# 缓存大小上限的环境变量（MB）
+CACHE_SIZE_ENV = "VOCAB_PDF_CACHE_MB"
+DEFAULT_CACHE_MB = 200
+
+# 绘制方式改变（版式调整等）时增加版本号，旧的缓存不再命中
+_KEY_VERSION = 2
+
+# 没有ID的单词（不在单词库中）用绘制到PDF中的字段计算键
+_CONTENT_FIELDS = ("word", "phonetic", "part_of_speech", "meaning", "example_sentence")
+
+
+def _cache_limit() -> int:
+    """缓存大小上限（字节）"""
+    try:
+        mb = float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_MB))
+    except ValueError:
+        mb = DEFAULT_CACHE_MB
+    return max(0, int(mb * 1024 * 1024))
+
+
+def word_version(w: Dict) -> Tuple:
+    """单词的版本: (ID, 版本号)，与 db.iter_word_versions 相同，内容改变后版本也会改变"""
+    if w.get('id') is None:
+        return tuple(w.get(field) or '' for field in _CONTENT_FIELDS)
+    return w['id'], w.get('version')
+
+
+class PDFCache:
+    """已生成PDF的缓存（线程安全）"""
+    
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR, max_bytes: Optional[int] = None):
+        """
+        参数:
+            cache_dir: 缓存目录
+            max_bytes: 缓存大小上限（字节），默认读取环境变量 VOCAB_PDF_CACHE_MB
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = _cache_limit() if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+    
+    def make_key(self, versions: Iterable[Tuple], title: str, layout: str, font: str) -> str:
+        """
+        计算缓存键
+        
+        参数:
+            versions: 按导出顺序排列的单词版本（见 word_version / db.iter_word_versions）
+            title: PDF标题
+            layout: 版式名称
+            font: 字体（名称和文件路径）
+        
+        返回:
+            str: 十六进制的 sha256
+        """
+        h = hashlib.sha256()
+        header = [_KEY_VERSION, title, layout, font, date.today().isoformat()]
+        h.update(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+        for version in versions:
+            h.update(b"\n")
+            h.update(repr(version).encode("utf-8"))
+        return h.hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pdf")
+    
+    def get(self, key: str, output_path: str) -> bool:
+        """
+        缓存命中时把缓存的PDF复制到 output_path
+        
+        返回:
+            bool: 是否命中
+        """
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_path)
+            # 修改时间作为最近使用时间，淘汰时使用
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"读取PDF缓存失败: {e}")
+            return False
+    
+    def put(self, key: str, pdf_path: str):
+        """把生成好的PDF加入缓存，超过大小上限时删除最久没有使用的缓存"""
+        if not self.enabled:
+            return
+        try:
+            if os.path.getsize(pdf_path) > self.max_bytes:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(pdf_path, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"保存PDF缓存失败: {e}")
+            return
+        self._evict()
+    
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """缓存文件列表 [(最近使用时间, 大小, 路径)]"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+    
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+    
+    def size(self) -> int:
+        """缓存占用的空间（字节）"""
+        return sum(size for _, size, _ in self._entries())
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# 创建全局PDF缓存实例
+pdf_cache = PDFCache()
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+PDF字体 - 查找和注册中文字体
+
+第一次导出PDF时才查找和注册字体（解析一个 TTF/TTC 文件要几百毫秒），之后的导出直接复用。
+
+查找顺序:
+    1. 环境变量 VOCAB_FONT_PATH 指定的字体文件或目录（多个用系统路径分隔符分开）
+    2. Windows、Linux、macOS 的系统字体目录和用户字体目录中常见的中文字体
+
+扫描结果保存在缓存目录（见 utils.cache_dir）的 fonts.json 中，字体目录没有变化时不再重新扫描；
+实际注册成功的字体（TTC 文件还包括子字体序号）排在最前面，下次直接使用。
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache_dir import CACHE_DIR
+
+# 扫描结果
+FONT_INDEX_PATH = os.path.join(CACHE_DIR, "fonts.json")
+_INDEX_VERSION = 1
+
+# 自定义字体文件或目录的环境变量
+FONT_PATH_ENV = "VOCAB_FONT_PATH"
+
+# 注册后的字体名称
+CHINESE_FONT_NAME = "ChineseFont"
+
+# 常见的中文字体文件（小写文件名），按优先顺序排列；reportlab 只支持 TrueType 轮廓，不能用 OTF/CFF 字体
+KNOWN_FONTS = [
+    "simhei.ttf",
+    "msyh.ttc",
+    "msyh.ttf",
+    "simsun.ttc",
+    "simkai.ttf",
+    "wqy-microhei.ttc",
+    "wqy-zenhei.ttc",
+    "droidsansfallbackfull.ttf",
+    "droidsansfallback.ttf",
+    "uming.ttc",
+    "ukai.ttc",
+    "arial unicode.ttf",
+    "arialuni.ttf",
+    "stheiti light.ttc",
+    "stheiti medium.ttc",
+    "hiragino sans gb.ttc",
+    "songti.ttc",
+]
+
+FONT_EXTENSIONS = (".ttf", ".ttc")
+
+# 索引中不能使用的字体的子字体序号
+UNUSABLE = -1
+
+# 用于检查字体是否包含中文
+_CJK_SAMPLE = "中文单词"
+
+
+def font_dirs() -> List[str]:
+    """系统和用户的字体目录（只返回存在的目录）"""
+    home = os.path.expanduser("~")
+    windir = os.environ.get("WINDIR", "C:/Windows")
+    dirs = [
+        os.path.join(windir, "Fonts"),
+        os.path.join(os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local")),
+                     "Microsoft", "Windows", "Fonts"),
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".local", "share", "fonts"),
+        os.path.join(home, ".fonts"),
+        "/System/Library/Fonts",
+        "/Library/Fonts",
+        os.path.join(home, "Library", "Fonts"),
+    ]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def _configured_paths() -> List[str]:
+    value = os.environ.get(FONT_PATH_ENV, "")
+    return [p.strip() for p in value.split(os.pathsep) if p.strip()]
+
+
+def _walk(directory: str, dir_mtimes: Dict[str, float]) -> List[str]:
+    """列出目录（含子目录）中的字体文件，同时记录各目录的修改时间"""
+    files = []
+    for root, _, names in os.walk(directory):
+        try:
+            dir_mtimes[root] = os.path.getmtime(root)
+        except OSError:
+            continue
+        for name in names:
+            if name.lower().endswith(FONT_EXTENSIONS):
+                files.append(os.path.join(root, name))
+    return files
+
+
+def scan_fonts() -> Dict:
+    """
+    扫描字体目录
+    
+    返回:
+        Dict: 字体索引 {"version", "env", "dirs": {目录: 修改时间}, "fonts": [[路径, 子字体序号], ...]}，
+              子字体序号为 None 表示还没有尝试过
+    """
+    dir_mtimes: Dict[str, float] = {}
+    candidates: List[str] = []
+    
+    # 自定义的字体: 文件直接使用，目录中的全部字体文件都作为候选
+    for path in _configured_paths():
+        if os.path.isfile(path):
+            candidates.append(path)
+        elif os.path.isdir(path):
+            candidates.extend(sorted(_walk(path, dir_mtimes)))
+    
+    priority = {name: i for i, name in enumerate(KNOWN_FONTS)}
+    known = []
+    for directory in font_dirs():
+        for path in _walk(directory, dir_mtimes):
+            rank = priority.get(os.path.basename(path).lower())
+            if rank is not None:
+                known.append((rank, path))
+    candidates.extend(path for _, path in sorted(known))
+    
+    seen = set()
+    fonts = []
+    for path in candidates:
+        if path not in seen:
+            seen.add(path)
+            fonts.append([path, None])
+    
+    return {
+        "version": _INDEX_VERSION,
+        "env": os.environ.get(FONT_PATH_ENV, ""),
+        "dirs": dir_mtimes,
+        "fonts": fonts,
+    }
+
+
+def _index_is_valid(index: Dict) -> bool:
+    if index.get("version") != _INDEX_VERSION or index.get("env") != os.environ.get(FONT_PATH_ENV, ""):
+        return False
+    for directory, mtime in index.get("dirs", {}).items():
+        try:
+            if os.path.getmtime(directory) != mtime:
+                return False
+        except OSError:
+            return False
+    # 新出现的字体目录（如刚安装字体后创建的 ~/.fonts）
+    return all(d in index["dirs"] for d in font_dirs())
+
+
+def load_font_index(path: str = FONT_INDEX_PATH) -> Dict:
+    """读取字体索引，不存在或字体目录有变化时重新扫描并保存"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if _index_is_valid(index):
+            return index
+    except (OSError, ValueError):
+        pass
+    
+    index = scan_fonts()
+    save_font_index(index, path)
+    return index
+
+
+def save_font_index(index: Dict, path: str = FONT_INDEX_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"保存字体索引失败: {e}")
+
+
+def _load_ttfont(name: str, path: str, subfont: Optional[int]):
+    """
+    加载包含中文的字体
+    
+    参数:
+        subfont: TTC 文件的子字体序号，None 表示依次尝试各个子字体
+    
+    返回:
+        tuple: (TTFont, 子字体序号)，字体不可用或不含中文时返回 (None, None)
+    """
+    from reportlab.pdfbase.ttfonts import TTFont
+    
+    indexes = [subfont] if subfont is not None else range(8 if path.lower().endswith(".ttc") else 1)
+    for i in indexes:
+        try:
+            font = TTFont(name, path, subfontIndex=i)
+        except Exception as e:
+            # TTC 的子字体都已尝试过时不算错误
+            if "subfontIndex" not in str(e):
+                print(f"字体加载失败: {path} ({e})")
+            break
+        if all(ord(ch) in font.face.charToGlyph for ch in _CJK_SAMPLE):
+            return font, i
+    return None, None
+
+
+class FontRegistry:
+    """中文字体注册（每个进程只注册一次，线程安全）"""
+    
+    def __init__(self, index_path: str = FONT_INDEX_PATH):
+        self.index_path = index_path
+        self.font_name: Optional[str] = None
+        self.font_path: Optional[str] = None
+        self._done = False
+        self._lock = threading.Lock()
+    
+    def ensure_registered(self) -> Optional[str]:
+        """
+        注册中文字体（第一次调用时查找和注册，之后直接返回）
+        
+        返回:
+            str: 注册的字体名称，没有可用的中文字体时返回 None
+        """
+        if self._done:
+            return self.font_name
+        with self._lock:
+            if not self._done:
+                self._register()
+                self._done = True
+        return self.font_name
+    
+    def _register(self):
+        from reportlab.pdfbase import pdfmetrics
+        
+        index = load_font_index(self.index_path)
+        result, changed = self._try_fonts(index)
+        if result is None:
+            if changed:
+                save_font_index(index, self.index_path)
+            print("警告: 未找到中文字体，使用默认字体（可通过环境变量 VOCAB_FONT_PATH 指定字体文件）")
+            return
+        
+        font, path, subfont = result
+        pdfmetrics.registerFont(font)
+        self.font_name = font.fontName
+        self.font_path = path
+        print(f"成功注册中文字体: {path}" + (f" (子字体 {subfont})" if subfont else ""))
+        
+        # 成功的字体移到最前面，记下子字体序号，下次直接使用
+        if changed or index["fonts"][0] != [path, subfont]:
+            index["fonts"] = [[path, subfont]] + [entry for entry in index["fonts"] if entry[0] != path]
+            save_font_index(index, self.index_path)
+    
+    def _try_fonts(self, index: Dict) -> Tuple[Optional[Tuple], bool]:
+        """
+        依次尝试索引中的字体
+        
+        返回:
+            tuple: ((TTFont, 路径, 子字体序号) 或 None, 索引是否有变化)
+        """
+        changed = False
+        for entry in index.get("fonts", []):
+            path, subfont = entry
+            if subfont == UNUSABLE or not os.path.isfile(path):
+                continue
+            font, i = _load_ttfont(CHINESE_FONT_NAME, path, subfont)
+            if font is not None:
+                return (font, path, i), changed
+            # 不能用的字体（不含中文或不支持的格式）记下来，下次不再解析
+            entry[1] = UNUSABLE
+            changed = True
+        return None, changed
+
+
+# 创建全局字体注册实例
+font_registry = FontRegistry()
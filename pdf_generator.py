@@ -3,42 +3,57 @@
 PDF生成模块 - 生成单词表的PDF文件
 """
 
-import os
 import hashlib
-from datetime import datetime
-from typing import List, Dict
+import threading
+from typing import Callable, Dict, Iterable, Optional
 
-# 修复 Python 3.8 + reportlab 4.x 的 hashlib 兼容性问题
-_original_md5 = hashlib.md5
-def _fixed_md5(*args, **kwargs):
-    # 移除不兼容的参数
-    kwargs.pop('usedforsecurity', None)
-    return _original_md5(*args, **kwargs)
-hashlib.md5 = _fixed_md5
-
-_original_sha1 = hashlib.sha1
-def _fixed_sha1(*args, **kwargs):
-    kwargs.pop('usedforsecurity', None)
-    return _original_sha1(*args, **kwargs)
-hashlib.sha1 = _fixed_sha1
+from pdf_fonts import font_registry
+from pdf_layouts import DEFAULT_LAYOUT, create_layout
 
 PDF_AVAILABLE = False
 PDF_ERROR_MSG = ""
 
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-    from reportlab.lib import colors
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    PDF_AVAILABLE = True
-except ImportError as e:
-    PDF_ERROR_MSG = f"reportlab未安装: {e}"
-except Exception as e:
-    PDF_ERROR_MSG = f"reportlab加载失败: {e}"
+# reportlab 在第一次生成PDF时才导入（导入要几十毫秒），见 _load_reportlab
+A4 = canvas = pdfdoc = None
+_reportlab_loaded = False
+_reportlab_lock = threading.Lock()
+
+
+def _patch_hashlib():
+    """修复 Python 3.8 + reportlab 4.x 的 hashlib 兼容性问题"""
+    _original_md5 = hashlib.md5
+    def _fixed_md5(*args, **kwargs):
+        # 移除不兼容的参数
+        kwargs.pop('usedforsecurity', None)
+        return _original_md5(*args, **kwargs)
+    hashlib.md5 = _fixed_md5
+    
+    _original_sha1 = hashlib.sha1
+    def _fixed_sha1(*args, **kwargs):
+        kwargs.pop('usedforsecurity', None)
+        return _original_sha1(*args, **kwargs)
+    hashlib.sha1 = _fixed_sha1
+
+
+def _load_reportlab() -> bool:
+    """导入 reportlab（只导入一次），返回是否可用"""
+    global A4, canvas, pdfdoc, PDF_AVAILABLE, PDF_ERROR_MSG, _reportlab_loaded
+    if _reportlab_loaded:
+        return PDF_AVAILABLE
+    with _reportlab_lock:
+        if not _reportlab_loaded:
+            _patch_hashlib()
+            try:
+                from reportlab.lib.pagesizes import A4
+                from reportlab.pdfgen import canvas
+                from reportlab.pdfbase import pdfdoc
+                PDF_AVAILABLE = True
+            except ImportError as e:
+                PDF_ERROR_MSG = f"reportlab未安装: {e}"
+            except Exception as e:
+                PDF_ERROR_MSG = f"reportlab加载失败: {e}"
+            _reportlab_loaded = True
+    return PDF_AVAILABLE
 
 
 class PDFGenerator:
@@ -47,137 +62,107 @@ class PDFGenerator:
     def __init__(self):
         self.chinese_font_registered = False
         self.font_name = 'Helvetica'
-        self._register_chinese_font()
+        self._font_checked = False
     
-    def _register_chinese_font(self):
-        """注册中文字体"""
-        if self.chinese_font_registered:
-            return
+    def ensure_font(self) -> str:
+        """
+        注册中文字体（第一次导出时才查找和注册，见 pdf_fonts）
         
-        font_paths = [
-            "C:/Windows/Fonts/simhei.ttf",
-            "C:/Windows/Fonts/msyh.ttc",
-            "C:/Windows/Fonts/simsun.ttc",
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                    self.chinese_font_registered = True
-                    self.font_name = 'ChineseFont'
-                    print(f"成功注册中文字体: {font_path}")
-                    return
-                except Exception as e:
-                    print(f"字体注册失败: {e}")
-                    continue
-        
-        print("警告: 未找到中文字体，使用默认字体")
+        返回:
+            str: 导出使用的字体名称，没有中文字体时为 Helvetica
+        """
+        if not self._font_checked:
+            # 注册字体也会导入 reportlab，先打好 hashlib 补丁
+            _load_reportlab()
+            font_name = font_registry.ensure_registered()
+            if font_name:
+                self.font_name = font_name
+                self.chinese_font_registered = True
+            self._font_checked = True
+        return self.font_name
     
     def is_available(self) -> tuple:
-        if not PDF_AVAILABLE:
+        if not _load_reportlab():
             return False, PDF_ERROR_MSG
         return True, ""
     
-    def generate_vocabulary_pdf(self, words: List[Dict], output_path: str,
-                                  title: str = "陌生单词表") -> tuple:
-        if not PDF_AVAILABLE:
+    def generate_vocabulary_pdf(self, words: Iterable[Dict], output_path: str,
+                                  title: str = "陌生单词表", total: Optional[int] = None,
+                                  on_progress: Optional[Callable] = None,
+                                  should_cancel: Optional[Callable] = None,
+                                  layout: str = DEFAULT_LAYOUT) -> tuple:
+        """
+        生成单词表PDF（流式绘制）
+        
+        单词逐个读取、逐页绘制，不会先把全部单词整理成表格数据，
+        可以直接传入数据库游标（db.iter_words()），导出几万个单词时内存占用基本不变。
+        
+        参数:
+            words: 单词列表或迭代器
+            output_path: 输出文件路径
+            title: 标题
+            total: 单词总数（用于显示和进度），words 为列表时可省略
+            on_progress: 进度回调 on_progress(已绘制单词数, 总数)，每绘制完一页调用一次，总数可能为 None
+            should_cancel: 返回 True 时取消生成（每页检查一次）
+            layout: 版式名称，见 pdf_layouts.LAYOUT_OPTIONS
+        
+        返回:
+            tuple: (成功标志, 消息)
+        """
+        if not _load_reportlab():
             return False, PDF_ERROR_MSG
         
-        if not words:
+        renderer = create_layout(layout, self.ensure_font())
+        if renderer is None:
+            return False, f"未知的版式: {layout}"
+        
+        if total is None and hasattr(words, "__len__"):
+            total = len(words)
+        if total == 0:
             return False, "没有单词"
         
         try:
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                rightMargin=20*mm,
-                leftMargin=20*mm,
-                topMargin=20*mm,
-                bottomMargin=20*mm
-            )
+            c = canvas.Canvas(output_path, pagesize=A4, pageCompression=1)
+            c.setTitle(title)
             
-            styles = getSampleStyleSheet()
+            count = 0
+            for count in renderer.render(c, words, title, total):
+                c.showPage()
+                self._compress_last_page(c)
+                if on_progress:
+                    on_progress(count, total)
+                if should_cancel and should_cancel():
+                    return False, "已取消"
             
-            title_style = ParagraphStyle(
-                'Title',
-                parent=styles['Heading1'],
-                fontSize=18,
-                alignment=TA_CENTER,
-                spaceAfter=20,
-                fontName=self.font_name
-            )
-            
-            normal_style = ParagraphStyle(
-                'Normal',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName=self.font_name,
-                leading=14
-            )
-            
-            story = []
-            story.append(Paragraph(title, title_style))
-            
-            date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
-            story.append(Paragraph(f"生成时间: {date_str}  共 {len(words)} 个单词", normal_style))
-            story.append(Spacer(1, 10*mm))
-            
-            # 表格数据
-            table_data = [['序号', '单词', '音标', '词性', '含义']]
-            
-            for idx, w in enumerate(words, 1):
-                meaning = w.get('meaning') or ''
-                if len(meaning) > 35:
-                    meaning = meaning[:32] + "..."
-                table_data.append([
-                    str(idx),
-                    w.get('word', ''),
-                    w.get('phonetic') or '',
-                    w.get('part_of_speech') or '',
-                    meaning
-                ])
-            
-            col_widths = [15*mm, 35*mm, 30*mm, 15*mm, 85*mm]
-            table = Table(table_data, colWidths=col_widths)
-            
-            table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
-            ]))
-            
-            # 分页
-            per_page = 30
-            if len(words) > per_page:
-                for i in range(0, len(table_data), per_page):
-                    if i > 0:
-                        story.append(PageBreak())
-                    page_data = table_data[i:i+per_page]
-                    if i > 0:
-                        page_data = [['序号', '单词', '音标', '词性', '含义']] + page_data[1:]
-                    pt = Table(page_data, colWidths=col_widths)
-                    pt.setStyle(table.getStyle())
-                    story.append(pt)
-            else:
-                story.append(table)
-            
-            doc.build(story)
+            if count == 0:
+                return False, "没有单词"
             
+            c.save()
             return True, f"PDF已保存: {output_path}"
             
         except Exception as e:
             import traceback
             traceback.print_exc()
             return False, f"PDF生成失败: {e}"
+    
+    def _compress_last_page(self, c):
+        """
+        立即压缩刚结束的一页的内容流
+        
+        reportlab 会把每一页未压缩的内容保留到 save() 时才压缩，页数很多时内存随页数增长；
+        提前压缩后每页只占几KB。reportlab 内部结构不同时跳过，不影响生成结果。
+        """
+        try:
+            page = c._doc.Pages.pages[-1]
+            if page.Contents or not page.stream:
+                return
+            stream = pdfdoc.PDFStream(content=pdfdoc.PDFZCompress.encode(page.stream))
+            stream.dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName("FlateDecode")])
+            stream.__Comment__ = "page stream"
+            page.Contents = stream
+            page.stream = None
+        except (AttributeError, IndexError):
+            pass
 
 
 pdf_generator = PDFGenerator()
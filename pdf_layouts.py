@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+"""
+PDF版式 - 单词表、多栏单词表、折叠测验纸和双面卡片
+
+所有版式直接在 reportlab 画布上绘制:
+    - 文字宽度由 TextMetrics 按字符缓存，截断和换行不需要反复调用 stringWidth
+    - 文字编码由 TextEncoder 按字符缓存，每页的文字直接生成PDF操作符，
+      不经过 reportlab 的文字对象（每段文字都要重新编码、计算宽度）
+    - 背景和线条先画，整页的文字最后一次写入
+
+版式的 render() 是生成器，每画完一页 yield 一次已绘制的单词数，
+换页、进度和取消由 pdf_generator 统一处理。
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 页面尺寸（单位: 点）
+MM = 72 / 25.4
+PAGE_WIDTH = 210 * MM
+PAGE_HEIGHT = 297 * MM
+PAGE_MARGIN = 20 * MM
+
+
+class TextMetrics:
+    """
+    按字符缓存字体的文字宽度
+    
+    宽度按 1 点字号缓存，使用时乘以字号（reportlab 的 stringWidth 同样是逐字符累加，结果一致）。
+    """
+    
+    def __init__(self, font: str):
+        # 用到时才导入 reportlab，只读取版式列表（如管理页面的下拉框）时不加载
+        from reportlab.pdfbase import pdfmetrics
+        
+        self.font = font
+        self._string_width = pdfmetrics.stringWidth
+        self._widths: Dict[str, float] = {}
+    
+    def _measure(self, ch: str) -> float:
+        w = self._string_width(ch, self.font, 1)
+        self._widths[ch] = w
+        return w
+    
+    def width(self, text: str, size: float) -> float:
+        """文字宽度"""
+        widths = self._widths
+        try:
+            return sum(map(widths.__getitem__, text)) * size
+        except KeyError:
+            for ch in set(text).difference(widths):
+                self._measure(ch)
+            return sum(map(widths.__getitem__, text)) * size
+    
+    def fit(self, text: str, max_width: float, size: float, ellipsis: str = "...") -> str:
+        """文字超出宽度时截断并加省略号"""
+        if not text or self.width(text, size) <= max_width:
+            return text
+        widths = self._widths
+        available = max_width / size - self.width(ellipsis, 1)
+        total = 0.0
+        for i, ch in enumerate(text):
+            total += widths[ch]
+            if total > available:
+                return text[:i].rstrip() + ellipsis
+        return text
+    
+    def wrap(self, text: str, max_width: float, size: float, max_lines: Optional[int] = None) -> List[str]:
+        """
+        按宽度换行
+        
+        英文在空格处换行，中文可在任意字符处换行；超过 max_lines 行时最后一行截断并加省略号。
+        
+        返回:
+            List[str]: 各行文字
+        """
+        text = " ".join(text.split())
+        if not text:
+            return []
+        widths = self._widths
+        limit = max_width / size
+        lines = []
+        starts = []
+        start = 0
+        line_width = 0.0
+        last_space = -1
+        i = 0
+        n = len(text)
+        while i < n:
+            ch = text[i]
+            w = widths.get(ch)
+            if w is None:
+                w = self._measure(ch)
+            if line_width + w > limit and i > start:
+                if ch == " ":
+                    end, next_start = i, i + 1
+                elif last_space > start and ch.isascii() and text[i - 1].isascii():
+                    end, next_start = last_space, last_space + 1
+                else:
+                    end, next_start = i, i
+                starts.append(start)
+                lines.append(text[start:end].rstrip())
+                start = next_start
+                last_space = -1
+                if max_lines and len(lines) == max_lines:
+                    break
+                line_width = self.width(text[start:i], 1)
+                if i < start:
+                    i = start
+                continue
+            if ch == " ":
+                last_space = i
+            line_width += w
+            i += 1
+        else:
+            if start < n:
+                starts.append(start)
+                lines.append(text[start:])
+            return lines
+        
+        # 行数超出，最后一行放入剩余的全部文字再截断
+        lines[-1] = self.fit(text[starts[-1]:], max_width, size)
+        return lines
+
+
+class TextEncoder:
+    """
+    把文字编码为PDF字符串（每个文档一个）
+    
+    字体子集和编码按字符缓存，同一个字符只向 reportlab 查询一次；
+    TrueType 字体按 reportlab 文档中 splitString / getSubsetInternalName 的用法编码。
+    """
+    
+    def __init__(self, c, font: str):
+        from reportlab.pdfbase import pdfmetrics
+        
+        self.canvas = c
+        self._doc = c._doc
+        self._escape = c._escape
+        self._unicode2T1 = pdfmetrics.unicode2T1
+        self._font = pdfmetrics.getFont(font)
+        self._refs: Dict[str, str] = {}   # 字符 -> PDF字体名（子集）
+        self._codes: Dict[str, str] = {}  # 字符 -> 已转义的编码
+    
+    def _encode_char(self, ch: str):
+        font = self._font
+        doc = self._doc
+        if font._dynamicFont:
+            runs = [(font.getSubsetInternalName(subset, doc), data) for subset, data in font.splitString(ch, doc)]
+        else:
+            runs = [(doc.getInternalFontName(f.fontName), data)
+                    for f, data in self._unicode2T1(ch, [font] + font.substitutionFonts)]
+        self._refs[ch] = runs[0][0]
+        self._codes[ch] = self._escape(b"".join(data for _, data in runs))
+    
+    def encode(self, text: str) -> List[Tuple[str, str]]:
+        """
+        返回:
+            List[Tuple[str, str]]: [(PDF字体名, 已转义的字符串)]，相邻同一字体（子集）的字符合并
+        """
+        font = self._font
+        if font._multiByte and not font._dynamicFont:
+            return [(self._doc.getInternalFontName(font.fontName), font.formatForPdf(text))]
+        refs = self._refs
+        codes = self._codes
+        for ch in set(text).difference(codes):
+            self._encode_char(ch)
+        
+        # 通常整段文字都在同一个子集中，直接拼接
+        if len(set(map(refs.get, text))) == 1:
+            return [(refs[text[0]], "".join(map(codes.get, text)))]
+        
+        runs = []
+        current = None
+        buf = []
+        for ch in text:
+            ref = refs[ch]
+            if ref != current:
+                if buf:
+                    runs.append((current, "".join(buf)))
+                current = ref
+                buf = []
+            buf.append(codes[ch])
+        runs.append((current, "".join(buf)))
+        return runs
+
+
+class PageText:
+    """一页的文字: 直接生成PDF文字操作符，最后一次写入画布"""
+    
+    def __init__(self, encoder: TextEncoder, metrics: TextMetrics):
+        self._encoder = encoder
+        self._metrics = metrics
+        self._ops = ["q BT 0 g"]
+        self._font_ref = None
+        self._size = None
+    
+    def gray(self, value: float):
+        """文字颜色（灰度，0为黑色）"""
+        self._ops.append(f"{value:.2f} g")
+    
+    def draw(self, x: float, y: float, text: str, size: float, align: str = "left"):
+        """输出一段文字，align 为 left / center / right"""
+        if not text:
+            return
+        if align == "center":
+            x -= self._metrics.width(text, size) / 2
+        elif align == "right":
+            x -= self._metrics.width(text, size)
+        ops = self._ops
+        ops.append(f"1 0 0 1 {x:.2f} {y:.2f} Tm")
+        for font_ref, data in self._encoder.encode(text):
+            if font_ref != self._font_ref or size != self._size:
+                ops.append(f"{font_ref} {size:.2f} Tf")
+                self._font_ref = font_ref
+                self._size = size
+            ops.append(f"({data}) Tj")
+    
+    def flush(self, c):
+        self._ops.append("ET Q")
+        c.addLiteral("\n".join(self._ops))
+
+
+_metrics: Dict[str, TextMetrics] = {}
+
+
+def get_metrics(font: str) -> TextMetrics:
+    """获取字体的宽度缓存（同一字体只创建一次）"""
+    metrics = _metrics.get(font)
+    if metrics is None:
+        metrics = _metrics[font] = TextMetrics(font)
+    return metrics
+
+
+class Layout:
+    """版式基类"""
+    
+    name = ""
+    label = ""
+    hint = ""  # 打印提示，导出成功后显示
+    
+    def __init__(self, font: str):
+        self.font = font
+        self.metrics = get_metrics(font)
+        self._encoder = None
+    
+    def render(self, c, words: Iterable[Dict], title: str, total: Optional[int]) -> Iterator[int]:
+        """
+        逐页绘制
+        
+        参数:
+            c: reportlab 画布
+            words: 单词列表或迭代器
+            title: 标题
+            total: 单词总数（可能为 None）
+        
+        返回:
+            Iterator[int]: 每画完一页 yield 一次已绘制的单词数（不调用 showPage）
+        """
+        raise NotImplementedError
+    
+    def _begin_text(self, c) -> PageText:
+        """开始一页的文字"""
+        if self._encoder is None or self._encoder.canvas is not c:
+            self._encoder = TextEncoder(c, self.font)
+        return PageText(self._encoder, self.metrics)
+    
+    def _draw_title(self, t, title: str, total: Optional[int], y: float) -> float:
+        """绘制首页标题，返回标题下方的位置"""
+        t.draw(PAGE_WIDTH / 2, y - 18, title, 18, "center")
+        # 只印日期: 同一天再次导出时可以直接使用缓存的PDF（见 pdf_cache.py）
+        info = f"生成日期: {datetime.now().strftime('%Y-%m-%d')}"
+        if total is not None:
+            info += f"  共 {total} 个单词"
+        t.draw(PAGE_MARGIN, y - 48, info, 10)
+        return y - 52 - 10 * MM
+    
+    def _draw_page_number(self, t, page_no: int):
+        t.gray(0.5)
+        t.draw(PAGE_WIDTH / 2, PAGE_MARGIN / 2, f"- {page_no} -", 8, "center")
+        t.gray(0)
+
+
+class TableLayout(Layout):
+    """单词表: 序号、单词、音标、词性、含义（含义按列宽截断）"""
+    
+    name = "table"
+    label = "单词表"
+    
+    HEADER = ['序号', '单词', '音标', '词性', '含义']
+    COL_WIDTHS = [15 * MM, 35 * MM, 30 * MM, 15 * MM, 85 * MM]
+    ROW_HEIGHT = 20
+    PADDING = 4
+    
+    def render(self, c, words, title, total):
+        col_widths = self.COL_WIDTHS
+        table_width = sum(col_widths)
+        left = (PAGE_WIDTH - table_width) / 2
+        row_height = self.ROW_HEIGHT
+        
+        words = iter(words)
+        w = next(words, None)
+        count = 0
+        page_no = 0
+        while w is not None:
+            page_no += 1
+            t = self._begin_text(c)
+            y = PAGE_HEIGHT - PAGE_MARGIN
+            if page_no == 1:
+                y = self._draw_title(t, title, total, y)
+            top = y
+            
+            c.setFillGray(0.83)
+            c.rect(left, y - row_height, table_width, row_height, stroke=0, fill=1)
+            self._draw_row(t, left, y, self.HEADER, 11, header=True)
+            y -= row_height
+            
+            c.setFillGray(0.95)
+            while w is not None and y - row_height >= PAGE_MARGIN:
+                count += 1
+                if count % 2 == 0:
+                    c.rect(left, y - row_height, table_width, row_height, stroke=0, fill=1)
+                self._draw_row(t, left, y, [
+                    str(count),
+                    w.get('word', ''),
+                    w.get('phonetic') or '',
+                    w.get('part_of_speech') or '',
+                    w.get('meaning') or '',
+                ], 10)
+                y -= row_height
+                w = next(words, None)
+            
+            self._draw_grid(c, left, top, y)
+            self._draw_page_number(t, page_no)
+            t.flush(c)
+            yield count
+    
+    def _draw_row(self, t, left: float, y: float, cells: List[str], size: float, header: bool = False):
+        text_y = y - self.ROW_HEIGHT + (self.ROW_HEIGHT - size) / 2 + 1.5
+        x = left
+        for i, (cell, col_width) in enumerate(zip(cells, self.COL_WIDTHS)):
+            text = self.metrics.fit(cell, col_width - 2 * self.PADDING, size)
+            if i == 0 or header:
+                t.draw(x + col_width / 2, text_y, text, size, "center")
+            else:
+                t.draw(x + self.PADDING, text_y, text, size)
+            x += col_width
+    
+    def _draw_grid(self, c, left: float, top: float, bottom: float):
+        """整页的表格线一次画完"""
+        c.setStrokeGray(0.5)
+        c.setLineWidth(0.5)
+        right = left + sum(self.COL_WIDTHS)
+        p = c.beginPath()
+        y = top
+        while y >= bottom - 0.01:
+            p.moveTo(left, y)
+            p.lineTo(right, y)
+            y -= self.ROW_HEIGHT
+        x = left
+        for col_width in self.COL_WIDTHS:
+            p.moveTo(x, top)
+            p.lineTo(x, bottom)
+            x += col_width
+        p.moveTo(right, top)
+        p.lineTo(right, bottom)
+        c.drawPath(p, stroke=1, fill=0)
+
+
+class ColumnsLayout(Layout):
+    """多栏单词表: 每页三栏，单词和音标一行，含义最多两行"""
+    
+    name = "columns"
+    label = "多栏单词表"
+    
+    COLUMNS = 3
+    GAP = 6 * MM
+    WORD_SIZE = 10
+    MEANING_SIZE = 8
+    MEANING_LINES = 2
+    
+    def render(self, c, words, title, total):
+        columns = self.COLUMNS
+        col_width = (PAGE_WIDTH - 2 * PAGE_MARGIN - (columns - 1) * self.GAP) / columns
+        word_leading = self.WORD_SIZE + 3
+        meaning_leading = self.MEANING_SIZE + 2
+        entry_height = word_leading + meaning_leading * self.MEANING_LINES + 4
+        
+        words = iter(words)
+        w = next(words, None)
+        count = 0
+        page_no = 0
+        while w is not None:
+            page_no += 1
+            t = self._begin_text(c)
+            top = PAGE_HEIGHT - PAGE_MARGIN
+            if page_no == 1:
+                top = self._draw_title(t, title, total, top)
+            
+            col = 0
+            y = top
+            while w is not None:
+                if y - entry_height < PAGE_MARGIN:
+                    col += 1
+                    y = top
+                    if col == columns:
+                        break
+                x = PAGE_MARGIN + col * (col_width + self.GAP)
+                count += 1
+                y = self._draw_entry(t, x, y, col_width, count, w, word_leading, meaning_leading)
+                w = next(words, None)
+            
+            c.setStrokeGray(0.75)
+            c.setLineWidth(0.5)
+            for i in range(1, min(col + 1, columns)):
+                x = PAGE_MARGIN + i * (col_width + self.GAP) - self.GAP / 2
+                c.line(x, top, x, PAGE_MARGIN)
+            
+            self._draw_page_number(t, page_no)
+            t.flush(c)
+            yield count
+    
+    def _draw_entry(self, t, x: float, y: float, width: float, number: int, w: Dict,
+                    word_leading: float, meaning_leading: float) -> float:
+        """绘制一个单词，返回下一个单词的位置"""
+        metrics = self.metrics
+        y -= word_leading
+        head = f"{number}. {w.get('word', '')}"
+        head = metrics.fit(head, width, self.WORD_SIZE)
+        t.draw(x, y, head, self.WORD_SIZE)
+        
+        phonetic = w.get('phonetic') or ''
+        if phonetic:
+            head_width = metrics.width(head, self.WORD_SIZE) + 4
+            phonetic = metrics.fit(phonetic, width - head_width, self.MEANING_SIZE)
+            t.gray(0.45)
+            t.draw(x + head_width, y, phonetic, self.MEANING_SIZE)
+            t.gray(0)
+        
+        meaning = " ".join(filter(None, [w.get('part_of_speech'), w.get('meaning')]))
+        lines = metrics.wrap(meaning, width, self.MEANING_SIZE, self.MEANING_LINES)
+        for line in lines:
+            y -= meaning_leading
+            t.draw(x, y, line, self.MEANING_SIZE)
+        
+        # 含义不足两行时也占满两行，保持各栏对齐
+        return y - meaning_leading * (self.MEANING_LINES - len(lines)) - 4
+
+
+class QuizLayout(Layout):
+    """折叠测验纸: 左半页是单词和答题线，右半页是含义，沿中间的虚线向后折叠即可遮住含义"""
+    
+    name = "quiz"
+    label = "折叠测验纸"
+    hint = "沿中间的虚线向后折叠，遮住右半页的含义"
+    
+    ROW_HEIGHT = 28
+    WORD_SIZE = 11
+    MEANING_SIZE = 9
+    
+    def render(self, c, words, title, total):
+        fold_x = PAGE_WIDTH / 2
+        left = PAGE_MARGIN
+        right = PAGE_WIDTH - PAGE_MARGIN
+        word_width = 45 * MM
+        answer_left = left + 8 * MM + word_width
+        meaning_left = fold_x + 6 * MM
+        meaning_width = right - meaning_left
+        row_height = self.ROW_HEIGHT
+        
+        words = iter(words)
+        w = next(words, None)
+        count = 0
+        page_no = 0
+        while w is not None:
+            page_no += 1
+            t = self._begin_text(c)
+            y = PAGE_HEIGHT - PAGE_MARGIN
+            if page_no == 1:
+                y = self._draw_title(t, title, total, y)
+            top = y
+            
+            t.gray(0.45)
+            t.draw(left, y - 10, "单词", 9)
+            t.draw(answer_left, y - 10, "写出含义", 9)
+            t.draw(meaning_left, y - 10, "含义", 9)
+            t.gray(0)
+            y -= 16
+            
+            c.setStrokeGray(0.6)
+            c.setLineWidth(0.5)
+            while w is not None and y - row_height >= PAGE_MARGIN:
+                count += 1
+                baseline = y - 13
+                t.draw(left, baseline, f"{count}.", 9)
+                word = self.metrics.fit(w.get('word', ''), word_width - 2 * MM, self.WORD_SIZE)
+                t.draw(left + 8 * MM, baseline, word, self.WORD_SIZE)
+                phonetic = w.get('phonetic') or ''
+                if phonetic:
+                    t.gray(0.45)
+                    t.draw(left + 8 * MM, baseline - 11, self.metrics.fit(phonetic, word_width - 2 * MM, 7), 7)
+                    t.gray(0)
+                c.line(answer_left, baseline - 2, fold_x - 4 * MM, baseline - 2)
+                
+                meaning = " ".join(filter(None, [w.get('part_of_speech'), w.get('meaning')]))
+                line_y = baseline
+                for line in self.metrics.wrap(meaning, meaning_width, self.MEANING_SIZE, 2):
+                    t.draw(meaning_left, line_y, line, self.MEANING_SIZE)
+                    line_y -= self.MEANING_SIZE + 2
+                
+                y -= row_height
+                w = next(words, None)
+            
+            c.setDash(4, 3)
+            c.setStrokeGray(0.4)
+            c.line(fold_x, top + 4, fold_x, y)
+            c.setDash()
+            self._draw_page_number(t, page_no)
+            t.flush(c)
+            yield count
+
+
+class FlashcardLayout(Layout):
+    """
+    双面卡片: 每张纸 2 x 5 张卡片，正面是单词和音标，背面是词性、含义和例句
+    
+    背面的列左右对调，双面打印（长边翻转）后正反面对齐，沿虚线裁开即可。
+    """
+    
+    name = "flashcards"
+    label = "双面卡片"
+    hint = "双面打印时选择「长边翻转」，沿虚线裁开"
+    
+    COLUMNS = 2
+    ROWS = 5
+    MARGIN = 10 * MM
+    
+    def render(self, c, words, title, total):
+        per_sheet = self.COLUMNS * self.ROWS
+        card_width = (PAGE_WIDTH - 2 * self.MARGIN) / self.COLUMNS
+        card_height = (PAGE_HEIGHT - 2 * self.MARGIN) / self.ROWS
+        
+        words = iter(words)
+        count = 0
+        while True:
+            sheet = []
+            for w in words:
+                sheet.append(w)
+                if len(sheet) == per_sheet:
+                    break
+            if not sheet:
+                return
+            
+            # 正面
+            t = self._begin_text(c)
+            for i, w in enumerate(sheet):
+                x, y = self._card_origin(i % self.COLUMNS, i // self.COLUMNS, card_width, card_height)
+                self._draw_front(t, x, y, card_width, card_height, count + i + 1, w)
+            self._draw_cut_lines(c, card_width, card_height)
+            t.flush(c)
+            yield count
+            
+            # 背面（列左右对调）
+            t = self._begin_text(c)
+            for i, w in enumerate(sheet):
+                col = self.COLUMNS - 1 - i % self.COLUMNS
+                x, y = self._card_origin(col, i // self.COLUMNS, card_width, card_height)
+                self._draw_back(t, x, y, card_width, card_height, w)
+            self._draw_cut_lines(c, card_width, card_height)
+            t.flush(c)
+            count += len(sheet)
+            yield count
+    
+    def _card_origin(self, col: int, row: int, card_width: float, card_height: float) -> Tuple[float, float]:
+        """卡片左下角的位置"""
+        return self.MARGIN + col * card_width, PAGE_HEIGHT - self.MARGIN - (row + 1) * card_height
+    
+    def _draw_cut_lines(self, c, card_width: float, card_height: float):
+        c.setDash(3, 3)
+        c.setStrokeGray(0.6)
+        c.setLineWidth(0.5)
+        left, right = self.MARGIN, PAGE_WIDTH - self.MARGIN
+        top, bottom = PAGE_HEIGHT - self.MARGIN, self.MARGIN
+        for row in range(self.ROWS + 1):
+            y = top - row * card_height
+            c.line(left, y, right, y)
+        for col in range(self.COLUMNS + 1):
+            x = left + col * card_width
+            c.line(x, bottom, x, top)
+        c.setDash()
+    
+    def _draw_front(self, t, x: float, y: float, width: float, height: float, number: int, w: Dict):
+        metrics = self.metrics
+        t.gray(0.6)
+        t.draw(x + 3 * MM, y + height - 4 * MM, str(number), 7)
+        t.gray(0)
+        
+        word = w.get('word', '')
+        max_width = width - 10 * MM
+        size = 22
+        word_width = metrics.width(word, size)
+        if word_width > max_width:
+            size = max(10, size * max_width / word_width)
+            word = metrics.fit(word, max_width, size)
+        center_x = x + width / 2
+        t.draw(center_x, y + height / 2 + 2, word, size, "center")
+        
+        phonetic = w.get('phonetic') or ''
+        if phonetic:
+            t.gray(0.45)
+            t.draw(center_x, y + height / 2 - 16, metrics.fit(phonetic, max_width, 10), 10, "center")
+            t.gray(0)
+    
+    def _draw_back(self, t, x: float, y: float, width: float, height: float, w: Dict):
+        metrics = self.metrics
+        max_width = width - 10 * MM
+        center_x = x + width / 2
+        
+        meaning = " ".join(filter(None, [w.get('part_of_speech'), w.get('meaning')]))
+        lines = metrics.wrap(meaning, max_width, 11, 4)
+        example = w.get('example_sentence') or ''
+        example_lines = metrics.wrap(example, max_width, 8, 2)
+        
+        # 含义和例句整体垂直居中
+        block = len(lines) * 14 + (len(example_lines) * 10 + 6 if example_lines else 0)
+        line_y = y + height / 2 + block / 2 - 11
+        for line in lines:
+            t.draw(center_x, line_y, line, 11, "center")
+            line_y -= 14
+        if example_lines:
+            line_y -= 6
+            t.gray(0.45)
+            for line in example_lines:
+                t.draw(center_x, line_y + 3, line, 8, "center")
+                line_y -= 10
+            t.gray(0)
+
+
+LAYOUTS = {cls.name: cls for cls in (TableLayout, ColumnsLayout, QuizLayout, FlashcardLayout)}
+
+# 供界面选择的版式 [(名称, 显示文字)]
+LAYOUT_OPTIONS = [(name, cls.label) for name, cls in LAYOUTS.items()]
+
+DEFAULT_LAYOUT = "table"
+
+
+def create_layout(name: str, font: str) -> Optional[Layout]:
+    """创建版式，名称不存在时返回 None"""
+    cls = LAYOUTS.get(name)
+    return cls(font) if cls else None
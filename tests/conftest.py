@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+测试配置 - 使用临时数据库，不影响项目目录下的 vocabulary.db
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 必须在导入 database 和各个索引模块之前设置
+os.environ["VOCAB_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="vocab_test_"), "vocabulary.db")
+os.environ["VOCAB_CACHE_DIR"] = tempfile.mkdtemp(prefix="vocab_test_cache_")
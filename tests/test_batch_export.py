@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+批量导出测试 - 每份单词表的文件名在不区分大小写的文件系统上也不重复
+"""
+
+from batch_export import unique_filenames
+
+
+def test_names_differing_in_case_do_not_collide():
+    names = unique_filenames(["Alice", "alice", "ALICE", "Bob"])
+    
+    assert names == ["Alice", "alice_2", "ALICE_3", "Bob"]
+    assert len({name.casefold() for name in names}) == len(names)
+
+
+def test_suffix_does_not_collide_with_existing_title():
+    names = unique_filenames(["Alice", "alice_2", "alice"])
+    
+    assert len({name.casefold() for name in names}) == len(names)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+数据库测试 - 多个连接（多进程网页模式的工作进程）同时写入同一个数据库
+"""
+
+import threading
+import time
+
+import pytest
+
+from database import VocabularyDB
+
+
+@pytest.fixture
+def connections(tmp_path):
+    """同一个数据库文件的两个连接"""
+    path = str(tmp_path / "vocabulary.db")
+    first = VocabularyDB(path)
+    first.enable_wal()
+    second = VocabularyDB(path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_add_word_inserted_by_other_connection(connections):
+    first, second = connections
+    events = []
+    first.add_listener(lambda event, words: events.append((event, words)))
+    
+    assert second.add_word("liminal")
+    assert first.add_word("liminal")
+    
+    assert not first.conn.in_transaction
+    assert first.get_word_by_text("liminal")["selection_count"] == 2
+    assert events == [("update", ["liminal"])]
+    # 写锁已经释放，另一个连接可以继续写入
+    assert second.add_word("quokka")
+
+
+def test_batch_add_words_inserted_by_other_connection(connections):
+    first, second = connections
+    second.add_word("frond")
+    
+    assert first.batch_add_words(["frond", "sloth", "sloth"]) == (1, 2)
+    assert not first.conn.in_transaction
+    assert second.get_word_by_text("sloth")["selection_count"] == 2
+    assert second.get_word_by_text("frond")["selection_count"] == 2
+
+
+def test_failed_write_releases_lock(connections):
+    first, second = connections
+    first.add_word("pithy")
+    first.add_word("verbose")
+    word_id = first.get_word_by_text("verbose")["id"]
+    
+    # 改成已存在的单词违反 UNIQUE 约束
+    assert not first.update_word(word_id, word="pithy")
+    assert not first.conn.in_transaction
+    assert second.add_word("whelp")
+
+
+def test_concurrent_writes_do_not_roll_back_each_other(tmp_path):
+    """一个线程的 rollback 不能撤销另一个线程写了一半的数据"""
+    db = VocabularyDB(str(tmp_path / "vocabulary.db"))
+    db.add_word("pithy")
+    db.add_word("verbose")
+    word_id = db.get_word_by_text("verbose")["id"]
+    
+    started = threading.Event()
+    upsert = db._upsert_word
+    
+    def slow_upsert(word, *args):
+        is_new = upsert(word, *args)
+        started.set()
+        # 第一个单词已经写入、还没有提交，给另一个线程足够的时间插进来
+        time.sleep(0.2)
+        return is_new
+    
+    db._upsert_word = slow_upsert
+    results = {}
+    writer = threading.Thread(target=lambda: results.update(batch=db.batch_add_words(["alpha", "beta", "gamma"])))
+    writer.start()
+    started.wait(5)
+    # 改成已存在的单词违反 UNIQUE 约束，失败后回滚
+    results["update"] = db.update_word(word_id, word="pithy")
+    writer.join(5)
+    
+    assert results == {"batch": (3, 0), "update": False}
+    assert {"alpha", "beta", "gamma"} <= set(db.get_all_word_texts())
+    db.close()
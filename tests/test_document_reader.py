@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+文档读取和分词测试 - TXT 和长文本按块处理时内存占用不随文档增长
+"""
+
+from document_reader import MAX_TEXT_CARRY, TEXT_CHUNK_SIZE, document_reader
+from utils.tokenizer import WINDOW_SIZE, _iter_windows, iter_tokens
+
+
+def _read_txt(path):
+    return [text for _index, _total, text, _scanned in document_reader._iter_txt(str(path))]
+
+
+def test_txt_without_spaces_is_split(tmp_path):
+    # 中文正文没有空格，英文单词夹在中间
+    path = tmp_path / "book.txt"
+    path.write_text("这是一段没有空格的中文liminal正文。" * 40000, encoding="utf-8")
+    
+    parts = _read_txt(path)
+    
+    assert len(parts) > 1
+    assert max(len(text) for text in parts) <= TEXT_CHUNK_SIZE + MAX_TEXT_CARRY
+    assert sum(text.count("liminal") for text in parts) == 40000
+
+
+def test_txt_without_word_breaks_is_capped(tmp_path):
+    path = tmp_path / "minified.txt"
+    path.write_text("a" * (TEXT_CHUNK_SIZE * 5), encoding="utf-8")
+    
+    parts = _read_txt(path)
+    
+    assert max(len(text) for text in parts) <= TEXT_CHUNK_SIZE + MAX_TEXT_CARRY
+    assert sum(len(text) for text in parts) == TEXT_CHUNK_SIZE * 5
+
+
+def test_tokenizer_without_word_breaks_is_capped():
+    # 整段字母或汉字没有任何边界时，留到下一块的字符不能无限增长
+    for text, include_chinese in (("a" * (WINDOW_SIZE * 5), False), ("中" * (WINDOW_SIZE * 5), True)):
+        windows = list(_iter_windows(text, include_chinese))
+        
+        assert max(len(window) for window, _offset in windows) <= WINDOW_SIZE * 2
+        assert "".join(window for window, _offset in windows) == text
+        assert sum(len(token.text) for token in iter_tokens(text, include_chinese)) == len(text)
+
+
+def test_tokenizer_keeps_words_across_chunks():
+    tokens = list(iter_tokens(["well-", "known quok", "ka 中", "文"], include_chinese=True))
+    
+    assert [(t.word, t.position) for t in tokens] == [("well-known", 0), ("quokka", 11), ("中文", 18)]
+
+
+def test_txt_words_are_not_cut(tmp_path):
+    path = tmp_path / "article.txt"
+    path.write_text("quokka,frond;" * 20000, encoding="utf-8")
+    
+    ok, _message = document_reader.extract_words(str(path))
+    parts = _read_txt(path)
+    
+    assert ok
+    assert all(text.endswith(";") or text.endswith(",") for text in parts[:-1])
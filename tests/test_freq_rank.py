@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+词频排名测试 - 词表中没有的单词不能借用虚词或短单词的排名
+"""
+
+import pytest
+
+from utils.freq_rank import RankIndex, suggest_unknown_words
+
+WORDS = ["the", "but", "her", "in", "to", "or", "bit", "can", "study", "walk", "stop", "city"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    source = tmp_path / "word_freq.txt"
+    source.write_text("\n".join(WORDS), encoding="utf-8")
+    rank_index = RankIndex(path=str(tmp_path / "word_rank.bin"), source=str(source))
+    yield rank_index
+    rank_index.close()
+
+
+def test_rank_of_listed_words(index):
+    assert index.rank("the") == 1
+    assert index.rank("City") == WORDS.index("city") + 1
+    assert len(index) == len(WORDS)
+
+
+@pytest.mark.parametrize("word", ["butter", "herring", "inner", "bitter", "canning", "toes", "ores"])
+def test_false_stems_have_no_rank(index, word):
+    assert index.rank(word) is None
+
+
+@pytest.mark.parametrize("word, stem", [("studies", "study"), ("walked", "walk"), ("stopped", "stop")])
+def test_derived_forms_use_base_rank(index, word, stem):
+    assert index.rank(word) == index.rank(stem)
+
+
+def test_suggest_unknown_words_keeps_false_stems(index):
+    text = "The butter was bitter, but she walked to the inner city."
+    assert suggest_unknown_words(text, 100, index=index) == ["butter", "bitter", "inner"]
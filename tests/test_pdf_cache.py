@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+PDF缓存测试 - 修改过的单词不能命中旧的缓存
+"""
+
+from database import VocabularyDB
+from pdf_cache import PDFCache, word_version
+
+
+def test_edits_in_same_second_change_key(tmp_path):
+    database = VocabularyDB(str(tmp_path / "vocabulary.db"))
+    database.add_word("liminal", meaning="阈限的")
+    word_id = database.get_word_by_text("liminal")["id"]
+    cache = PDFCache(str(tmp_path / "pdf"), max_bytes=1 << 20)
+    
+    def key():
+        return cache.make_key(database.iter_word_versions(), "单词表", "table", "font")
+    
+    before = key()
+    database.update_word(word_id, meaning="过渡的")
+    first_edit = key()
+    database.update_word(word_id, meaning="边缘的")
+    second_edit = key()
+    database.close()
+    
+    assert len({before, first_edit, second_edit}) == 3
+
+
+def test_word_version_matches_db(tmp_path):
+    database = VocabularyDB(str(tmp_path / "vocabulary.db"))
+    database.add_word("quokka")
+    word = database.get_word_by_text("quokka")
+    versions = list(database.iter_word_versions())
+    database.close()
+    
+    assert versions == [word_version(word)]
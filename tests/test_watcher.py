@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+文件夹监视测试 - 写入单词库失败时不记入检查点
+"""
+
+import sqlite3
+
+import pytest
+
+import watcher
+from watcher import FolderWatcher
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    """一个有两张图片的文件夹，OCR 固定识别出两个单词"""
+    for name in ("a.png", "b.png"):
+        (tmp_path / name).write_bytes(b"image")
+    monkeypatch.setattr(watcher.ocr_handler, "recognize", lambda path: (True, "quokka axolotl"))
+    monkeypatch.setattr(watcher.ocr_handler, "extract_english_words", lambda text: text.split())
+    return tmp_path
+
+
+def test_failed_write_keeps_images_pending(folder, monkeypatch):
+    def locked(words, raise_errors=False):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(watcher.db, "batch_add_words", locked)
+    w = FolderWatcher(str(folder))
+    paths = sorted(str(p) for p in folder.glob("*.png"))
+    w.process(paths)
+    
+    assert w.processed == {}
+    assert sorted(w.pending) == paths
+    assert w.stats["images"] == 0
+
+
+def test_successful_write_is_checkpointed(folder, monkeypatch):
+    calls = []
+    monkeypatch.setattr(watcher.db, "batch_add_words",
+                        lambda words, raise_errors=False: calls.append(words) or (len(words), 0))
+    w = FolderWatcher(str(folder))
+    w.process(sorted(str(p) for p in folder.glob("*.png")))
+    
+    assert sorted(w.processed) == ["a.png", "b.png"]
+    assert not w.pending
+    assert calls == [["quokka", "axolotl"], ["quokka", "axolotl"]]
+    # 重新创建（相当于重启）后不再处理
+    assert FolderWatcher(str(folder)).processed == w.processed
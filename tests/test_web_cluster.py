@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+多进程网页模式测试 - 转发到用端口号应答的简单HTTP服务
+"""
+
+import asyncio
+
+import pytest
+
+from web_cluster import AFFINITY_COOKIE, AffinityProxy, free_port
+
+
+async def _backend(port):
+    """应答自己端口号的HTTP服务"""
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        body = str(port).encode("ascii")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        writer.close()
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+async def _get(port, path="/", cookie=None):
+    """发送一个请求，返回 (应答的工作进程端口, Set-Cookie 的值或None)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+    if cookie:
+        headers += f"Cookie: theme=dark; {cookie}\r\n"
+    writer.write((headers + "\r\n").encode("ascii"))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    set_cookie = None
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.lower() == b"set-cookie":
+            set_cookie = value.strip().split(b";")[0].decode("ascii")
+    return int(body), set_cookie
+
+
+@pytest.fixture
+def cluster():
+    """三个工作进程（其中第三个没有启动）和转发代理，在测试函数中运行协程"""
+    loop = asyncio.new_event_loop()
+    backends = [free_port() for _ in range(3)]
+    servers = [loop.run_until_complete(_backend(port)) for port in backends[:2]]
+    proxy = AffinityProxy(backends)
+    proxy_port = free_port()
+    server = loop.run_until_complete(asyncio.start_server(proxy.handle, "127.0.0.1", proxy_port))
+    yield loop, backends, proxy_port
+    for s in servers + [server]:
+        s.close()
+    loop.close()
+
+
+def test_browsers_behind_one_ip_are_spread(cluster):
+    loop, backends, proxy_port = cluster
+    first = loop.run_until_complete(_get(proxy_port))
+    second = loop.run_until_complete(_get(proxy_port))
+    
+    assert first == (backends[0], f"{AFFINITY_COOKIE}=0")
+    assert second == (backends[1], f"{AFFINITY_COOKIE}=1")
+
+
+def test_cookie_pins_session_requests(cluster):
+    loop, backends, proxy_port = cluster
+    for path in ("/", "/ws", "/upload/a.png?expire=1"):
+        port, set_cookie = loop.run_until_complete(_get(proxy_port, path, f"{AFFINITY_COOKIE}=1"))
+        assert port == backends[1]
+        assert set_cookie is None
+
+
+def test_unavailable_worker_moves_cookie(cluster):
+    loop, backends, proxy_port = cluster
+    assert loop.run_until_complete(_get(proxy_port, "/ws", f"{AFFINITY_COOKIE}=2")) == \
+        (backends[0], f"{AFFINITY_COOKIE}=0")
+
+
+def test_session_request_without_cookie_uses_client_ip(cluster):
+    loop, backends, proxy_port = cluster
+    expected = AffinityProxy(backends).pick("127.0.0.1")
+    expected = [port for port in expected if port != backends[2]][0]
+    
+    assert loop.run_until_complete(_get(proxy_port, "/ws"))[0] == expected
+    # 不开始新的分配
+    assert loop.run_until_complete(_get(proxy_port))[0] == backends[0]
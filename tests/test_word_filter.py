@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+生词过滤测试 - 还原原形时不能把生词误判为常见词
+"""
+
+import pytest
+
+from utils.word_filter import COMMON, MIN_STEM_LENGTH, NEW, KnownWordFilter, base_forms
+
+# 去掉词尾后恰好是虚词或短单词的生词
+FALSE_STEMS = {
+    "butter": "but",
+    "herring": "her",
+    "inner": "in",
+    "bitter": "bit",
+    "canning": "can",
+    "toes": "to",
+    "ores": "or",
+}
+
+# 真正由常见词变化而来的单词
+DERIVED_FORMS = ["studies", "walked", "stopped", "cities"]
+
+
+@pytest.fixture
+def word_filter(tmp_path):
+    """常见词表包含虚词和短单词的过滤器"""
+    freq_path = tmp_path / "word_freq.txt"
+    freq_path.write_text("\n".join([
+        "the", "but", "her", "in", "to", "or", "bit", "can", "study", "walk", "stop", "city",
+    ]), encoding="utf-8")
+    return KnownWordFilter(common_rank=100, freq_path=str(freq_path))
+
+
+@pytest.mark.parametrize("word, stem", FALSE_STEMS.items())
+def test_base_forms_skip_stopwords_and_short_stems(word, stem):
+    forms = base_forms(word)
+    assert stem not in forms
+    assert all(len(form) >= MIN_STEM_LENGTH for form in forms)
+
+
+@pytest.mark.parametrize("word", FALSE_STEMS)
+def test_false_stems_stay_new(word_filter, word):
+    assert not word_filter.is_common(word)
+    assert word_filter.classify([word])[NEW] == [word]
+
+
+@pytest.mark.parametrize("word", DERIVED_FORMS)
+def test_derived_forms_of_common_words_are_common(word_filter, word):
+    assert word_filter.is_common(word)
+    assert word_filter.classify([word])[COMMON] == [word]
+
+
+def test_irregular_forms():
+    assert base_forms("children") == ["child"]
@@ -1,8 +1,29 @@
 # -*- coding: utf-8 -*-
 """
 工具模块
+
+子模块在第一次使用其中的名称时才导入（如 from utils import dictionary_api），
+导入 utils.tokenizer 等单个子模块时不会连带加载词典等其他子模块。
 """
 
-from .dictionary import DictionaryAPI, LocalDictionary, get_word_info, dictionary_api
+from .lazy import module_getattr
+
+_EXPORTS = {
+    'DictionaryAPI': 'dictionary', 'LocalDictionary': 'dictionary',
+    'get_word_info': 'dictionary', 'dictionary_api': 'dictionary',
+    'STOPWORDS': 'tokenizer', 'Token': 'tokenizer', 'WordStats': 'tokenizer',
+    'iter_tokens': 'tokenizer', 'unique_words': 'tokenizer',
+    'KnownWordFilter': 'word_filter', 'known_words': 'word_filter',
+    'RankIndex': 'freq_rank', 'rank_index': 'freq_rank', 'suggest_unknown_words': 'freq_rank',
+    'SpellIndex': 'spell', 'spell_index': 'spell',
+    'PrefixIndex': 'prefix_index', 'WordCompleter': 'prefix_index', 'word_completer': 'prefix_index',
+    'UpdateScheduler': 'ui_scheduler', 'get_scheduler': 'ui_scheduler',
+    'CancelToken': 'executors', 'run_io': 'executors', 'run_cpu': 'executors',
+    'io_executor': 'executors', 'cpu_executor': 'executors',
+    'LazyObject': 'lazy', 'lazy_import': 'lazy',
+    'user_cache_dir': 'cache_dir',
+}
+
+__getattr__ = module_getattr(__name__, _EXPORTS)
 
-__all__ = ['DictionaryAPI', 'LocalDictionary', 'get_word_info', 'dictionary_api']
+__all__ = list(_EXPORTS)
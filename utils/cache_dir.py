@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+缓存目录 - 存放程序生成的文件（词频索引、字体索引、PDF缓存）
+
+生成的文件不写入程序目录（程序目录可能是只读的，也不应混入代码仓库），而是放在用户的缓存目录中:
+    - Windows: %LOCALAPPDATA%\\vocab_app
+    - macOS:   ~/Library/Caches/vocab_app
+    - 其他:    $XDG_CACHE_HOME/vocab_app（默认为 ~/.cache/vocab_app）
+
+可通过环境变量 VOCAB_CACHE_DIR 指定其他目录。删除缓存目录不会丢失数据，需要时会重新生成。
+"""
+
+import os
+import sys
+
+CACHE_DIR_ENV = "VOCAB_CACHE_DIR"
+APP_NAME = "vocab_app"
+
+
+def user_cache_dir() -> str:
+    """当前用户的缓存目录（不会创建目录）"""
+    path = os.environ.get(CACHE_DIR_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    elif sys.platform == "darwin":
+        base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, APP_NAME)
+
+
+CACHE_DIR = user_cache_dir()
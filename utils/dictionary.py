@@ -4,6 +4,7 @@
 使用有道词典API或免费词典API
 """
 
+import os
 import urllib.request
 import urllib.parse
 import urllib.error
@@ -11,6 +12,12 @@ import json
 import ssl
 from typing import Dict, Optional
 
+# 词典服务地址，可通过环境变量修改（如压力测试时使用本机的模拟服务，见 benchmarks/loadtest.py）
+YOUDAO_URL_ENV = "VOCAB_YOUDAO_URL"
+FREE_DICTIONARY_URL_ENV = "VOCAB_FREE_DICTIONARY_URL"
+DEFAULT_YOUDAO_URL = "https://dict.youdao.com/suggest"
+DEFAULT_FREE_DICTIONARY_URL = "https://api.dictionaryapi.dev/api/v2/entries/en"
+
 
 class DictionaryAPI:
     """词典API处理器"""
@@ -20,6 +27,8 @@ class DictionaryAPI:
         self.ssl_context.check_hostname = False
         self.ssl_context.verify_mode = ssl.CERT_NONE
         self.timeout = 10
+        self.youdao_url = os.environ.get(YOUDAO_URL_ENV) or DEFAULT_YOUDAO_URL
+        self.free_dictionary_url = (os.environ.get(FREE_DICTIONARY_URL_ENV) or DEFAULT_FREE_DICTIONARY_URL).rstrip("/")
     
     def lookup_word(self, word: str) -> Optional[Dict]:
         """查询单词信息"""
@@ -45,7 +54,7 @@ class DictionaryAPI:
         """
         try:
             # 有道词典API
-            url = f"https://dict.youdao.com/suggest?num=1&doctype=json&q={urllib.parse.quote(word)}"
+            url = f"{self.youdao_url}?num=1&doctype=json&q={urllib.parse.quote(word)}"
             
             request = urllib.request.Request(
                 url,
@@ -85,7 +94,7 @@ class DictionaryAPI:
     
     def _lookup_free_dictionary_api(self, word: str) -> Optional[Dict]:
         """使用Free Dictionary API查询"""
-        api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+        api_url = f"{self.free_dictionary_url}/{word}"
         
         try:
             request = urllib.request.Request(
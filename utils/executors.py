@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+共享线程池 - 把耗时的阻塞操作移出界面事件处理
+
+页面的事件处理函数是 async 的，在事件循环中运行；查词典、OCR识别、读取文档等
+阻塞操作通过 run_io / run_cpu 交给共享线程池，等待期间事件循环继续处理其他事件，
+一个会话中的耗时操作不会卡住其他会话（网页模式下所有会话共用一个事件循环）。
+    
+    - io_executor:  网络请求、剪贴板、数据库读取等，大部分时间在等待
+    - cpu_executor: OCR识别、文档解析等，占用CPU，线程数少
+    - PDF导出使用 export_jobs 自己的线程池，不占用这两个线程池
+
+线程数可通过环境变量 VOCAB_IO_WORKERS、VOCAB_CPU_WORKERS 配置。
+"""
+
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+IO_WORKERS_ENV = "VOCAB_IO_WORKERS"
+CPU_WORKERS_ENV = "VOCAB_CPU_WORKERS"
+DEFAULT_IO_WORKERS = 8
+# OCR模型同一时间只能识别一张图片（见 ocr_handler._readtext），多开线程只会排队
+DEFAULT_CPU_WORKERS = max(1, min(2, os.cpu_count() or 1))
+
+
+def _workers(env: str, default: int) -> int:
+    """线程数（环境变量无效时使用默认值）"""
+    try:
+        return max(1, int(os.environ.get(env, default)))
+    except ValueError:
+        return default
+
+
+io_executor = ThreadPoolExecutor(max_workers=_workers(IO_WORKERS_ENV, DEFAULT_IO_WORKERS),
+                                 thread_name_prefix="vocab-io")
+cpu_executor = ThreadPoolExecutor(max_workers=_workers(CPU_WORKERS_ENV, DEFAULT_CPU_WORKERS),
+                                  thread_name_prefix="vocab-cpu")
+
+
+class CancelToken:
+    """
+    取消标志，在界面中设置，在线程池中检查
+    
+    可以直接作为 should_cancel 回调传给 ocr_handler、document_reader、pdf_generator。
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+
+async def run_in(executor, fn, *args, **kwargs):
+    """在线程池中运行 fn(*args, **kwargs)，等待期间不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    """在 io_executor 中运行（网络请求、剪贴板、数据库读取）"""
+    return await run_in(io_executor, fn, *args, **kwargs)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """在 cpu_executor 中运行（OCR识别、文档解析）"""
+    return await run_in(cpu_executor, fn, *args, **kwargs)
+
+
+def shutdown(wait: bool = False):
+    """停止线程池（程序退出时调用）"""
+    io_executor.shutdown(wait=wait, cancel_futures=True)
+    cpu_executor.shutdown(wait=wait, cancel_futures=True)
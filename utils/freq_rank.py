@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+词频排名索引 - 根据词频推测文章中的生词
+
+常用词表（data/word_freq.txt）第一次使用时编译成紧凑的二进制哈希表（缓存目录中的 word_rank.bin，见 utils.cache_dir），
+之后通过 mmap 直接映射到内存中查找:
+    - 不需要在启动时解析文本、创建几千个字符串对象
+    - 多个进程打开同一个文件时共享同一份物理内存
+    - 查找一个单词只需计算一次 crc32 并读取一两个槽位，时间为 O(1)
+
+文件格式（小端）:
+    文件头: 魔数 b"VRNK"、版本(u16)、保留(u16)、单词数(u32)、槽位数(u32)、字符串区偏移(u32)
+    槽位区: 每个槽位 (字符串偏移+1, 长度, 排名) 三个 u32，偏移为0表示空槽位；线性探测
+    字符串区: 所有单词的 UTF-8 编码依次拼接
+"""
+
+import os
+import mmap
+import zlib
+import struct
+import threading
+from typing import Iterable, List, Optional, Union
+
+from .tokenizer import STOPWORDS, unique_words
+from .word_filter import WORD_FREQ_PATH, base_forms, load_frequency_list
+from .cache_dir import CACHE_DIR
+
+# 编译后的排名索引文件
+RANK_INDEX_PATH = os.path.join(CACHE_DIR, "word_rank.bin")
+
+_MAGIC = b"VRNK"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII")
+_SLOT = struct.Struct("<III")
+
+# 难度等级: (名称, 词频排名阈值)，排名在阈值以内的单词视为已掌握
+LEVELS = [
+    ("基础", 1000),
+    ("中级", 2000),
+    ("高级", 3000),
+    ("专业", 4000),
+]
+DEFAULT_LEVEL = "中级"
+
+
+def build_rank_index(words: List[str], path: str) -> bytes:
+    """
+    把按词频排列的单词列表编译成排名索引
+    
+    参数:
+        words: 单词列表，排名从1开始；重复的单词只保留第一次出现
+        path: 输出文件路径，为 None 时只返回数据不写文件
+    
+    返回:
+        bytes: 索引文件的内容
+    """
+    ranks = {}
+    for word in words:
+        if word not in ranks:
+            ranks[word] = len(ranks) + 1
+    
+    # 槽位数取2的幂且至少为单词数的2倍，保证探测次数很少
+    n_slots = 8
+    while n_slots < len(ranks) * 2:
+        n_slots *= 2
+    mask = n_slots - 1
+    
+    slots = [None] * n_slots
+    blob = bytearray()
+    for word, rank in ranks.items():
+        data = word.encode("utf-8")
+        index = zlib.crc32(data) & mask
+        while slots[index] is not None:
+            index = (index + 1) & mask
+        slots[index] = (len(blob) + 1, len(data), rank)
+        blob += data
+    
+    blob_offset = _HEADER.size + _SLOT.size * n_slots
+    out = bytearray(_HEADER.pack(_MAGIC, _VERSION, 0, len(ranks), n_slots, blob_offset))
+    empty = _SLOT.pack(0, 0, 0)
+    for slot in slots:
+        out += _SLOT.pack(*slot) if slot else empty
+    out += blob
+    
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 临时文件名带进程号，多个工作进程同时编译时不会互相覆盖
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(out)
+        os.replace(tmp_path, path)
+    return bytes(out)
+
+
+class RankIndex:
+    """词频排名索引（第一次查询时才打开文件）"""
+    
+    def __init__(self, path: str = RANK_INDEX_PATH, source: str = WORD_FREQ_PATH):
+        """
+        参数:
+            path: 编译后的索引文件
+            source: 常用词表，比索引文件新时自动重新编译
+        """
+        self.path = path
+        self.source = source
+        self._buf: Optional[Union[mmap.mmap, bytes]] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._count = 0
+        self._mask = 0
+        self._blob_offset = 0
+    
+    def _open(self):
+        if self._buf is not None:
+            return
+        with self._lock:
+            if self._buf is not None:
+                return
+            buf = None
+            try:
+                if self._is_stale():
+                    build_rank_index(load_frequency_list(self.source), self.path)
+                self._file = open(self.path, "rb")
+                buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                # 目录不可写等情况: 在内存中编译
+                print(f"词频索引文件不可用，改为在内存中创建: {e}")
+                buf = build_rank_index(load_frequency_list(self.source), None)
+            
+            magic, version, _reserved, count, n_slots, blob_offset = _HEADER.unpack_from(buf, 0)
+            if magic != _MAGIC or version != _VERSION:
+                buf = build_rank_index(load_frequency_list(self.source), None)
+                magic, version, _reserved, count, n_slots, blob_offset = _HEADER.unpack_from(buf, 0)
+            self._count = count
+            self._mask = n_slots - 1
+            self._blob_offset = blob_offset
+            self._buf = buf
+    
+    def _is_stale(self) -> bool:
+        try:
+            index_mtime = os.path.getmtime(self.path)
+        except OSError:
+            return True
+        try:
+            return os.path.getmtime(self.source) > index_mtime
+        except OSError:
+            return False
+    
+    def _lookup(self, data: bytes) -> Optional[int]:
+        buf = self._buf
+        mask = self._mask
+        blob_offset = self._blob_offset - 1  # 槽位中的偏移多加了1
+        unpack_slot = _SLOT.unpack_from
+        index = zlib.crc32(data) & mask
+        length = len(data)
+        while True:
+            offset, size, rank = unpack_slot(buf, _HEADER.size + index * _SLOT.size)
+            if not offset:
+                return None
+            if size == length and buf[blob_offset + offset:blob_offset + offset + size] == data:
+                return rank
+            index = (index + 1) & mask
+    
+    def rank(self, word: str) -> Optional[int]:
+        """
+        单词的词频排名（从1开始，越小越常见）
+        
+        词表中没有原词时按原形查找（如 studies -> study）；原形不会是虚词或过短的词干，
+        否则 butter 会得到 but 的排名，在自动选出生词时被当作已掌握的单词。
+        
+        返回:
+            Optional[int]: 排名；词表中没有的单词返回 None
+        """
+        self._open()
+        word = word.lower()
+        rank = self._lookup(word.encode("utf-8"))
+        if rank is not None:
+            return rank
+        for form in base_forms(word):
+            rank = self._lookup(form.encode("utf-8"))
+            if rank is not None:
+                return rank
+        return None
+    
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+    
+    def __contains__(self, word: str) -> bool:
+        return self.rank(word) is not None
+    
+    def close(self):
+        """关闭索引文件"""
+        with self._lock:
+            if isinstance(self._buf, mmap.mmap):
+                self._buf.close()
+            if self._file:
+                self._file.close()
+            self._buf = None
+            self._file = None
+
+
+def level_threshold(level: Union[str, int]) -> int:
+    """难度等级对应的词频排名阈值（也可以直接传入排名）"""
+    if isinstance(level, int):
+        return level
+    for name, threshold in LEVELS:
+        if name == level:
+            return threshold
+    raise ValueError(f"未知的难度等级: {level}")
+
+
+def suggest_unknown_words(chunks: Union[str, Iterable[str]], level: Union[str, int] = DEFAULT_LEVEL,
+                          index: Optional[RankIndex] = None) -> List[str]:
+    """
+    找出文章中超出指定难度等级的单词（可能不认识的单词）
+    
+    文章只扫描一遍: 提取不重复的单词后逐个查排名，排名超过阈值或词表中没有的单词即为生词。
+    
+    参数:
+        chunks: 文章文本或文本块迭代器
+        level: 难度等级名称（见 LEVELS）或排名阈值
+        index: 排名索引，默认使用全局索引
+    
+    返回:
+        List[str]: 生词列表（小写，按首次出现的顺序）
+    """
+    if index is None:
+        index = rank_index
+    threshold = level_threshold(level)
+    result = []
+    for word in unique_words(chunks, stopwords=STOPWORDS):
+        rank = index.rank(word)
+        if rank is None or rank > threshold:
+            result.append(word)
+    return result
+
+
+# 创建全局排名索引实例
+rank_index = RankIndex()
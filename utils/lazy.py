@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+延迟加载 - 第一次使用时才导入模块或创建对象
+
+启动时只导入显示首页需要的模块，reportlab、EasyOCR（torch）、词典等
+在第一次导出、识别、查词时才加载，启动耗时见 benchmarks/startup.py。
+"""
+
+import importlib
+import threading
+from typing import Callable, Dict
+
+
+class LazyObject:
+    """
+    第一次访问属性时才创建的对象代理
+    
+    用法:
+        db = LazyObject(VocabularyDB)   # 导入时不打开数据库
+        db.get_all_words()               # 第一次调用时创建 VocabularyDB()
+    """
+    
+    def __init__(self, factory: Callable):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_obj", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+    
+    def _get(self):
+        obj = object.__getattribute__(self, "_obj")
+        if obj is None:
+            with object.__getattribute__(self, "_lock"):
+                obj = object.__getattribute__(self, "_obj")
+                if obj is None:
+                    obj = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_obj", obj)
+        return obj
+    
+    @property
+    def loaded(self) -> bool:
+        """对象是否已经创建"""
+        return object.__getattribute__(self, "_obj") is not None
+    
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+    
+    def __repr__(self):
+        if self.loaded:
+            return repr(self._get())
+        return f"<LazyObject {getattr(object.__getattribute__(self, '_factory'), '__name__', '?')} (未加载)>"
+
+
+def lazy_import(module: str, name: str) -> LazyObject:
+    """模块中的对象的代理，第一次使用时才导入模块"""
+    return LazyObject(lambda: getattr(importlib.import_module(module), name))
+
+
+def module_getattr(package: str, exports: Dict[str, str]) -> Callable:
+    """
+    生成包的 __getattr__（PEP 562），访问包中的名称时才导入对应的子模块
+    
+    参数:
+        package: 包名（__name__）
+        exports: 名称 -> 子模块名
+    """
+    def __getattr__(name):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(f"{package}.{submodule}"), name)
+    return __getattr__
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+前缀索引 - 输入框的自动补全
+
+单词按字典序保存在有序列表中，查找某个前缀的补全只需一次二分查找，
+再顺序读取紧随其后的若干个单词，耗时与词典大小基本无关（几十万个单词也在微秒级）。
+
+补全分为两部分:
+    - 单词库: 随数据库的变化通知增量插入、删除
+    - 词典: 常用词表和本地词典中的单词（只读）
+"""
+
+import bisect
+import threading
+from typing import Iterable, List
+
+from .word_filter import load_frequency_list
+
+# 默认返回的补全数量
+DEFAULT_LIMIT = 8
+
+
+class PrefixIndex:
+    """有序列表 + 二分查找的前缀索引"""
+    
+    def __init__(self, words: Iterable[str] = ()):
+        self._words: List[str] = sorted(set(words))
+    
+    def add(self, word: str):
+        """插入单词（已存在时忽略）"""
+        words = self._words
+        i = bisect.bisect_left(words, word)
+        if i == len(words) or words[i] != word:
+            words.insert(i, word)
+    
+    def remove(self, word: str):
+        """删除单词（不存在时忽略）"""
+        words = self._words
+        i = bisect.bisect_left(words, word)
+        if i < len(words) and words[i] == word:
+            del words[i]
+    
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """
+        查找以 prefix 开头的单词
+        
+        返回:
+            List[str]: 按字典序排列的单词，最多 limit 个
+        """
+        words = self._words
+        i = bisect.bisect_left(words, prefix)
+        result = []
+        while i < len(words) and len(result) < limit and words[i].startswith(prefix):
+            result.append(words[i])
+            i += 1
+        return result
+    
+    def __len__(self) -> int:
+        return len(self._words)
+    
+    def __contains__(self, word: str) -> bool:
+        words = self._words
+        i = bisect.bisect_left(words, word)
+        return i < len(words) and words[i] == word
+
+
+class WordCompleter:
+    """单词补全（第一次使用时才创建索引）"""
+    
+    def __init__(self):
+        self.vocabulary = PrefixIndex()
+        self.dictionary = PrefixIndex()
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from database import db
+            from .dictionary import LocalDictionary
+            
+            words = load_frequency_list()
+            words.extend(LocalDictionary.COMMON_WORDS)
+            self.dictionary = PrefixIndex(words)
+            self.vocabulary = PrefixIndex(db.get_all_word_texts())
+            db.add_listener(self._on_db_change)
+            self._loaded = True
+    
+    def _on_db_change(self, event: str, words: List[str]):
+        with self._lock:
+            if event == "add":
+                for word in words:
+                    self.vocabulary.add(word)
+            elif event == "delete":
+                for word in words:
+                    self.vocabulary.remove(word)
+            elif event == "reload":
+                from database import db
+                self.vocabulary = PrefixIndex(db.get_all_word_texts())
+    
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT, include_dictionary: bool = True) -> List[str]:
+        """
+        补全单词，单词库中的单词排在前面
+        
+        参数:
+            prefix: 已输入的部分（不区分大小写）
+            limit: 最多返回的数量
+            include_dictionary: 是否包含单词库以外的词典单词
+        
+        返回:
+            List[str]: 补全结果（不含与输入完全相同的单词）
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        self._load()
+        
+        # 多取一个，用于去掉与输入完全相同的单词
+        result = [w for w in self.vocabulary.complete(prefix, limit + 1) if w != prefix]
+        if include_dictionary and len(result) < limit:
+            seen = set(result)
+            for word in self.dictionary.complete(prefix, limit + 1 + len(result)):
+                if word != prefix and word not in seen:
+                    result.append(word)
+        return result[:limit]
+
+
+# 创建全局补全实例
+word_completer = WordCompleter()
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+拼写纠正 - 为OCR识别错误的单词给出纠正建议
+
+OCR经常把单词识别错一两个字母（如 researeh、tecnology），这些错词如果直接提交，
+会在单词库中留下错误的单词。但词典中没有的单词也可能是真实的生僻词（如 liminal 与 criminal
+只差两个字母），所以只给出建议，由用户确认后才替换；只检查图片识别出的、查不到词典的单词。
+
+索引采用 SymSpell 的"对称删除"算法: 预先为词典中每个单词生成删除1~2个字母后的所有变体，
+查询时只需为输入单词生成同样的删除变体，在哈希表中找到候选单词后再计算编辑距离，
+不需要与整个词典逐一比较。
+
+词典来源: 常用词表、本地词典和单词库中的单词（通过数据库变化通知增量更新）。
+"""
+
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .tokenizer import STOPWORDS
+from .word_filter import base_forms, load_frequency_list
+
+# 最大编辑距离
+MAX_EDIT_DISTANCE = 2
+
+# 只为单词的前若干个字母生成删除变体（SymSpell 的前缀优化，大幅减少索引大小）
+PREFIX_LENGTH = 7
+
+# 短于该长度的单词不给出纠正建议（短单词的近似词太多，容易改错）
+MIN_CORRECT_LENGTH = 5
+
+# 没有元音字母的单词达到该长度才认为不是单词（psst、shh、tsk、nth 都是真实的单词）
+MIN_GARBAGE_NO_VOWEL_LENGTH = 6
+
+# 检查结果
+OK = "ok"                # 正确的单词
+CORRECTED = "corrected"  # 有唯一的纠正建议
+GARBAGE = "garbage"      # 很可能不是单词，建议删除
+UNKNOWN = "unknown"      # 词典中没有且无法确定如何纠正（可能是生僻词），保持原样
+
+# 候选单词: 单词、编辑距离、是否在单词库中、词频排名（不在词表中为 None）
+Suggestion = namedtuple("Suggestion", ["word", "distance", "collected", "rank"])
+
+_VOWELS = set("aeiouy")
+
+
+def edit_distance(a: str, b: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """
+    计算两个单词的编辑距离（插入、删除、替换、相邻交换各算一次）
+    
+    超过 max_distance 时提前结束并返回 max_distance + 1。
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > max_distance:
+        return max_distance + 1
+    
+    # 相同的前缀和后缀不影响距离，先去掉以缩小计算范围
+    start = 0
+    while start < la and start < lb and a[start] == b[start]:
+        start += 1
+    while la > start and lb > start and a[la - 1] == b[lb - 1]:
+        la -= 1
+        lb -= 1
+    a = a[start:la]
+    b = b[start:lb]
+    la, lb = len(a), len(b)
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    if la == 0:
+        return min(lb, max_distance + 1)
+    
+    if lb - la > max_distance:
+        return max_distance + 1
+    
+    # 只计算对角线附近宽度为 max_distance 的带状区域，区域外的值不可能在范围内
+    big = max_distance + 1
+    prev2 = None
+    prev = list(range(lb + 1))
+    for i in range(1, la + 1):
+        cur = [big] * (lb + 1)
+        cur[0] = i
+        ca = a[i - 1]
+        ca_prev = a[i - 2] if i > 1 else None
+        row_min = big
+        for j in range(max(1, i - max_distance), min(lb, i + max_distance) + 1):
+            cb = b[j - 1]
+            value = prev[j - 1] if ca == cb else prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if prev2 is not None and j > 1 and ca == b[j - 2] and ca_prev == cb and prev2[j - 2] + 1 < value:
+                value = prev2[j - 2] + 1
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return big
+        prev2, prev = prev, cur
+    return min(prev[lb], big)
+
+
+def looks_like_garbage(word: str) -> bool:
+    """
+    判断OCR结果是否明显不是单词
+    
+    规则: 较长却没有元音字母、同一字母连续出现3次以上、或者过长。
+    只用于给出删除建议，不会直接丢弃单词。
+    """
+    letters = word.replace("-", "").replace("'", "")
+    if len(letters) > 30:
+        return True
+    if len(letters) >= MIN_GARBAGE_NO_VOWEL_LENGTH and not _VOWELS.intersection(letters):
+        return True
+    for i in range(len(letters) - 2):
+        if letters[i] == letters[i + 1] == letters[i + 2]:
+            return True
+    return False
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """单词前缀删除 1~max_distance 个字母后的所有变体（含前缀本身）"""
+    prefix = word[:PREFIX_LENGTH]
+    result = {prefix}
+    queue = [prefix]
+    for _ in range(max_distance):
+        next_queue = []
+        for item in queue:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in result:
+                    result.add(variant)
+                    next_queue.append(variant)
+        queue = next_queue
+    return result
+
+
+class SpellIndex:
+    """拼写纠正索引（第一次使用时才创建）"""
+    
+    def __init__(self, max_distance: int = MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self._words: Set[str] = set()
+        self._collected: Set[str] = set()
+        self._deletes: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from database import db
+            from .dictionary import LocalDictionary
+            
+            for word in load_frequency_list():
+                self._add(word)
+            for word in LocalDictionary.COMMON_WORDS:
+                self._add(word)
+            for word in STOPWORDS:
+                self._words.add(word)
+            
+            self._collected = set(db.get_all_word_texts())
+            for word in self._collected:
+                self._add(word)
+            db.add_listener(self._on_db_change)
+            self._loaded = True
+    
+    def _add(self, word: str):
+        if word in self._words:
+            return
+        self._words.add(word)
+        if "-" in word or "'" in word:
+            return
+        deletes = self._deletes
+        for variant in _deletes(word, self.max_distance):
+            if variant in deletes:
+                deletes[variant].append(word)
+            else:
+                deletes[variant] = [word]
+    
+    def _on_db_change(self, event: str, words: List[str]):
+        """单词库变化时更新索引（删除的单词只从单词库集合中移除，常用词仍然保留）"""
+        with self._lock:
+            if event == "add":
+                for word in words:
+                    self._collected.add(word)
+                    self._add(word)
+            elif event == "delete":
+                self._collected.difference_update(words)
+            elif event == "reload":
+                from database import db
+                self._collected = set(db.get_all_word_texts())
+                for word in self._collected:
+                    self._add(word)
+    
+    def is_known(self, word: str) -> bool:
+        """单词（或其原形）是否在词典中；带连字符的单词要求每一部分都在词典中"""
+        self._load()
+        words = self._words
+        if word in words:
+            return True
+        if "-" in word:
+            return all(self.is_known(part) for part in word.split("-") if part)
+        return any(form in words for form in base_forms(word))
+    
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Suggestion]:
+        """
+        查找与单词相近的词典单词
+        
+        参数:
+            word: 小写单词
+            max_distance: 最大编辑距离，默认为索引的最大距离
+        
+        返回:
+            List[Suggestion]: 候选单词，按编辑距离、是否已收集、词频排序；单词本身在词典中时只返回它自己
+        """
+        from .freq_rank import rank_index
+        
+        self._load()
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        word = word.lower()
+        if word in self._words:
+            return [Suggestion(word, 0, word in self._collected, rank_index.rank(word))]
+        
+        deletes = self._deletes
+        words = self._words
+        candidates = set()
+        for variant in _deletes(word, max_distance):
+            candidates.update(deletes.get(variant, ()))
+        
+        suggestions = []
+        for candidate in candidates:
+            if candidate not in words:
+                continue
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                suggestions.append(Suggestion(candidate, distance, candidate in self._collected,
+                                              rank_index.rank(candidate)))
+        
+        suggestions.sort(key=lambda s: (s.distance, not s.collected,
+                                        s.rank if s.rank is not None else 1 << 30, s.word))
+        return suggestions
+    
+    def check(self, word: str) -> Tuple[str, str]:
+        """
+        检查一个单词，必要时给出纠正建议
+        
+        只在有把握时才给出建议: 单词足够长、词典中没有它和它的原形、
+        且最近的候选只有一个（距离为2时还要求单词至少6个字母）。
+        
+        返回:
+            tuple: (检查结果, 单词)，检查结果为 OK / CORRECTED / GARBAGE / UNKNOWN，
+                   CORRECTED 时单词为建议的单词
+        """
+        word = word.lower()
+        if self.is_known(word):
+            return OK, word
+        if looks_like_garbage(word):
+            return GARBAGE, word
+        if len(word) < MIN_CORRECT_LENGTH or "-" in word or "'" in word:
+            return UNKNOWN, word
+        
+        suggestions = self.lookup(word)
+        if not suggestions:
+            return UNKNOWN, word
+        best = suggestions[0]
+        if len(suggestions) > 1 and suggestions[1].distance == best.distance:
+            return UNKNOWN, word
+        if best.distance == 2 and len(word) < 6:
+            return UNKNOWN, word
+        return CORRECTED, best.word
+    
+    def suggest_corrections(self, words: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        批量检查单词，只返回需要用户确认的单词
+        
+        返回:
+            dict: {原词: 建议的单词}，建议为 None 表示很可能不是单词、建议删除
+        """
+        suggestions = {}
+        for word in words:
+            status, fixed = self.check(word)
+            if status == CORRECTED:
+                suggestions[word] = fixed
+            elif status == GARBAGE:
+                suggestions[word] = None
+        return suggestions
+
+
+# 创建全局拼写纠正实例
+spell_index = SpellIndex()
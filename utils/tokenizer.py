@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+分词工具 - 流式提取文本中的单词并统计词频
+
+输入可以是一整段文本，也可以是任意的文本块迭代器（文件对象、逐页读取的文档等），
+只扫描一遍，不会把全文或全部匹配结果放进内存。
+跨文本块边界的单词会被正确拼接（如 "well-" + "known"）。
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# 英文单词: 由字母、连字符、撇号组成
+ENGLISH_PATTERN = re.compile(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*")
+
+# 中英文混合: 第1组为英文单词，第2组为连续的中文
+MIXED_PATTERN = re.compile(r"([a-zA-Z]+(?:[-'][a-zA-Z]+)*)|([\u4e00-\u9fff]+)")
+
+# 英文单词的最短长度（过滤单字母）
+MIN_WORD_LENGTH = 2
+
+# 长文本按该长度（字符数）分窗口匹配，每个窗口的匹配结果用完即丢弃；
+# 窗口末尾留到下一块的字符超过该长度时强行断开（只有极长的连续字母或汉字才会出现）
+WINDOW_SIZE = 64 * 1024
+
+# 常见虚词（冠词、代词、介词、连词、助动词等），统计生词时通常需要过滤
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are aren't as at
+be because been before being below between both but by
+can can't cannot could couldn't
+did didn't do does doesn't doing don't down during
+each few for from further
+had hadn't has hasn't have haven't having he he'd he'll he's her here here's hers herself him himself his how how's
+i i'd i'll i'm i've if in into is isn't it it's its itself
+let's me more most mustn't my myself
+no nor not of off on once only or other ought our ours ourselves out over own
+same shan't she she'd she'll she's should shouldn't so some such
+than that that's the their theirs them themselves then there there's these they they'd they'll they're they've
+this those through to too under until up very
+was wasn't we we'd we'll we're we've were weren't what what's when when's where where's which while
+who who's whom why why's will with won't would wouldn't
+you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+# 单词记录: word 为小写形式，text 为原文，position 为在整个输入中的字符偏移，kind 为 "english" 或 "chinese"
+Token = namedtuple("Token", ["word", "text", "position", "kind"])
+
+
+def _is_token_char(ch: str, include_chinese: bool) -> bool:
+    if ch.isascii():
+        return ch.isalpha() or ch in "-'"
+    return include_chinese and "\u4e00" <= ch <= "\u9fff"
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _ascii_lower(text: str) -> str:
+    """只转换ASCII字母的小写（不改变字符串长度，匹配位置保持不变）"""
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+
+def _iter_windows(chunks: Union[str, Iterable[str]], include_chinese: bool) -> Iterator[Tuple[str, int]]:
+    """
+    把输入切成以单词边界结尾的文本窗口
+    
+    产出:
+        tuple: (文本窗口, 窗口在整个输入中的字符偏移)
+    """
+    if isinstance(chunks, str):
+        # 整段长文本也按窗口处理，避免一次匹配出全部结果
+        text = chunks
+        chunks = (text[i:i + WINDOW_SIZE] for i in range(0, len(text), WINDOW_SIZE))
+    
+    carry = ""
+    offset = 0  # carry 第一个字符在整个输入中的偏移
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf = carry + chunk if carry else chunk
+        
+        # 结尾处可能是被截断的单词，留到下一块一起处理
+        # carry 全部是单词字符，只需要在新的文本块中查找边界，不重复扫描
+        cut = len(buf)
+        while cut > len(carry) and _is_token_char(buf[cut - 1], include_chinese):
+            cut -= 1
+        if cut == len(carry):
+            cut = 0
+        if len(buf) - cut > WINDOW_SIZE:
+            # 留下的字符不能无限增长，否则每一块都要复制整个 carry
+            cut = len(buf)
+        
+        if cut:
+            yield buf[:cut], offset
+        carry = buf[cut:]
+        offset += cut
+    
+    if carry:
+        yield carry, offset
+
+
+def iter_tokens(chunks: Union[str, Iterable[str]], include_chinese: bool = False,
+                min_length: int = MIN_WORD_LENGTH) -> Iterator[Token]:
+    """
+    流式提取单词（生成器）
+    
+    参数:
+        chunks: 文本，或文本块的迭代器（如文件对象、逐页文本）
+        include_chinese: 是否同时提取中文（连续的汉字作为一个词，超过 WINDOW_SIZE 时断开）
+        min_length: 英文单词的最短长度
+    
+    产出:
+        Token: (小写单词, 原文, 字符偏移, 类型)
+    """
+    pattern = MIXED_PATTERN if include_chinese else ENGLISH_PATTERN
+    for window, offset in _iter_windows(chunks, include_chinese):
+        for m in pattern.finditer(window):
+            if include_chinese and m.group(2):
+                text = m.group(2)
+                yield Token(text, text, offset + m.start(), "chinese")
+            else:
+                text = m.group(0)
+                if len(text) >= min_length:
+                    yield Token(text.lower(), text, offset + m.start(), "english")
+
+
+class WordStats:
+    """
+    单词统计器: 单遍统计每个单词的出现次数和首次出现位置
+    
+    用法:
+        stats = WordStats(stopwords=STOPWORDS)
+        stats.update(open("novel.txt", encoding="utf-8"))
+        stats.most_common(20)
+    
+    也可以多次调用 update() 分批输入（如逐页），位置在各批之间连续累计；
+    注意单词不会跨批拼接，需要拼接时请把各批放进同一个迭代器传入。
+    """
+    
+    def __init__(self, stopwords: Optional[Iterable[str]] = None, include_chinese: bool = False,
+                 min_length: int = MIN_WORD_LENGTH):
+        self.stopwords = frozenset(stopwords) if stopwords else frozenset()
+        self.include_chinese = include_chinese
+        self.min_length = min_length
+        self.counts: Dict[str, int] = {}
+        self.first_positions: Dict[str, int] = {}
+        self.kinds: Dict[str, str] = {}
+        self.total_tokens = 0
+        self._offset = 0
+    
+    def update(self, chunks: Union[str, Iterable[str]]) -> List[str]:
+        """
+        输入文本并更新统计
+        
+        返回:
+            List[str]: 本次输入中首次出现的单词（按出现顺序）
+        """
+        counts = self.counts
+        first_positions = self.first_positions
+        kinds = self.kinds
+        stopwords = self.stopwords
+        min_length = self.min_length
+        include_chinese = self.include_chinese
+        pattern = MIXED_PATTERN if include_chinese else ENGLISH_PATTERN
+        new_words = []
+        total = 0
+        base = self._offset
+        
+        # 热点循环: 先把整个窗口转小写再匹配，避免逐个单词创建 Token
+        for window, offset in _iter_windows(self._track(chunks), include_chinese):
+            for m in pattern.finditer(_ascii_lower(window)):
+                word = m.group(0)
+                if include_chinese and m.group(2):
+                    kind = "chinese"
+                elif len(word) < min_length:
+                    continue
+                else:
+                    kind = "english"
+                if word in stopwords:
+                    continue
+                total += 1
+                if word in counts:
+                    counts[word] += 1
+                else:
+                    counts[word] = 1
+                    first_positions[word] = base + offset + m.start()
+                    kinds[word] = kind
+                    new_words.append(word)
+        
+        self.total_tokens += total
+        return new_words
+    
+    def _track(self, chunks: Union[str, Iterable[str]]) -> Iterator[str]:
+        """透传文本块，同时累计已输入的字符数"""
+        if isinstance(chunks, str):
+            self._offset += len(chunks)
+            yield chunks
+            return
+        for chunk in chunks:
+            self._offset += len(chunk)
+            yield chunk
+    
+    def words(self) -> List[str]:
+        """全部单词，按首次出现的顺序"""
+        return list(self.counts)
+    
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """出现次数最多的单词，次数相同时先出现的在前"""
+        items = sorted(self.counts.items(), key=lambda item: (-item[1], self.first_positions[item[0]]))
+        return items if n is None else items[:n]
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    def __contains__(self, word: str) -> bool:
+        return word in self.counts
+
+
+def unique_words(chunks: Union[str, Iterable[str]], stopwords: Optional[Iterable[str]] = None,
+                 seen: Optional[set] = None) -> List[str]:
+    """
+    提取不重复的英文单词（小写，按首次出现的顺序）
+    
+    参数:
+        chunks: 文本或文本块迭代器
+        stopwords: 需要过滤的单词
+        seen: 已出现的单词集合，传入时跳过其中的单词并把新单词加入（用于分段处理时跨段去重）
+    
+    返回:
+        List[str]: 单词列表
+    """
+    if seen is None:
+        seen = set()
+    result = []
+    for window, _offset in _iter_windows(chunks, False):
+        # 窗口内先去重（保持顺序），再与 seen 比较
+        for word in dict.fromkeys(ENGLISH_PATTERN.findall(_ascii_lower(window))):
+            if len(word) >= MIN_WORD_LENGTH and word not in seen:
+                if stopwords and word in stopwords:
+                    continue
+                seen.add(word)
+                result.append(word)
+    return result
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+界面刷新调度 - 合并频繁的 page.update()
+
+每次 page.update() 都要比较整个页面并把变化发送给浏览器（网页模式下经过 websocket），
+循环中每处理一项就刷新一次时，大部分刷新的内容很快又被下一次覆盖。
+
+UpdateScheduler 把刷新请求合并起来:
+    - 距离上次刷新超过间隔（默认30毫秒）时立即刷新，否则在间隔结束时刷新一次
+    - batch() 中的刷新请求推迟到 with 块结束时一起刷新
+    - 只有部分控件变化时可以只刷新这些控件
+
+每个 ft.Page 共用一个调度器，通过 get_scheduler(page) 获取。
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+# 两次刷新之间的最短间隔（秒）
+UPDATE_INTERVAL = 0.03
+
+
+class UpdateScheduler:
+    """合并一个页面的刷新请求（线程安全）"""
+    
+    def __init__(self, page, interval: float = UPDATE_INTERVAL):
+        self.page = page
+        self.interval = interval
+        self._lock = threading.RLock()
+        self._dirty_page = False  # 需要刷新整个页面
+        self._dirty_controls = []  # 只需要刷新的控件
+        self._last_flush = 0.0
+        self._timer = None
+        self._batch_depth = 0
+    
+    def update(self, *controls):
+        """
+        请求刷新（代替 page.update()）
+        
+        参数:
+            controls: 只刷新这些控件，省略时刷新整个页面
+        """
+        with self._lock:
+            if controls:
+                for control in controls:
+                    if not any(c is control for c in self._dirty_controls):
+                        self._dirty_controls.append(control)
+            else:
+                self._dirty_page = True
+            
+            if self._batch_depth:
+                return
+            wait = self._last_flush + self.interval - time.monotonic()
+            if wait > 0:
+                # 间隔结束时再刷新，期间的请求合并到这一次
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+    
+    def flush(self):
+        """立即刷新等待中的变化"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty_page = self._dirty_page
+            controls = self._dirty_controls
+            if not dirty_page and not controls:
+                return
+            self._dirty_page = False
+            self._dirty_controls = []
+            self._last_flush = time.monotonic()
+            
+            try:
+                if dirty_page:
+                    self.page.update()
+                else:
+                    self.page.update(*controls)
+            except Exception as e:
+                # 页面已关闭（网页模式下用户离开）等情况
+                print(f"界面刷新失败: {e}")
+    
+    @contextmanager
+    def batch(self):
+        """
+        with 块中的刷新请求推迟到块结束时一起刷新
+        
+        用于多个步骤都会请求刷新的事件处理函数，可以嵌套。
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+
+
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(page) -> UpdateScheduler:
+    """获取页面的刷新调度器（每个 ft.Page 一个，第一次调用时创建）"""
+    scheduler = getattr(page, "_update_scheduler", None)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = getattr(page, "_update_scheduler", None)
+            if scheduler is None:
+                scheduler = UpdateScheduler(page)
+                page._update_scheduler = scheduler
+    return scheduler
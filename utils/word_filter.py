@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+生词过滤 - 区分生词、已收集的单词和过于常见的单词
+
+从OCR或粘贴的文本中提取出的单词大多是 the、people 这样的常见词，或者单词库里已经有的词，
+逐个显示成按钮既慢又干扰选词。过滤器在内存中保存两个集合:
+    - 已收集: 单词库中的全部单词，通过数据库的变化通知增量更新（新增、删除、改名）
+    - 常见词: 内置常用词表（data/word_freq.txt）中排名靠前的单词和虚词
+一次遍历即可把一批单词分成三类，每个单词只需一次哈希查找。
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from .tokenizer import STOPWORDS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# 内置常用词表，按词频从高到低排列
+WORD_FREQ_PATH = os.path.join(DATA_DIR, "word_freq.txt")
+
+# 词频排名在此范围内的单词视为过于常见
+COMMON_WORD_RANK = 1500
+
+# 还原出的原形至少要有这么多个字母（更短的词干大多是巧合: butter -> but、inner -> in、toes -> to）
+MIN_STEM_LENGTH = 4
+
+# 分类结果
+NEW = "new"
+COLLECTED = "collected"
+COMMON = "common"
+
+# 常用的不规则变化（变化形式 -> 原形）
+IRREGULAR_FORMS = {
+    "men": "man", "women": "woman", "children": "child", "feet": "foot", "teeth": "tooth",
+    "mice": "mouse", "lives": "life", "wives": "wife", "knives": "knife", "leaves": "leaf",
+    "said": "say", "made": "make", "went": "go", "gone": "go", "took": "take", "taken": "take",
+    "came": "come", "got": "get", "gotten": "get", "gave": "give", "given": "give",
+    "knew": "know", "known": "know", "thought": "think", "told": "tell", "found": "find",
+    "became": "become", "left": "leave", "felt": "feel", "brought": "bring", "began": "begin",
+    "begun": "begin", "kept": "keep", "held": "hold", "wrote": "write", "written": "write",
+    "stood": "stand", "heard": "hear", "meant": "mean", "met": "meet", "ran": "run",
+    "paid": "pay", "sat": "sit", "spoke": "speak", "spoken": "speak", "led": "lead",
+    "grew": "grow", "grown": "grow", "lost": "lose", "fell": "fall", "fallen": "fall",
+    "sent": "send", "built": "build", "understood": "understand", "drew": "draw",
+    "drawn": "draw", "broke": "break", "broken": "break", "spent": "spend", "rose": "rise",
+    "risen": "rise", "drove": "drive", "driven": "drive", "bought": "buy", "wore": "wear",
+    "worn": "wear", "chose": "choose", "chosen": "choose", "saw": "see", "seen": "see",
+    "did": "do", "done": "do", "had": "have", "has": "have", "was": "be", "were": "be",
+    "been": "be", "is": "be", "are": "be", "am": "be", "ate": "eat", "eaten": "eat",
+    "won": "win", "sold": "sell", "caught": "catch", "taught": "teach", "fought": "fight",
+    "sought": "seek", "threw": "throw", "thrown": "throw", "flew": "fly", "flown": "fly",
+    "forgot": "forget", "forgotten": "forget", "hid": "hide", "hidden": "hide",
+    "rode": "ride", "ridden": "ride", "shook": "shake", "shaken": "shake", "sang": "sing",
+    "sung": "sing", "swam": "swim", "woke": "wake", "woken": "wake", "better": "good",
+    "best": "good", "worse": "bad", "worst": "bad", "further": "far", "farther": "far",
+}
+
+
+def load_frequency_list(path: str = WORD_FREQ_PATH) -> List[str]:
+    """
+    读取常用词表
+    
+    返回:
+        List[str]: 单词列表，按词频从高到低排列；文件不存在时返回空列表
+    """
+    words = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    words.append(line.lower())
+    except OSError as e:
+        print(f"读取常用词表失败: {e}")
+    return words
+
+
+def base_forms(word: str) -> List[str]:
+    """
+    推测单词可能的原形（复数、过去式、进行时、比较级等的简单还原）
+    
+    只用于在词表中查找，返回的候选不一定都是真实的单词。
+    去掉词尾得到的候选不会是虚词，也不会短于 MIN_STEM_LENGTH 个字母。
+    
+    返回:
+        List[str]: 候选原形，按可能性排列，不含单词本身
+    """
+    if word in IRREGULAR_FORMS:
+        return [IRREGULAR_FORMS[word]]
+    
+    forms = []
+    n = len(word)
+    if n > 4 and word.endswith("ies"):
+        forms.append(word[:-3] + "y")
+    elif n > 4 and word.endswith("ied"):
+        forms.append(word[:-3] + "y")
+    if n > 3 and word.endswith("es"):
+        forms.append(word[:-2])
+    if n > 3 and word.endswith("s") and not word.endswith("ss"):
+        forms.append(word[:-1])
+    for suffix in ("ed", "ing", "er", "est"):
+        if n > len(suffix) + 2 and word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            forms.append(stem)
+            forms.append(stem + "e")
+            if len(stem) > 2 and stem[-1] == stem[-2]:
+                # 双写辅音: stopped -> stop
+                forms.append(stem[:-1])
+            if stem.endswith("i"):
+                forms.append(stem[:-1] + "y")
+    if n > 4 and word.endswith("ly"):
+        forms.append(word[:-2])
+    
+    result = []
+    for form in forms:
+        if len(form) >= MIN_STEM_LENGTH and form not in STOPWORDS and form not in result:
+            result.append(form)
+    return result
+
+
+class KnownWordFilter:
+    """生词过滤器（第一次使用时才加载词表和单词库）"""
+    
+    def __init__(self, common_rank: int = COMMON_WORD_RANK, freq_path: str = WORD_FREQ_PATH):
+        """
+        参数:
+            common_rank: 词频排名在此范围内的单词视为过于常见
+            freq_path: 常用词表路径
+        """
+        self.common_rank = common_rank
+        self.freq_path = freq_path
+        self._common: Optional[frozenset] = None
+        # 用于匹配原形的常见词（不含虚词，原形是虚词时多半是巧合）
+        self._common_stems: Optional[frozenset] = None
+        self._collected: Optional[set] = None
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._collected is not None:
+            return
+        with self._lock:
+            if self._collected is not None:
+                return
+            from database import db
+            
+            self._set_common(load_frequency_list(self.freq_path)[:self.common_rank])
+            
+            self._collected = set(db.get_all_word_texts())
+            db.add_listener(self._on_db_change)
+    
+    def _on_db_change(self, event: str, words: List[str]):
+        """数据库变化时增量更新已收集的单词"""
+        if event == "add":
+            self._collected.update(words)
+        elif event == "delete":
+            self._collected.difference_update(words)
+        elif event == "reload":
+            from database import db
+            self._collected = set(db.get_all_word_texts())
+    
+    def set_common_rank(self, rank: int):
+        """修改常见词的排名范围（重新读取词表）"""
+        with self._lock:
+            self.common_rank = rank
+            if self._common is not None:
+                self._set_common(load_frequency_list(self.freq_path)[:rank])
+    
+    def _set_common(self, frequent: List[str]):
+        stems = frozenset(frequent) - STOPWORDS
+        self._common_stems = stems
+        self._common = stems | STOPWORDS
+    
+    def is_collected(self, word: str) -> bool:
+        """单词是否已在单词库中"""
+        self._load()
+        return word.lower() in self._collected
+    
+    def is_common(self, word: str) -> bool:
+        """单词（或其原形）是否为常见词"""
+        self._load()
+        word = word.lower()
+        if word in self._common:
+            return True
+        return any(form in self._common_stems for form in base_forms(word))
+    
+    def classify(self, words: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        把一批单词分为生词、已收集、常见词三类
+        
+        已收集的单词即使是常见词也归为已收集。
+        
+        参数:
+            words: 小写单词（通常来自 unique_words 的结果）
+        
+        返回:
+            Dict[str, List[str]]: {NEW: [...], COLLECTED: [...], COMMON: [...]}，各类保持输入顺序
+        """
+        self._load()
+        collected = self._collected
+        common = self._common
+        common_stems = self._common_stems
+        result = {NEW: [], COLLECTED: [], COMMON: []}
+        new_words = result[NEW]
+        collected_words = result[COLLECTED]
+        common_words = result[COMMON]
+        
+        for word in words:
+            if word in collected:
+                collected_words.append(word)
+            elif word in common:
+                common_words.append(word)
+            elif any(form in common_stems for form in base_forms(word)):
+                common_words.append(word)
+            else:
+                new_words.append(word)
+        return result
+
+
+# 创建全局过滤器实例
+known_words = KnownWordFilter()
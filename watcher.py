@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+监视文件夹采集单词 - 无界面后台运行
+
+把截图或扫描件放进指定文件夹，程序自动识别新图片中的单词并存入单词库。
+
+用法:
+    python watcher.py <文件夹>                # 监视文件夹
+    python watcher.py <文件夹> --poll         # 强制使用轮询（网络盘等不支持事件通知的目录）
+    python watcher.py <文件夹> --once         # 处理完已有的图片后退出
+
+已处理的文件记录在检查点文件中（默认为文件夹下的 .vocab_watch.json），
+重启后不会重复处理；文件内容变化（大小或修改时间改变）后会重新识别。
+启动时积压大量图片时自动切换为批量模式，按批写入数据库和检查点。
+与采集页面一样，虚词和常见词（utils.word_filter）不存入单词库。
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import db
+from ocr_handler import ocr_handler, IMAGE_EXTENSIONS
+from utils.word_filter import known_words, COMMON
+
+# 文件系统事件通知（Linux上基于inotify），未安装时使用轮询
+WATCHDOG_AVAILABLE = False
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+
+CHECKPOINT_NAME = ".vocab_watch.json"
+
+# 待处理图片超过该数量时进入批量模式
+BATCH_THRESHOLD = 20
+# 批量模式下每批处理的图片数（每批写一次数据库和检查点）
+BATCH_SIZE = 50
+
+
+class _EventHandler(FileSystemEventHandler):
+    """把文件系统事件转交给 FolderWatcher"""
+    
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+
+class FolderWatcher:
+    """文件夹监视器"""
+    
+    def __init__(self, folder: str, checkpoint_path: Optional[str] = None,
+                 settle_seconds: float = 2.0, poll_interval: float = 1.0,
+                 use_polling: bool = False):
+        """
+        参数:
+            folder: 监视的文件夹
+            checkpoint_path: 检查点文件路径，默认为文件夹下的 .vocab_watch.json
+            settle_seconds: 文件大小和修改时间保持不变多久后才认为写入完成
+            poll_interval: 轮询间隔（秒）
+            use_polling: 是否强制使用轮询
+        """
+        self.folder = os.path.abspath(folder)
+        self.checkpoint_path = checkpoint_path or os.path.join(self.folder, CHECKPOINT_NAME)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling or not WATCHDOG_AVAILABLE
+        
+        # 已处理的文件: 相对路径 -> [大小, 修改时间(ns)]
+        self.processed: Dict[str, list] = {}
+        # 等待写入完成的文件: 路径 -> (大小, 修改时间(ns), 最近一次变化的时间)
+        self.pending: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        
+        self.stats = {"images": 0, "failed": 0, "new_words": 0, "updated_words": 0}
+        self._load_checkpoint()
+    
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                self.processed = json.load(f).get("files", {})
+        except FileNotFoundError:
+            self.processed = {}
+        except (OSError, ValueError) as e:
+            print(f"检查点读取失败，将重新处理全部图片: {e}")
+            self.processed = {}
+    
+    def _save_checkpoint(self):
+        """原子写入检查点（先写临时文件再替换）"""
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.processed}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _is_image(self, path: str) -> bool:
+        return path.lower().endswith(IMAGE_EXTENSIONS) and not os.path.basename(path).startswith(".")
+    
+    def _signature(self, path: str) -> Optional[list]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+    
+    def _is_processed(self, path: str, signature: list) -> bool:
+        return self.processed.get(os.path.relpath(path, self.folder)) == signature
+    
+    def notify(self, path: str):
+        """记录发生变化的文件，等待其写入完成"""
+        if not self._is_image(path):
+            return
+        signature = self._signature(path)
+        if signature is None or self._is_processed(path, signature):
+            return
+        with self._lock:
+            old = self.pending.get(path)
+            if old is None or list(old[:2]) != signature:
+                self.pending[path] = (signature[0], signature[1], time.monotonic())
+    
+    def scan(self):
+        """扫描整个文件夹（启动时和轮询模式下使用）"""
+        for dirpath, dirnames, filenames in os.walk(self.folder):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                self.notify(os.path.join(dirpath, name))
+    
+    def _take_ready(self) -> List[str]:
+        """
+        取出已写入完成的文件
+        
+        文件在 settle_seconds 内大小和修改时间都没有变化才认为写入完成，
+        避免识别到复制或截图保存到一半的文件。
+        """
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (size, mtime, changed_at) in list(self.pending.items()):
+                signature = self._signature(path)
+                if signature is None:
+                    # 文件已被删除或移走
+                    del self.pending[path]
+                elif signature != [size, mtime]:
+                    self.pending[path] = (signature[0], signature[1], now)
+                elif now - changed_at >= self.settle_seconds:
+                    ready.append(path)
+                    del self.pending[path]
+        ready.sort()
+        return ready
+    
+    def process(self, paths: List[str]):
+        """
+        识别图片并存入单词库
+        
+        少量图片时逐个处理，每张图片处理完立即入库；
+        积压较多时进入批量模式，每 BATCH_SIZE 张图片合并写一次数据库和检查点。
+        写入数据库失败（如其他进程长时间锁住数据库）时这批图片不记入检查点，放回等待列表重新识别。
+        """
+        batch_mode = len(paths) > BATCH_THRESHOLD
+        batch_size = BATCH_SIZE if batch_mode else 1
+        if batch_mode:
+            print(f"待处理图片 {len(paths)} 张，进入批量模式")
+        
+        for start in range(0, len(paths), batch_size):
+            if self._stop.is_set():
+                break
+            
+            words = []
+            done = []
+            images = failed = 0
+            for path in paths[start:start + batch_size]:
+                signature = self._signature(path)
+                if signature is None or self._is_processed(path, signature):
+                    continue
+                
+                success, result = ocr_handler.recognize(path)
+                if success:
+                    words.extend(ocr_handler.extract_english_words(result))
+                    images += 1
+                    if not batch_mode:
+                        print(f"已识别: {os.path.basename(path)}")
+                else:
+                    failed += 1
+                    print(f"识别失败: {os.path.basename(path)} - {result}")
+                # 识别失败的文件同样记入检查点，文件内容变化后才会重试
+                done.append((path, signature))
+            
+            # 去掉常见词；已收集的单词保留，再次遇到时增加选择次数
+            common = set(known_words.classify(words)[COMMON])
+            words = [w for w in words if w not in common]
+            if words:
+                try:
+                    new_count, update_count = db.batch_add_words(words, raise_errors=True)
+                except sqlite3.Error as e:
+                    print(f"写入单词库失败，{len(done)} 张图片稍后重新识别: {e}")
+                    self._requeue(done)
+                    continue
+                self.stats["new_words"] += new_count
+                self.stats["updated_words"] += update_count
+            self.stats["images"] += images
+            self.stats["failed"] += failed
+            
+            for path, signature in done:
+                self.processed[os.path.relpath(path, self.folder)] = signature
+            self._save_checkpoint()
+            
+            if batch_mode:
+                print(f"进度: {min(start + batch_size, len(paths))}/{len(paths)}")
+    
+    def _requeue(self, done: List[tuple]):
+        """把没有写入成功的图片放回等待列表，稳定时间过后重新处理"""
+        now = time.monotonic()
+        with self._lock:
+            for path, signature in done:
+                self.pending.setdefault(path, (signature[0], signature[1], now))
+    
+    def run(self, once: bool = False):
+        """
+        开始监视（阻塞运行，直到调用 stop() 或按 Ctrl+C）
+        
+        参数:
+            once: 只处理已有的图片，处理完后退出
+        """
+        available, error = ocr_handler.is_available()
+        if not available:
+            print(f"OCR不可用: {error}")
+            return
+        
+        # 先开始监视再处理已有的图片，处理积压期间放入的新图片会记入 pending，之后继续处理
+        observer = None
+        if not once and not self.use_polling:
+            try:
+                observer = Observer()
+                observer.schedule(_EventHandler(self), self.folder, recursive=True)
+                observer.start()
+            except Exception as e:
+                print(f"文件事件监视启动失败，改用轮询: {e}")
+                observer = None
+        
+        try:
+            # 处理启动前已存在的图片（积压时不需要等待稳定时间）
+            self.scan()
+            with self._lock:
+                backlog = sorted(self.pending)
+                self.pending.clear()
+            if backlog:
+                self.process(backlog)
+            if once:
+                return
+            
+            mode = "轮询" if observer is None else "事件通知"
+            print(f"正在监视: {self.folder}（{mode}模式，按 Ctrl+C 退出）")
+            
+            while not self._stop.is_set():
+                if observer is None:
+                    self.scan()
+                ready = self._take_ready()
+                if ready:
+                    self.process(ready)
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+    
+    def stop(self):
+        """停止监视"""
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="监视文件夹，自动识别新图片中的单词并存入单词库")
+    parser.add_argument("folder", help="要监视的文件夹")
+    parser.add_argument("--poll", action="store_true", help="使用轮询代替文件事件通知")
+    parser.add_argument("--interval", type=float, default=1.0, help="轮询间隔（秒），默认1")
+    parser.add_argument("--settle", type=float, default=2.0, help="文件保持不变多少秒后才处理，默认2")
+    parser.add_argument("--checkpoint", help="检查点文件路径，默认为文件夹下的 " + CHECKPOINT_NAME)
+    parser.add_argument("--once", action="store_true", help="处理完已有的图片后退出")
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.folder):
+        print(f"文件夹不存在: {args.folder}")
+        sys.exit(1)
+    
+    watcher = FolderWatcher(
+        args.folder,
+        checkpoint_path=args.checkpoint,
+        settle_seconds=args.settle,
+        poll_interval=args.interval,
+        use_polling=args.poll,
+    )
+    watcher.run(once=args.once)
+    
+    s = watcher.stats
+    print(f"共识别 {s['images']} 张图片（失败 {s['failed']} 张），"
+          f"新增 {s['new_words']} 个单词，更新 {s['updated_words']} 个")
+
+
+if __name__ == "__main__":
+    main()
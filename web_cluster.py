@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+多进程网页模式 - 多个工作进程共用一个端口
+    
+    python main.py --web [端口] --workers N
+
+单进程网页模式下所有会话的OCR、查词典、PDF生成都在同一个Python进程中进行，只能用到一个CPU核。
+多进程模式:
+    - 主进程启动 N 个工作进程，每个工作进程在本机的内部端口上运行完整的 Flet 网页服务
+    - 主进程在对外端口上转发TCP连接，同一个浏览器的连接总是转发到同一个工作进程
+      （会话的 websocket 和上传文件的请求必须由同一个进程处理）；该进程不可用时转发到下一个。
+      打开页面时依次分配工作进程，并在第一个响应中设置 cookie 记录分配结果，之后的请求按 cookie 转发
+    - 数据库切换到 WAL 模式，读取不会被写入阻塞，写入冲突时等待（database.BUSY_TIMEOUT），
+      其他进程的修改在切换页面时发现（db.sync_external_changes）
+    - 词频索引（mmap，多个进程共享同一份物理内存）和字体索引在启动工作进程前生成好，
+      工作进程只读取；PDF缓存目录也由所有工作进程共用
+    - 工作进程意外退出时自动重启
+
+浏览器不发送 cookie（禁用了 cookie，或经过会去掉 cookie 的反向代理）时按客户端IP分配，
+此时同一个IP（同一个NAT网关或反向代理）后面的所有客户端会分配到同一个工作进程。
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import socket
+import asyncio
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(BASE_DIR, "main.py")
+
+# 等待工作进程启动的最长时间（秒）
+WORKER_START_TIMEOUT = 60
+
+# 工作进程退出后等待多久再重启（秒）
+RESTART_DELAY = 1.0
+
+# 转发数据时每次读取的字节数
+PIPE_BUFFER = 64 * 1024
+
+# 记录浏览器所属工作进程（序号）的 cookie
+AFFINITY_COOKIE = "vocab_worker"
+_COOKIE_PATTERN = re.compile(rb"(?:^|;)\s*" + AFFINITY_COOKIE.encode("ascii") + rb"=(\d+)")
+
+# 读取请求头或响应头的最大字节数，超过时不再解析
+MAX_HEADER_BYTES = 16 * 1024
+
+# 会话本身的请求（websocket、上传文件），没有 cookie 时按客户端IP分配，不开始新的分配
+_SESSION_PATHS = (b"/ws", b"/upload")
+
+
+def default_workers() -> int:
+    """默认工作进程数: CPU核数"""
+    return max(1, os.cpu_count() or 1)
+
+
+def free_port() -> int:
+    """找一个本机空闲的端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_shared_data():
+    """
+    启动工作进程前准备共享的数据
+    
+    工作进程同时启动时不需要各自创建数据库表、编译词频索引或扫描字体目录，
+    之后只读取这些文件。
+    """
+    from database import VocabularyDB
+    from utils.freq_rank import rank_index
+    from pdf_fonts import load_font_index
+    
+    database = VocabularyDB()
+    if not database.enable_wal():
+        print("警告: 数据库不能使用WAL模式，多个工作进程同时写入时可能需要等待")
+    database.close()
+    
+    print(f"  词频索引: {len(rank_index)} 个单词")
+    rank_index.close()
+    
+    index = load_font_index()
+    print(f"  字体索引: {len(index.get('fonts', []))} 个字体")
+
+
+class AffinityProxy:
+    """
+    TCP转发，按 cookie（没有时按客户端IP）把连接分配给工作进程
+    
+    只解析每个连接的第一个请求头和第一个响应头（读取 cookie、添加 Set-Cookie），
+    其余数据（包括 websocket）原样转发。
+    """
+    
+    def __init__(self, backends: List[int], host: str = "127.0.0.1"):
+        """
+        参数:
+            backends: 工作进程的端口
+            host: 工作进程的地址
+        """
+        self.backends = backends
+        self.host = host
+        self.connections: Dict[int, int] = {port: 0 for port in backends}  # 端口 -> 当前连接数
+        self._next = 0  # 下一个新浏览器分配到的工作进程序号
+    
+    def pick(self, client_ip: str) -> List[int]:
+        """
+        按客户端IP选择工作进程端口，依次尝试（没有 cookie 时使用）
+        
+        返回:
+            List[int]: 首选的端口在最前面，其后是其他端口（首选的不可用时使用）
+        """
+        return self._ordered(zlib.crc32(client_ip.encode("utf-8")) % len(self.backends))
+    
+    def route(self, request: Optional[Tuple[bytes, Optional[int]]], client_ip: str) -> List[int]:
+        """
+        选择工作进程: 有 cookie 时使用 cookie 中的工作进程，打开页面的新浏览器依次分配，其余按客户端IP
+        
+        参数:
+            request: _parse_request 的结果，不是HTTP请求时为 None
+            client_ip: 客户端IP
+        
+        返回:
+            List[int]: 依次尝试的端口
+        """
+        if request is None:
+            return self.pick(client_ip)
+        path, index = request
+        if index is not None and index < len(self.backends):
+            return self._ordered(index)
+        if path.startswith(_SESSION_PATHS):
+            return self.pick(client_ip)
+        # 新的浏览器: 依次分配，同一个IP后面的多个浏览器也能分到不同的工作进程
+        index = self._next
+        self._next = (index + 1) % len(self.backends)
+        return self._ordered(index)
+    
+    def _ordered(self, start: int) -> List[int]:
+        return self.backends[start:] + self.backends[:start]
+    
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        peer = client_writer.get_extra_info("peername")
+        client_ip = peer[0] if peer else ""
+        
+        head = await _read_head(client_reader)
+        request = _parse_request(head)
+        for port in self.route(request, client_ip):
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection(self.host, port)
+                break
+            except OSError:
+                continue
+        else:
+            client_writer.close()
+            return
+        
+        # cookie 记录实际连接到的工作进程（新的浏览器，或 cookie 中的工作进程不可用时）
+        cookie = None
+        index = self.backends.index(port)
+        if request is not None and request[1] != index:
+            cookie = (f"Set-Cookie: {AFFINITY_COOKIE}={index}; "
+                      f"Path=/; HttpOnly; SameSite=Lax\r\n").encode("ascii")
+        
+        self.connections[port] += 1
+        try:
+            upstream_writer.write(head)
+            await asyncio.gather(
+                _pipe(client_reader, upstream_writer),
+                _pipe(upstream_reader, client_writer, cookie),
+            )
+        finally:
+            self.connections[port] -= 1
+    
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def _parse_request(head: bytes) -> Optional[Tuple[bytes, Optional[int]]]:
+    """
+    解析HTTP请求头
+    
+    返回:
+        tuple: (请求路径, cookie 中的工作进程序号或None)；不是HTTP请求时返回 None
+    """
+    request_line, _, headers = head.partition(b"\r\n")
+    parts = request_line.split(b" ")
+    if len(parts) != 3 or not parts[2].startswith(b"HTTP/"):
+        return None
+    for line in headers.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"cookie":
+            m = _COOKIE_PATTERN.search(value)
+            if m:
+                return parts[1], int(m.group(1))
+    return parts[1], None
+
+
+async def _read_head(reader: asyncio.StreamReader) -> bytes:
+    """
+    读取到头部结束（空行）为止的数据
+    
+    返回的数据可能包含头部之后的一部分正文；连接关闭或超过 MAX_HEADER_BYTES 时返回已读取的数据。
+    """
+    data = b""
+    while b"\r\n\r\n" not in data and len(data) < MAX_HEADER_BYTES:
+        chunk = await reader.read(PIPE_BUFFER)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _add_header(head: bytes, header: bytes) -> bytes:
+    """在HTTP响应的状态行之后添加一行头部，不是HTTP响应时原样返回"""
+    end = head.find(b"\r\n")
+    if end < 0 or not head.startswith(b"HTTP/"):
+        return head
+    return head[:end + 2] + header + head[end + 2:]
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, header: Optional[bytes] = None):
+    """
+    把 reader 的数据转发到 writer，一端关闭时关闭另一端
+    
+    参数:
+        header: 添加到第一个HTTP响应头中的一行（如 Set-Cookie）
+    """
+    try:
+        if header:
+            head = await _read_head(reader)
+            if not head:
+                return
+            writer.write(_add_header(head, header))
+            await writer.drain()
+        while True:
+            data = await reader.read(PIPE_BUFFER)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except (ConnectionError, OSError, RuntimeError):
+            pass
+
+
+class WorkerPool:
+    """工作进程管理"""
+    
+    def __init__(self, count: int, env: Optional[Dict[str, str]] = None):
+        self.ports = [free_port() for _ in range(count)]
+        self.env = env or os.environ.copy()
+        self.processes: Dict[int, subprocess.Popen] = {}
+        self._stopping = False
+    
+    def _start(self, port: int):
+        self.processes[port] = subprocess.Popen(
+            [sys.executable, MAIN_PATH, "--web-worker", str(port)],
+            cwd=BASE_DIR,
+            env=self.env,
+        )
+    
+    def start(self):
+        for port in self.ports:
+            self._start(port)
+    
+    def wait_ready(self, timeout: float = WORKER_START_TIMEOUT) -> List[int]:
+        """
+        等待工作进程开始接受连接
+        
+        返回:
+            List[int]: 超时仍未启动的工作进程端口
+        """
+        deadline = time.monotonic() + timeout
+        pending = list(self.ports)
+        while pending and time.monotonic() < deadline:
+            for port in list(pending):
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                        pending.remove(port)
+                except OSError:
+                    pass
+            if pending:
+                time.sleep(0.2)
+        return pending
+    
+    async def supervise(self):
+        """工作进程意外退出时重启"""
+        while not self._stopping:
+            await asyncio.sleep(RESTART_DELAY)
+            for port, proc in list(self.processes.items()):
+                if proc.poll() is not None and not self._stopping:
+                    print(f"  工作进程 {port} 已退出（代码 {proc.returncode}），正在重启...")
+                    self._start(port)
+    
+    def stop(self):
+        self._stopping = True
+        for proc in self.processes.values():
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in self.processes.values():
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def run_cluster(port: int, workers: int, host: str = "0.0.0.0", open_browser: bool = True):
+    """
+    启动多进程网页模式（阻塞，按 Ctrl+C 停止）
+    
+    参数:
+        port: 对外端口
+        workers: 工作进程数
+        host: 对外监听的地址
+        open_browser: 启动后是否打开浏览器
+    """
+    print("  正在准备共享数据...")
+    prepare_shared_data()
+    
+    pool = WorkerPool(workers)
+    print(f"  正在启动 {workers} 个工作进程...")
+    pool.start()
+    
+    async def serve():
+        proxy = AffinityProxy(pool.ports)
+        supervisor = asyncio.ensure_future(pool.supervise())
+        try:
+            await proxy.serve(host, port)
+        finally:
+            supervisor.cancel()
+    
+    try:
+        not_ready = pool.wait_ready()
+        if len(not_ready) == workers:
+            print("  工作进程启动失败")
+            return
+        if not_ready:
+            print(f"  警告: {len(not_ready)} 个工作进程没有按时启动，其连接暂时转发到其他工作进程")
+        print(f"  Web服务器已启动（{workers} 个工作进程）")
+        if open_browser:
+            import webbrowser
+            webbrowser.open(f"http://localhost:{port}")
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("  正在停止工作进程...")
+        pool.stop()